@@ -15,7 +15,7 @@ class FormCategoryViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
     def get_queryset(self):
-        queryset = FormCategory.objects.all()
+        queryset = FormCategory.objects.prefetch_related('forms')
         forms_id = self.request.query_params.get('form')
         if forms_id is not None:
             queryset = queryset.filter(forms__id=forms_id)
@@ -61,7 +61,7 @@ class ProcessCategoryViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
     def get_queryset(self):
-        queryset = ProcessCategory.objects.all()
+        queryset = ProcessCategory.objects.prefetch_related('process')
         process_id = self.request.query_params.get('process')
         if process_id is not None:
             queryset = queryset.filter(process__id=process_id)
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms', '0003_form_views_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='response',
+            name='form',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='forms.form'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms', '0004_alter_response_form'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='response',
+            index=models.Index(fields=['form', 'submitted_at'], name='idx_response_form_submitted'),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import Form, Field, Answer, Response
 from ..categories.models import FormCategory
@@ -64,7 +65,9 @@ class ResponseSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         answers_data = validated_data.pop('answers')
-        response = Response.objects.create(**validated_data)
-        for answer_data in answers_data:
-            Answer.objects.create(response=response, **answer_data)
+        with transaction.atomic():
+            response = Response.objects.create(**validated_data)
+            Answer.objects.bulk_create([Answer(response=response, **answer_data) for answer_data in answers_data])
+            # bulk_create skips the per-answer post_save; the response's own
+            # watermark bump runs on commit, after these answers.
         return response
\ No newline at end of file
@@ -3,7 +3,9 @@ from rest_framework import viewsets
 
 from rest_framework.response import Response
 
-from .models import Form, Field, Response
+from config.db_router import ReplicaReadMixin
+
+from .models import Form, Field, Response as FormResponse
 from .serializer import FormSerializer, FieldSerializer, ResponseSerializer
 
 
@@ -13,7 +15,7 @@ class FieldViewSet(viewsets.ModelViewSet):
 
 
 class FormViewSet(viewsets.ModelViewSet):
-    queryset = Form.objects.all()
+    queryset = Form.objects.prefetch_related('fields', 'categories')
     serializer_class = FormSerializer
 
     def perform_create(self, serializer):
@@ -32,15 +34,15 @@ class FormViewSet(viewsets.ModelViewSet):
         return Response(serializer.data) 
 
 
-class ResponseViewSet(viewsets.ModelViewSet):
-    queryset = Response.objects.all()
+class ResponseViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
+    queryset = FormResponse.objects.prefetch_related('answers')
     serializer_class = ResponseSerializer
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
     def get_queryset(self):
-        queryset = Response.objects.all()
+        queryset = FormResponse.objects.prefetch_related('answers')
         form_id = self.request.query_params.get('form')
         if form_id is not None:
             queryset = queryset.filter(form_id=form_id)
@@ -2,7 +2,7 @@ from django import forms
 from django.contrib import admin
 from django.forms.models import BaseInlineFormSet
 
-from .models import Process, ProcessStep, ProcessInstance, StepSubmission
+from .models import Process, ProcessStep, ProcessInstance, StepRollup, StepSubmission
 
 
 class ProcessStepInlineFormset(BaseInlineFormSet):
@@ -56,4 +56,11 @@ class ProcessInstanceAdmin(admin.ModelAdmin):
     list_filter = ['status', 'started_at', 'completed_at', 'process__type']
     search_fields = ['process__title', 'started_by__username', 'access_token']
     readonly_fields = ['started_at', 'completed_at', 'access_token', 'access_token_expires_at']
-    autocomplete_fields = ['process', 'started_by', 'current_step']
\ No newline at end of file
+    autocomplete_fields = ['process', 'started_by', 'current_step']
+
+
+@admin.register(StepRollup)
+class StepRollupAdmin(admin.ModelAdmin):
+    list_display = ['id', 'step', 'submitted_count', 'skipped_count']
+    search_fields = ['step__title', 'step__process__title']
+    readonly_fields = ['step', 'submitted_count', 'skipped_count', 'elapsed_buckets']
@@ -0,0 +1,159 @@
+import math
+from collections import Counter, defaultdict
+from datetime import timedelta
+from itertools import takewhile
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from apps.reports.models import RollupWatermark
+from .models import ProcessInstance, StepRollup, StepSubmission
+
+# Shares the reports watermark table; last_response_id holds a StepSubmission id here.
+STEP_ROLLUP_WATERMARK = 'step_submissions'
+# Eight buckets per doubling keep a bucket's midpoint within 5% of its samples.
+BUCKETS_PER_DOUBLING = 8
+
+
+def _bucket(seconds):
+    return int(BUCKETS_PER_DOUBLING * math.log2(1 + max(seconds, 0)))
+
+
+def _bucket_seconds(bucket):
+    return 2 ** ((bucket + 0.5) / BUCKETS_PER_DOUBLING) - 1
+
+
+def _nth(buckets, n):
+    for bucket, count in buckets:
+        if n < count:
+            return _bucket_seconds(bucket)
+        n -= count
+
+
+def bucket_percentile(elapsed_buckets, p):
+    # Interpolates between neighbouring ranks like PERCENTILE_CONT, on bucket midpoints.
+    buckets = sorted((int(bucket), count) for bucket, count in elapsed_buckets.items())
+    total = sum(count for _, count in buckets)
+    if not total:
+        return None
+    rank = p * (total - 1)
+    lo, hi = _nth(buckets, math.floor(rank)), _nth(buckets, math.ceil(rank))
+    return round(lo + (rank - math.floor(rank)) * (hi - lo), 3)
+
+
+def _collect_step_deltas(submissions):
+    deltas = defaultdict(lambda: {'submitted': 0, 'skipped': 0, 'buckets': Counter()})
+    for step_id, skipped, submitted_at, started_at in submissions:
+        delta = deltas[step_id]
+        if skipped:
+            delta['skipped'] += 1
+        else:
+            delta['submitted'] += 1
+            delta['buckets'][str(_bucket((submitted_at - started_at).total_seconds()))] += 1
+    return deltas
+
+
+def _apply_step_deltas(deltas):
+    existing = {r.step_id: r for r in StepRollup.objects.filter(step_id__in=deltas)}
+    to_create, to_update = [], []
+    for step_id, delta in deltas.items():
+        rollup = existing.get(step_id)
+        if rollup is None:
+            rollup = StepRollup(step_id=step_id)
+            to_create.append(rollup)
+        else:
+            to_update.append(rollup)
+        rollup.submitted_count += delta['submitted']
+        rollup.skipped_count += delta['skipped']
+        merged = Counter(rollup.elapsed_buckets or {})
+        merged.update(delta['buckets'])
+        rollup.elapsed_buckets = dict(merged)
+
+    StepRollup.objects.bulk_create(to_create)
+    StepRollup.objects.bulk_update(to_update, ['submitted_count', 'skipped_count', 'elapsed_buckets'])
+
+
+def _submission_rows(qs):
+    return qs.values_list('step_id', 'skipped', 'submitted_at', 'instance__started_at')
+
+
+def rollup_step_submissions(batch_size=5000, settle_seconds=30):
+    # Like rollup_new_responses: recent rows wait a run, as lower ids may still be uncommitted.
+    cutoff = timezone.now() - timedelta(seconds=settle_seconds)
+
+    with transaction.atomic():
+        mark, _ = RollupWatermark.objects.select_for_update().get_or_create(name=STEP_ROLLUP_WATERMARK)
+
+        rows = (
+            StepSubmission.objects
+            .filter(id__gt=mark.last_response_id)
+            .order_by('id')
+            .values_list('id', 'submitted_at')[:batch_size]
+        )
+        settled = list(takewhile(lambda row: row[1] < cutoff, rows))
+        if not settled:
+            return 0
+
+        lo, hi = mark.last_response_id, settled[-1][0]
+        submissions = StepSubmission.objects.filter(id__gt=lo, id__lte=hi)
+        _apply_step_deltas(_collect_step_deltas(_submission_rows(submissions)))
+
+        mark.last_response_id = hi
+        mark.save(update_fields=['last_response_id', 'updated_at'])
+
+    return len(settled)
+
+
+def rebuild_step_rollups(process_ids):
+    # Recount these processes up to the watermark, for rows written out of id order.
+    with transaction.atomic():
+        mark, _ = RollupWatermark.objects.select_for_update().get_or_create(name=STEP_ROLLUP_WATERMARK)
+        StepRollup.objects.filter(step__process_id__in=process_ids).delete()
+        submissions = StepSubmission.objects.filter(id__lte=mark.last_response_id, step__process_id__in=process_ids)
+        _apply_step_deltas(_collect_step_deltas(_submission_rows(submissions).iterator()))
+
+
+def process_funnel(process):
+    # Submissions come from the step rollups; only where instances wait now is counted live.
+    at_step = dict(
+        ProcessInstance.objects
+        .filter(process=process)
+        .values_list('current_step_id')
+        .annotate(n=Count('id'))
+        .order_by()
+    )
+    total = sum(at_step.values())
+    waiting_by_step = {step_id: n for step_id, n in at_step.items() if step_id is not None}
+
+    steps = []
+    for step in (
+        process.steps.order_by('order')
+        .select_related('rollup')
+        .only('id', 'process_id', 'title', 'order',
+              'rollup__submitted_count', 'rollup__skipped_count', 'rollup__elapsed_buckets')
+    ):
+        rollup = getattr(step, 'rollup', None) or StepRollup()
+        submitted, skipped = rollup.submitted_count, rollup.skipped_count
+        waiting = waiting_by_step.get(step.id, 0)
+        reached = submitted + skipped + waiting if process.is_sequential else total
+        steps.append({
+            'id': step.id,
+            'title': step.title,
+            'order': step.order,
+            'reached': reached,
+            'submitted': submitted,
+            'skipped': skipped,
+            'waiting': waiting,
+            'drop_off_rate': round(1 - (submitted + skipped) / reached, 4) if reached else None,
+            'median_seconds': bucket_percentile(rollup.elapsed_buckets, 0.5),
+            'p90_seconds': bucket_percentile(rollup.elapsed_buckets, 0.9),
+        })
+
+    return {
+        'id': process.id,
+        'title': process.title,
+        'type': process.type,
+        'instances': total,
+        'steps': steps,
+    }
@@ -0,0 +1,244 @@
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from config.db_router import ReplicaReadMixin
+from apps.forms.models import Field as FormField
+from .expiry import aregister_guest_expiry
+from .guest_tokens import ais_guest_token_revoked, read_guest_token
+from .models import Process, ProcessInstance, ProcessStep, StepSubmission
+from .serializers import CurrentStepSerializer, FreeStepSerializer, ProcessInstanceSerializer, \
+    StepSubmitPayloadSerializer
+from .throttling import GuestInstanceRateThrottle, RedisScopedRateThrottle
+from .views import ensure_form_password_if_private, get_instance_token_from_request, require_guest_token_if_needed, \
+    write_step_submission
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are coroutines.
+
+    Authentication, permissions and throttling still run through DRF's
+    synchronous initial(), off the event loop; the handler itself awaits
+    the async ORM and Redis so a waiting request holds no worker thread.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if hasattr(response, '__await__'):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+async def arequire_guest_token_if_needed(request, instance):
+    if instance.started_by_id:
+        return
+    token = get_instance_token_from_request(request)
+    payload = read_guest_token(token) if token else None
+    if payload is None:
+        # Missing and pre-signing tokens take the original lookup path.
+        await sync_to_async(require_guest_token_if_needed)(request, instance)
+        return
+    if payload.get('i') != instance.id or payload.get('p') != instance.process_id:
+        raise ValidationError({'detail': 'Invalid guest token.'})
+    if timezone.now().timestamp() > payload.get('e', 0):
+        raise ValidationError({'detail': 'Guest token expired.'})
+    if await ais_guest_token_revoked(token):
+        raise ValidationError({'detail': 'Invalid guest token.'})
+
+
+async def _instance_data(instance):
+    # ProcessSerializer reads categories lazily, so serialize off the loop.
+    return await sync_to_async(lambda: ProcessInstanceSerializer(instance).data)()
+
+
+async def _submit_step(request, instance, step, answers):
+    field_ids = {}
+    for key in answers:
+        try:
+            field_ids[key] = int(key)
+        except (TypeError, ValueError):
+            raise ValidationError({'detail': f'Field {key} not found on this form.'})
+
+    found = {
+        pk async for pk in FormField.objects.filter(form=step.form, pk__in=field_ids.values()).values_list('pk', flat=True)
+    }
+    for key, pk in field_ids.items():
+        if pk not in found:
+            raise ValidationError({'detail': f'Field {key} not found on this form.'})
+
+    user = request.user if request.user.is_authenticated else None
+    await sync_to_async(write_step_submission)(
+        instance, step, user, {field_ids[key]: value for key, value in answers.items()},
+    )
+
+
+class AsyncStartBaseView(AsyncAPIView):
+    permission_classes = [AllowAny]
+    throttle_classes = [RedisScopedRateThrottle]
+    throttle_scope = 'start_process'
+    process_type = None
+    guest_ttl_hours = 24
+
+    async def check_can_start(self, request, process):
+        pass
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            process = await Process.objects.aget(pk=self.kwargs.get('pk'), is_active=True, type=self.process_type)
+        except Process.DoesNotExist:
+            raise ValidationError({'detail': 'Process not found or inactive.'})
+
+        access_token = None
+        if request.user.is_authenticated:
+            await self.check_can_start(request, process)
+            instance = await ProcessInstance.objects.acreate(process=process, started_by=request.user)
+        else:
+            expires = timezone.now() + timedelta(hours=self.guest_ttl_hours)
+            instance = await ProcessInstance.objects.acreate(
+                process=process,
+                started_by=None,
+                access_token_expires_at=expires,
+            )
+            await aregister_guest_expiry(instance.id, expires)
+            access_token = instance.access_token
+
+        if process.is_sequential:
+            instance.current_step = await process.steps.order_by('order').afirst()
+            if instance.current_step:
+                await instance.asave(update_fields=['current_step'])
+
+        data = await _instance_data(instance)
+        return Response(
+            {'instance': data, 'access_token': access_token} if access_token else data,
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class AsyncStartProcessView(AsyncStartBaseView):
+    process_type = Process.SEQUENTIAL
+    guest_ttl_hours = 48
+
+
+class AsyncStartFreeProcessView(AsyncStartBaseView):
+    process_type = Process.FREE_FLOW
+
+    async def check_can_start(self, request, process):
+        if await ProcessInstance.objects.filter(process=process, started_by=request.user, status='running').aexists():
+            raise ValidationError({'detail': 'Process already started.'})
+
+
+class AsyncCurrentStepView(ReplicaReadMixin, AsyncAPIView):
+    replica_pin_kwarg = 'pk'
+    permission_classes = [AllowAny]
+    throttle_classes = [GuestInstanceRateThrottle]
+    throttle_scope = 'current_step'
+
+    async def get(self, request, *args, **kwargs):
+        instance = await (
+            ProcessInstance.objects
+            .select_related('current_step__form', 'process')
+            .prefetch_related('current_step__form__fields')
+            .filter(pk=self.kwargs['pk'])
+            .afirst()
+        )
+        if not instance:
+            raise ValidationError({'detail': 'Instance not found.'})
+        await arequire_guest_token_if_needed(request, instance)
+
+        step = instance.current_step
+        if not step:
+            return Response({'detail': 'Process completed.'})
+        ensure_form_password_if_private(step.form, request)
+        return Response(CurrentStepSerializer(step).data)
+
+
+class AsyncSubmitStepView(AsyncAPIView):
+    permission_classes = [AllowAny]
+    throttle_classes = [GuestInstanceRateThrottle]
+    throttle_scope = 'submit_step'
+
+    async def post(self, request, *args, **kwargs):
+        instance = await (
+            ProcessInstance.objects
+            .select_related('current_step__form', 'process')
+            .filter(pk=self.kwargs.get('pk'))
+            .afirst()
+        )
+        if not instance:
+            raise ValidationError({'detail': 'Instance not found.'})
+        await arequire_guest_token_if_needed(request, instance)
+
+        step = instance.current_step
+        if not step:
+            raise ValidationError({'detail': 'Process already completed.'})
+
+        payload = StepSubmitPayloadSerializer(data=request.data)
+        payload.is_valid(raise_exception=True)
+        ensure_form_password_if_private(step.form, request, payload.validated_data.get('password') or '')
+
+        await _submit_step(request, instance, step, payload.validated_data.get('answers') or {})
+        await instance.arefresh_from_db()
+
+        return Response(await _instance_data(instance), status=status.HTTP_201_CREATED)
+
+
+class AsyncCurrentStepsFreeView(ReplicaReadMixin, AsyncAPIView):
+    replica_pin_kwarg = 'pk'
+    permission_classes = [AllowAny]
+    throttle_classes = [GuestInstanceRateThrottle]
+    throttle_scope = 'current_step'
+
+    async def get(self, request, *args, **kwargs):
+        instance = await ProcessInstance.objects.select_related('process').filter(pk=self.kwargs['pk']).afirst()
+        if not instance:
+            raise ValidationError({'detail': 'Instance not found.'})
+        await arequire_guest_token_if_needed(request, instance)
+        if instance.process.type != Process.FREE_FLOW:
+            raise ValidationError({'detail': 'This endpoint is only for free-flow processes.'})
+
+        submitted_ids = {
+            step_id async for step_id in
+            StepSubmission.objects.filter(instance=instance).values_list('step_id', flat=True)
+        }
+        steps = [
+            step async for step in
+            ProcessStep.objects
+            .filter(process=instance.process)
+            .exclude(id__in=submitted_ids)
+            .select_related('form')
+            .prefetch_related('form__fields', 'form__categories')
+            .order_by('order')
+        ]
+        if not steps:
+            return Response({'detail': 'All steps completed.'})
+
+        for step in steps:
+            ensure_form_password_if_private(step.form, request)
+
+        serializer = FreeStepSerializer(
+            steps, many=True, context={'instance': instance, 'submitted_step_ids': submitted_ids},
+        )
+        return Response(await sync_to_async(lambda: serializer.data)())
@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from config.db_router import primary_reads
+
+CATALOG_VERSION_KEY = 'proc:catalog:version'
+
+
+def catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def cached_catalog_page(name, query, render):
+    key = f'proc:catalog:v{catalog_version()}:{name}:{query}'
+    data = cache.get(key)
+    if data is None:
+        with primary_reads():
+            data = render()
+        cache.set(key, data, timeout=settings.CACHE_TTL)
+    return data
@@ -0,0 +1,138 @@
+import secrets
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from apps.categories.models import ProcessCategory
+from apps.forms.models import Form, Field
+from apps.users.models import Profile
+from .catalog import bump_catalog_version
+from .models import Process, ProcessStep
+
+DEFINITION_VERSION = 1
+
+# Passwords never leave the account; imported private forms are given a new one.
+FORM_ATTRS = ['slug', 'name', 'description', 'access']
+FIELD_ATTRS = ['question', 'field_type', 'required', 'position', 'options', 'max_length', 'min_value', 'max_value']
+
+
+def export_processes(processes):
+    processes = processes.prefetch_related('steps__form__fields', 'categories')
+
+    forms = {}
+    out = []
+    for process in processes:
+        steps = []
+        for step in process.steps.all():
+            form = step.form
+            if form.slug not in forms:
+                forms[form.slug] = {
+                    **{attr: getattr(form, attr) for attr in FORM_ATTRS},
+                    'fields': [{attr: getattr(f, attr) for attr in FIELD_ATTRS} for f in form.fields.all()],
+                }
+            steps.append({
+                'order': step.order,
+                'title': step.title,
+                'allow_skip': step.allow_skip,
+                'form': form.slug,
+            })
+        out.append({
+            'title': process.title,
+            'type': process.type,
+            'is_active': process.is_active,
+            'categories': sorted(c.name for c in process.categories.all()),
+            'steps': steps,
+        })
+
+    return {'version': DEFINITION_VERSION, 'forms': list(forms.values()), 'processes': out}
+
+
+def _fresh_slugs(count, taken):
+    slugs = []
+    while len(slugs) < count:
+        candidates = {secrets.token_urlsafe(6)[:8] for _ in range(count - len(slugs))} - taken
+        candidates -= set(Form.objects.filter(slug__in=candidates).values_list('slug', flat=True))
+        taken |= candidates
+        slugs.extend(candidates)
+    return slugs
+
+
+def _import_forms(forms_data, user):
+    slugs = [f['slug'] for f in forms_data]
+    existing = {f.slug: f for f in Form.objects.filter(slug__in=slugs)}
+
+    by_slug = {}
+    new_forms, new_fields, renamed = [], [], []
+    for data in forms_data:
+        found = existing.get(data['slug'])
+        if found is not None and found.created_by_id == user.id:
+            by_slug[data['slug']] = found
+            continue
+
+        attrs = {attr: data.get(attr) for attr in FORM_ATTRS if attr in data}
+        attrs['password'] = data.get('password') or ''
+        if attrs.get('access') == Form.PRIVATE and not attrs['password'].strip():
+            raise ValidationError({'forms': f"Form {data['slug']} is private; set a new password for it."})
+        form = Form(created_by=user, **attrs)
+        if found is not None:
+            renamed.append(form)
+        by_slug[data['slug']] = form
+        new_forms.append((form, data.get('fields') or []))
+
+    for form, slug in zip(renamed, _fresh_slugs(len(renamed), set(slugs))):
+        form.slug = slug
+
+    Form.objects.bulk_create([form for form, _ in new_forms])
+    for form, fields in new_forms:
+        new_fields.extend(Field(form=form, **field) for field in fields)
+    Field.objects.bulk_create(new_fields)
+    return by_slug
+
+
+def _import_categories(names, user):
+    categories = {c.name: c for c in ProcessCategory.objects.filter(user=user, name__in=names)}
+    missing = [ProcessCategory(user=user, name=name) for name in names if name not in categories]
+    ProcessCategory.objects.bulk_create(missing)
+    categories.update({c.name: c for c in missing})
+    return categories
+
+
+def import_processes(bundle, user):
+    owner, _ = Profile.objects.get_or_create(user=user)
+
+    with transaction.atomic():
+        forms = _import_forms(bundle.get('forms', []), user)
+        categories = _import_categories(
+            sorted({name for p in bundle['processes'] for name in p.get('categories', [])}),
+            user,
+        )
+
+        processes = [
+            Process(owner=owner, title=p['title'], type=p['type'], is_active=p.get('is_active', True))
+            for p in bundle['processes']
+        ]
+        Process.objects.bulk_create(processes)
+
+        steps, memberships = [], []
+        Membership = ProcessCategory.process.through
+        for process, data in zip(processes, bundle['processes']):
+            steps.extend(
+                ProcessStep(
+                    process=process,
+                    form=forms[s['form']],
+                    title=s.get('title', ''),
+                    order=s['order'],
+                    allow_skip=s.get('allow_skip', False),
+                )
+                for s in data.get('steps', [])
+            )
+            memberships.extend(
+                Membership(processcategory=categories[name], process=process)
+                for name in data.get('categories', [])
+            )
+        ProcessStep.objects.bulk_create(steps)
+        Membership.objects.bulk_create(memberships)
+
+        transaction.on_commit(bump_catalog_version)
+
+    return processes
@@ -0,0 +1,39 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+EXPIRY_INDEX = 'proc:guest:expiry'
+
+
+def _index():
+    # A sorted set of guest instance ids scored by token expiry, so expiry
+    # jobs read only the due ids instead of scanning ProcessInstance.
+    return get_redis_connection('default'), cache.make_key(EXPIRY_INDEX)
+
+
+def register_guest_expiry(instance_id, expires_at):
+    client, key = _index()
+    client.zadd(key, {instance_id: expires_at.timestamp()})
+
+
+def register_guest_expiries(expiries):
+    # expiries maps instance id to expiry datetime.
+    if expiries:
+        client, key = _index()
+        client.zadd(key, {instance_id: expires_at.timestamp() for instance_id, expires_at in expiries.items()})
+
+
+# Reuses the django-redis pool; a redis.asyncio client would be bound to one
+# event loop, and under WSGI every request runs on a loop of its own.
+aregister_guest_expiry = sync_to_async(register_guest_expiry, thread_sensitive=False)
+
+
+def forget_guest_expiry(ids):
+    if ids:
+        client, key = _index()
+        client.zrem(key, *ids)
+
+
+def due_guest_ids(now, batch_size, offset=0):
+    client, key = _index()
+    return [int(i) for i in client.zrangebyscore(key, '-inf', now.timestamp(), start=offset, num=batch_size)]
@@ -0,0 +1,45 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.core import signing
+from django.core.cache import cache
+from django.utils import timezone
+
+TOKEN_SALT = 'apps.processes.guest-token'
+
+
+def sign_guest_token(instance):
+    payload = {
+        'i': instance.id,
+        'p': instance.process_id,
+        'e': int(instance.access_token_expires_at.timestamp()),
+    }
+    return signing.dumps(payload, salt=TOKEN_SALT)
+
+
+def read_guest_token(token):
+    # Tokens issued before signing was introduced are plain random strings
+    # and fail here; callers fall back to comparing them with the stored one.
+    try:
+        payload = signing.loads(token, salt=TOKEN_SALT)
+    except signing.BadSignature:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def _denylist_key(token):
+    return f'proc:guest:revoked:{hashlib.sha256(token.encode()).hexdigest()[:32]}'
+
+
+def revoke_guest_token(token, expires_at):
+    # Entries only need to outlive the token itself.
+    ttl = int((expires_at - timezone.now()).total_seconds()) + 1
+    if ttl > 0:
+        cache.set(_denylist_key(token), 1, timeout=ttl)
+
+
+def is_guest_token_revoked(token):
+    return cache.get(_denylist_key(token)) is not None
+
+
+ais_guest_token_revoked = sync_to_async(is_guest_token_revoked, thread_sensitive=False)
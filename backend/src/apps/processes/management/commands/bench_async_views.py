@@ -0,0 +1,141 @@
+import asyncio
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from rest_framework.test import APIRequestFactory
+
+from apps.processes.async_views import AsyncCurrentStepView, AsyncStartProcessView
+from apps.processes.models import Process
+from apps.processes.views import CurrentStepView, StartProcessView
+
+# Throttling is switched off so every variant measures the view itself.
+SYNC_VIEWS = {
+    'start': StartProcessView.as_view(throttle_classes=[]),
+    'current_step': CurrentStepView.as_view(throttle_classes=[]),
+}
+ASYNC_VIEWS = {
+    'start': AsyncStartProcessView.as_view(throttle_classes=[]),
+    'current_step': AsyncCurrentStepView.as_view(throttle_classes=[]),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the sync and async guest start/current-step views under concurrency: sync views on '
+        'WSGI worker threads, async views on WSGI worker threads and on one ASGI event loop '
+        '(creates guest instances)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('process', type=int, help='Id of an active sequential process to start.')
+        parser.add_argument('--flows', type=int, default=200, help='Guest flows (start + current step) per variant.')
+        parser.add_argument('--concurrency', type=int, default=20, help='Flows in flight at once.')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+
+    def handle(self, *args, **options):
+        pk = options['process']
+        if not Process.objects.filter(pk=pk, is_active=True, type=Process.SEQUENTIAL).exists():
+            raise CommandError(f'Process {pk} is not an active sequential process.')
+        self.factory = APIRequestFactory()
+        flows, concurrency = options['flows'], max(1, options['concurrency'])
+
+        results = {
+            'sync': self.run_threads(self.flow_sync, pk, flows, concurrency),
+            'async_wsgi': self.run_threads(self.flow_async_wsgi, pk, flows, concurrency),
+            'async_asgi': asyncio.run(self.run_asgi(pk, flows, concurrency)),
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps({'process': pk, 'concurrency': concurrency, **results}, indent=2))
+            return
+        for variant, r in results.items():
+            self.stdout.write(f"{variant:>10}: {r['flows_per_sec']:.1f} flows/s, {r['errors']} error(s)")
+            for endpoint in ('start', 'current_step'):
+                t = r[endpoint]
+                self.stdout.write(f"            {endpoint:<12} p50 {t['p50_ms']:.1f}ms, p99 {t['p99_ms']:.1f}ms")
+
+    def start_request(self, pk):
+        return self.factory.post(f'/api/processes/{pk}/start/')
+
+    def current_step_request(self, instance_id, token):
+        return self.factory.get(
+            f'/api/processes/instances/{instance_id}/current-step/', HTTP_X_INSTANCE_TOKEN=token,
+        )
+
+    def run_threads(self, run_flow, pk, flows, concurrency):
+        def flow(_):
+            try:
+                return run_flow(pk)
+            finally:
+                # Django closes the connection at the end of every request too.
+                connections.close_all()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            timings = list(pool.map(flow, range(flows)))
+        return self.summarise(timings, time.perf_counter() - started)
+
+    def flow_sync(self, pk):
+        return self.flow_threaded(pk, SYNC_VIEWS['start'], SYNC_VIEWS['current_step'])
+
+    def flow_async_wsgi(self, pk):
+        # Under WSGI Django drives async views through async_to_sync, one loop per request.
+        return self.flow_threaded(
+            pk, async_to_sync(ASYNC_VIEWS['start']), async_to_sync(ASYNC_VIEWS['current_step']),
+        )
+
+    def flow_threaded(self, pk, start, current_step):
+        t0 = time.perf_counter()
+        res = start(self.start_request(pk), pk=pk)
+        t1 = time.perf_counter()
+        if res.status_code != 201:
+            return None
+        instance_id, token = res.data['instance']['id'], res.data['access_token']
+        res = current_step(self.current_step_request(instance_id, token), pk=instance_id)
+        t2 = time.perf_counter()
+        return (t1 - t0, t2 - t1) if res.status_code == 200 else None
+
+    async def run_asgi(self, pk, flows, concurrency):
+        gate = asyncio.Semaphore(concurrency)
+
+        async def flow():
+            async with gate:
+                return await self.flow_asgi(pk)
+
+        started = time.perf_counter()
+        timings = await asyncio.gather(*(flow() for _ in range(flows)))
+        elapsed = time.perf_counter() - started
+        await sync_to_async(connections.close_all)()
+        return self.summarise(timings, elapsed)
+
+    async def flow_asgi(self, pk):
+        t0 = time.perf_counter()
+        res = await ASYNC_VIEWS['start'](self.start_request(pk), pk=pk)
+        t1 = time.perf_counter()
+        if res.status_code != 201:
+            return None
+        instance_id, token = res.data['instance']['id'], res.data['access_token']
+        res = await ASYNC_VIEWS['current_step'](self.current_step_request(instance_id, token), pk=instance_id)
+        t2 = time.perf_counter()
+        return (t1 - t0, t2 - t1) if res.status_code == 200 else None
+
+    def summarise(self, timings, elapsed):
+        ok = [t for t in timings if t is not None]
+        out = {
+            'flows': len(timings),
+            'errors': len(timings) - len(ok),
+            'elapsed_s': round(elapsed, 3),
+            'flows_per_sec': round(len(ok) / elapsed, 1) if elapsed else 0.0,
+        }
+        for index, endpoint in enumerate(('start', 'current_step')):
+            samples = sorted(t[index] for t in ok) or [0.0]
+            out[endpoint] = {
+                'p50_ms': round(statistics.median(samples) * 1000, 2),
+                'p99_ms': round(samples[max(0, int(len(samples) * 0.99) - 1)] * 1000, 2),
+            }
+        return out
@@ -0,0 +1,73 @@
+import json
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django_redis import get_redis_connection
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import ScopedRateThrottle
+from apps.processes.throttling import RedisScopedRateThrottle
+
+THROTTLES = {
+    'stock': ScopedRateThrottle,
+    'redis': RedisScopedRateThrottle,
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the stock ScopedRateThrottle against the Redis GCRA throttle (clears throttle keys)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000, help='Checks per throttle.')
+        parser.add_argument('--clients', type=int, default=1, help='Distinct client IPs to spread checks over.')
+        parser.add_argument('--scope', default='current_step', help='Throttle scope to exercise.')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+
+    def handle(self, *args, **options):
+        view = type('BenchView', (), {'throttle_scope': options['scope']})()
+        factory = APIRequestFactory()
+        requests = []
+        for i in range(max(1, options['clients'])):
+            request = factory.get('/', REMOTE_ADDR=f'10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}')
+            request.user = AnonymousUser()
+            requests.append(request)
+
+        results = {name: self.run(cls, requests, view, options['requests']) for name, cls in THROTTLES.items()}
+
+        if options['json']:
+            self.stdout.write(json.dumps({'scope': options['scope'], **results}, indent=2))
+            return
+        for name, r in results.items():
+            self.stdout.write(
+                f"{name:>5}: {r['checks_per_sec']:.0f} checks/s, p50 {r['p50_us']:.0f}us, "
+                f"p99 {r['p99_us']:.0f}us, {r['allowed']} allowed, {r['key_bytes']} bytes/key"
+            )
+
+    def run(self, cls, requests, view, total):
+        cache.delete_pattern('throttle*')
+        timings = []
+        allowed = 0
+        for i in range(total):
+            request = requests[i % len(requests)]
+            started = time.perf_counter()
+            allowed += cls().allow_request(request, view)
+            timings.append(time.perf_counter() - started)
+
+        # Both throttles store through the same Redis database, so the raw
+        # value length is the per-client state each check reads and writes.
+        throttle = cls()
+        throttle.scope = view.throttle_scope
+        key = cache.make_key(throttle.get_cache_key(requests[-1], view))
+        key_bytes = get_redis_connection('default').strlen(key)
+
+        timings.sort()
+        return {
+            'checks': total,
+            'allowed': allowed,
+            'checks_per_sec': round(total / sum(timings), 1),
+            'p50_us': round(statistics.median(timings) * 1e6, 1),
+            'p99_us': round(timings[int(len(timings) * 0.99) - 1] * 1e6, 1),
+            'key_bytes': key_bytes,
+        }
@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from apps.processes.expiry import due_guest_ids
+from apps.processes.models import ProcessInstance
+
+
+class Command(BaseCommand):
+    help = 'Cleanup expired guest instances'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Instances aborted per transaction.')
+        parser.add_argument('--sleep', type=float, default=0.0, help='Seconds to pause between batches.')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the expired instances.')
+        parser.add_argument(
+            '--scan', action='store_true',
+            help='Scan the table instead of the Redis expiry index, for instances started before it existed.',
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        # Served by the partial idx_procinst_guest_expiry index.
+        qs = ProcessInstance.objects.filter(
+            started_by__isnull=True,
+            access_token_expires_at__lt=now,
+            status='running'
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f'{qs.count()} expired guest instances would be aborted')
+            return
+
+        batch_size = max(1, options['batch_size'])
+        started = time.monotonic()
+        total = batches = offset = 0
+        while True:
+            # Aborted ids stay in the expiry index until the purge deletes
+            # them, so the index is paged rather than popped here.
+            due = None if options['scan'] else due_guest_ids(now, batch_size, offset)
+            if due == []:
+                break
+            with transaction.atomic():
+                locked = qs.select_for_update(skip_locked=True)
+                if due is None:
+                    locked = locked.order_by('access_token_expires_at')[:batch_size]
+                else:
+                    locked = locked.filter(id__in=due)
+                ids = list(locked.values_list('id', flat=True))
+                if ids:
+                    total += ProcessInstance.objects.filter(id__in=ids).update(status='aborted')
+            fetched = ids if due is None else due
+            if fetched:
+                batches += 1
+            if len(fetched) < batch_size:
+                break
+            offset += batch_size
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        elapsed = time.monotonic() - started
+        rate = total / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Aborted {total} expired guest instances in {batches} batch(es), {elapsed:.2f}s ({rate:.0f}/s)'
+        ))
@@ -0,0 +1,340 @@
+import io
+import multiprocessing
+import random
+import secrets
+import time
+from datetime import timedelta
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from apps.forms.models import Answer, Field, Form, Response
+from apps.processes.analytics import rebuild_step_rollups
+from apps.processes.catalog import bump_catalog_version
+from apps.processes.expiry import register_guest_expiries
+from apps.processes.models import Process, ProcessInstance, ProcessStep, StepSubmission
+from apps.reports.report_cache import bump_report_watermark
+from apps.reports.rollups import rebuild_form_rollups
+from apps.users.models import Profile
+
+WORDS = ['alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel', 'india', 'juliet']
+CHOICE_TYPES = ('select', 'checkbox')
+
+
+def weights(value):
+    # "text=2,select=3" -> {'text': 2.0, 'select': 3.0}
+    out = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in dict(Field.FIELD_TYPES):
+            raise ValueError(name)
+        out[name.strip()] = float(weight or 1)
+    return out
+
+
+def ratio(value):
+    value = float(value)
+    if not 0 <= value <= 1:
+        raise ValueError(value)
+    return value
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a seeded synthetic dataset of forms, responses, answers, process instances and step '
+        'submissions, written with COPY from parallel worker processes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='Same seed, same row contents.')
+        parser.add_argument('--label', default='Synthetic', help='Prefix for generated form and process names.')
+        parser.add_argument('--users', type=int, default=200, help='Registered respondents.')
+        parser.add_argument('--forms', type=int, default=10)
+        parser.add_argument('--fields', type=int, default=20, help='Fields per form.')
+        parser.add_argument('--field-types', type=weights, default='text=2,number=2,select=3,checkbox=2,date=1',
+                            help='Relative weights of field types.')
+        parser.add_argument('--options', type=int, default=5, help='Options per select/checkbox field.')
+        parser.add_argument('--option-skew', type=float, default=1.0,
+                            help='Zipf exponent for option popularity; 0 picks options uniformly.')
+        parser.add_argument('--answer-rate', type=ratio, default=0.9, help='Chance each field is answered.')
+        parser.add_argument('--responses', type=int, default=100000, help='Standalone form responses.')
+        parser.add_argument('--processes', type=int, default=4)
+        parser.add_argument('--steps', type=int, default=5, help='Steps per process.')
+        parser.add_argument('--free-ratio', type=ratio, default=0.25, help='Share of free-flow processes.')
+        parser.add_argument('--instances', type=int, default=20000, help='Process instances.')
+        parser.add_argument('--completion', type=ratio, default=0.6, help='Share of instances that finish.')
+        parser.add_argument('--drop-off', type=ratio, default=0.3,
+                            help='Chance an unfinished instance stops at each further step.')
+        parser.add_argument('--guest-ratio', type=ratio, default=0.8, help='Share of rows from guests.')
+        parser.add_argument('--expired-ratio', type=ratio, default=0.2,
+                            help='Share of guest instances whose token has already expired.')
+        parser.add_argument('--days', type=int, default=90, help='Spread start times over this many days.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows of responses or instances per job.')
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('generate_dataset writes with COPY and needs PostgreSQL.')
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            plan = self.create_schema(options)
+        jobs = self.jobs(options)
+
+        totals = dict.fromkeys(('responses', 'answers', 'instances', 'submissions'), 0)
+        workers = max(1, min(options['workers'], len(jobs)))
+        if workers == 1:
+            results = (run_job(plan, job) for job in jobs)
+            self.collect(results, totals, len(jobs), options['verbosity'])
+        else:
+            # Forked workers must not share the parent's database socket.
+            connections.close_all()
+            with multiprocessing.get_context('fork').Pool(workers) as pool:
+                results = pool.imap_unordered(partial(run_job, plan), jobs)
+                self.collect(results, totals, len(jobs), options['verbosity'])
+
+        # Jobs commit out of id order, so a rollup run during generation can
+        # move its watermark past a block that committed later.
+        rebuild_form_rollups(plan['form_ids'])
+        rebuild_step_rollups([process_id for process_id, _, _ in plan['processes']])
+        # COPY bypasses the post_save receivers that keep these caches fresh.
+        for form_id in plan['form_ids']:
+            bump_report_watermark(form_id)
+        bump_catalog_version()
+
+        elapsed = time.perf_counter() - started
+        rows = sum(totals.values())
+        self.stdout.write(
+            f"Generated {totals['responses']} responses, {totals['answers']} answers, "
+            f"{totals['instances']} instances and {totals['submissions']} submissions "
+            f"in {elapsed:.1f}s ({rows / elapsed:.0f} rows/s, {workers} worker(s))."
+        )
+
+    def collect(self, results, totals, total_jobs, verbosity):
+        for done, (counts, expiries) in enumerate(results, start=1):
+            for key, value in counts.items():
+                totals[key] += value
+            register_guest_expiries(expiries)
+            if verbosity > 1:
+                self.stdout.write(f'{done}/{total_jobs} jobs')
+
+    def create_schema(self, options):
+        rng = random.Random(f"{options['seed']}:schema")
+        User = get_user_model()
+
+        owner, _ = User.objects.get_or_create(username=f"{options['label'].lower()}-owner")
+        profile, _ = Profile.objects.get_or_create(user=owner)
+        # Respondents depend only on the seed, so reruns reuse them.
+        usernames = [f"respondent-{options['seed']}-{i}" for i in range(options['users'])]
+        User.objects.bulk_create([User(username=name) for name in usernames], ignore_conflicts=True)
+        user_ids = sorted(User.objects.filter(username__in=usernames).values_list('id', flat=True))
+
+        types, type_weights = zip(*options['field_types'].items())
+        option_names = [f'option {i + 1}' for i in range(options['options'])]
+        # Slugs only need to be unique, so they are not tied to the seed.
+        forms = Form.objects.bulk_create([
+            Form(name=f"{options['label']} form {i + 1}", created_by=owner, slug=secrets.token_urlsafe(6)[:8])
+            for i in range(options['forms'])
+        ])
+        fields = Field.objects.bulk_create([
+            Field(form=form, question=f'Question {position + 1}', field_type=field_type, position=position,
+                  options=option_names if field_type in CHOICE_TYPES else None)
+            for form in forms
+            for position, field_type in enumerate(rng.choices(types, type_weights, k=options['fields']))
+        ])
+
+        processes = Process.objects.bulk_create([
+            Process(
+                owner=profile,
+                title=f"{options['label']} process {i + 1}",
+                type=Process.FREE_FLOW if rng.random() < options['free_ratio'] else Process.SEQUENTIAL,
+            )
+            for i in range(options['processes'])
+        ])
+        steps = ProcessStep.objects.bulk_create([
+            ProcessStep(process=process, form=forms[(p * options['steps'] + o) % len(forms)],
+                        title=f'Step {o + 1}', order=o + 1)
+            for p, process in enumerate(processes) for o in range(options['steps'])
+        ]) if forms else []
+
+        skew = options['option_skew']
+        form_fields = {form.id: [] for form in forms}
+        for field in fields:
+            form_fields[field.form_id].append((field.id, field.field_type, field.options))
+        return {
+            'seed': options['seed'],
+            'user_ids': user_ids,
+            'form_ids': [form.id for form in forms],
+            'fields': form_fields,
+            'option_weights': [1 / (rank + 1) ** skew for rank in range(options['options'])],
+            'processes': [
+                (process.id, process.type, [(s.id, s.form_id) for s in steps if s.process_id == process.id])
+                for process in processes
+            ],
+            **{key: options[key] for key in (
+                'answer_rate', 'completion', 'drop_off', 'guest_ratio', 'expired_ratio', 'days',
+            )},
+        }
+
+    def jobs(self, options):
+        size = max(1, options['batch_size'])
+        sources = (
+            ('responses', options['responses'] if options['forms'] else 0),
+            ('instances', options['instances'] if options['processes'] else 0),
+        )
+        jobs = []
+        for kind, total in sources:
+            jobs += [(kind, index, min(size, total - start)) for index, start in enumerate(range(0, total, size))]
+        return jobs
+
+
+def run_job(plan, job):
+    kind, index, count = job
+    # Seeding per job, not per worker, keeps the rows identical for any --workers.
+    writer = _Writer(plan, random.Random(f"{plan['seed']}:{kind}:{index}"))
+    if kind == 'responses':
+        writer.responses(count)
+    else:
+        writer.instances(count)
+    with transaction.atomic():
+        counts = writer.flush()
+    return counts, writer.expiries
+
+
+class _Writer:
+    def __init__(self, plan, rng):
+        self.plan = plan
+        self.rng = rng
+        self.now = timezone.now()
+        self.response_rows = []
+        self.answer_rows = []
+        self.instance_rows = []
+        self.submission_rows = []
+        self.expiries = {}
+
+    def moment(self):
+        return self.now - timedelta(seconds=self.rng.uniform(0, self.plan['days'] * 86400))
+
+    def respondent(self):
+        if self.rng.random() < self.plan['guest_ratio'] or not self.plan['user_ids']:
+            return None
+        return self.rng.choice(self.plan['user_ids'])
+
+    def value(self, field_type, options):
+        rng = self.rng
+        if field_type == 'number':
+            return str(max(0, round(rng.gauss(50, 15))))
+        if field_type == 'date':
+            return (self.now - timedelta(days=rng.randrange(max(1, self.plan['days'])))).date().isoformat()
+        if field_type == 'select':
+            return rng.choices(options, self.plan['option_weights'])[0]
+        if field_type == 'checkbox':
+            picked = set(rng.choices(options, self.plan['option_weights'], k=rng.randint(1, 3)))
+            return ','.join(o for o in options if o in picked)
+        return ' '.join(rng.choices(WORDS, k=rng.randint(1, 4)))
+
+    def response(self, form_id, user_id, submitted_at):
+        # Ids are filled in at flush time once the block has been reserved.
+        self.response_rows.append([None, form_id, user_id, submitted_at])
+        row = len(self.response_rows) - 1
+        for field_id, field_type, options in self.plan['fields'][form_id]:
+            if self.rng.random() < self.plan['answer_rate']:
+                self.answer_rows.append([row, field_id, self.value(field_type, options or [])])
+        return row
+
+    def responses(self, count):
+        for _ in range(count):
+            self.response(self.rng.choice(self.plan['form_ids']), self.respondent(), self.moment())
+
+    def instances(self, count):
+        rng, plan = self.rng, self.plan
+        for _ in range(count):
+            process_id, process_type, steps = rng.choice(plan['processes'])
+            started_at = self.moment()
+            user_id = self.respondent()
+            if rng.random() < plan['completion']:
+                reached = len(steps)
+            else:
+                reached = 0
+                while reached < len(steps) - 1 and rng.random() >= plan['drop_off']:
+                    reached += 1
+            order = steps if process_type == Process.SEQUENTIAL else rng.sample(steps, len(steps))
+
+            at = started_at
+            submissions = []
+            for step_id, form_id in order[:reached]:
+                at += timedelta(minutes=rng.expovariate(1 / 30))
+                submissions.append((step_id, self.response(form_id, user_id, at), at))
+            done = reached == len(steps)
+            current = None if done or process_type != Process.SEQUENTIAL else order[reached][0]
+
+            expires = None
+            if user_id is None:
+                expired = rng.random() < plan['expired_ratio']
+                expires = self.now + (-1 if expired else 1) * timedelta(hours=rng.uniform(1, 48))
+            # guest_token_only_for_guest requires a token on every row, guest or not.
+            # Tokens must be unique across runs, so like slugs they are not seeded.
+            token = secrets.token_hex(16)
+            self.instance_rows.append([
+                None, process_id, user_id, 'completed' if done else 'running', current,
+                started_at, at if done else None, token, expires,
+            ])
+            self.submission_rows.append((len(self.instance_rows) - 1, submissions))
+
+    def flush(self):
+        with connection.cursor() as cursor:
+            for row, pk in zip(self.response_rows, reserve(cursor, Response, len(self.response_rows))):
+                row[0] = pk
+            for row, pk in zip(self.instance_rows, reserve(cursor, ProcessInstance, len(self.instance_rows))):
+                row[0] = pk
+                if row[2] is None:
+                    self.expiries[pk] = row[8]
+
+            copy(cursor, Response, ['id', 'form', 'user', 'submitted_at'], self.response_rows)
+            copy(cursor, Answer, ['response', 'field', 'value'], (
+                (self.response_rows[row][0], field_id, value) for row, field_id, value in self.answer_rows
+            ))
+            copy(cursor, ProcessInstance, [
+                'id', 'process', 'started_by', 'status', 'current_step',
+                'started_at', 'completed_at', 'access_token', 'access_token_expires_at',
+            ], self.instance_rows)
+            submission_rows = [
+                (self.instance_rows[row][0], step_id, self.response_rows[response][0], False, at)
+                for row, submissions in self.submission_rows
+                for step_id, response, at in submissions
+            ]
+            copy(cursor, StepSubmission, ['instance', 'step', 'form_response', 'skipped', 'submitted_at'],
+                 submission_rows)
+        return {
+            'responses': len(self.response_rows),
+            'answers': len(self.answer_rows),
+            'instances': len(self.instance_rows),
+            'submissions': len(submission_rows),
+        }
+
+
+def reserve(cursor, model, count):
+    if not count:
+        return []
+    table = model._meta.db_table
+    cursor.execute(
+        "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)", [table, count],
+    )
+    return [pk for (pk,) in cursor.fetchall()]
+
+
+def copy(cursor, model, names, rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(r'\N' if v is None else v.isoformat() if hasattr(v, 'isoformat') else str(v)
+                               for v in row))
+        buffer.write('\n')
+    if not buffer.tell():
+        return
+    buffer.seek(0)
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(model._meta.get_field(name).column) for name in names)
+    cursor.copy_expert(f'COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN', buffer)
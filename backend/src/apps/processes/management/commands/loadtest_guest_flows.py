@@ -0,0 +1,290 @@
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.forms.models import Field, Form
+from apps.processes.catalog import bump_catalog_version
+from apps.processes.models import Process, ProcessStep
+from apps.users.models import Profile
+
+FIELD_TYPES = ['text', 'number', 'select', 'checkbox', 'date']
+FIELD_VALUES = {'text': 'load test', 'number': '42', 'select': 'a', 'checkbox': 'true', 'date': '2025-01-01'}
+
+KINDS = {
+    Process.SEQUENTIAL: ('start', 'current_step', 'submit_step'),
+    Process.FREE_FLOW: ('free_start', 'current_steps', 'submit_free'),
+}
+
+
+def percentile(samples, p):
+    # Nearest-rank on an already sorted list.
+    if not samples:
+        return 0.0
+    return samples[max(0, math.ceil(len(samples) * p / 100) - 1)]
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def add(self, endpoint, elapsed, status):
+        with self.lock:
+            self.calls.setdefault(endpoint, []).append((elapsed, status))
+
+    def summary(self, endpoint, elapsed_total):
+        calls = self.calls.get(endpoint, [])
+        ok = sorted(t for t, code in calls if code is not None and code < 400)
+        errors = len(calls) - len(ok)
+        return {
+            'requests': len(calls),
+            'errors': errors,
+            'throttled': sum(1 for _, code in calls if code == 429),
+            'error_rate': round(errors / len(calls), 4) if calls else 0.0,
+            'requests_per_sec': round(len(calls) / elapsed_total, 1) if elapsed_total else 0.0,
+            'p50_ms': round(percentile(ok, 50) * 1000, 2),
+            'p95_ms': round(percentile(ok, 95) * 1000, 2),
+            'p99_ms': round(percentile(ok, 99) * 1000, 2),
+        }
+
+
+def compare(baseline, current):
+    """Percentage change per kind and endpoint; positive latency deltas are regressions."""
+    out = {}
+    for kind, result in current['results'].items():
+        before = baseline.get('results', {}).get(kind)
+        if not before:
+            continue
+        deltas = {'flows_per_sec': _change(before['flows_per_sec'], result['flows_per_sec'])}
+        for endpoint, now in result['endpoints'].items():
+            was = before['endpoints'].get(endpoint)
+            if was:
+                deltas[endpoint] = {
+                    key: _change(was[key], now[key])
+                    for key in ('requests_per_sec', 'p50_ms', 'p95_ms', 'p99_ms', 'error_rate')
+                }
+        out[kind] = deltas
+    return out
+
+
+def _change(before, after):
+    if not before:
+        return None
+    return round((after - before) / before * 100, 1)
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive guest flows (start, current step, submit until complete) against a running server over HTTP '
+        'and report per-endpoint throughput, latency percentiles and error rates (creates guest instances)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8000', help='Server to load.')
+        parser.add_argument('--kind', choices=['sequential', 'free', 'both'], default='both')
+        parser.add_argument('--flows', type=int, default=100, help='Guest journeys per process kind.')
+        parser.add_argument('--concurrency', type=int, default=10, help='Journeys in flight at once.')
+        parser.add_argument('--steps', type=int, default=5, help='Steps in each generated process.')
+        parser.add_argument('--fields', type=int, default=10, help='Fields on each generated step form.')
+        parser.add_argument('--process', type=int, help='Use this sequential process instead of generating one.')
+        parser.add_argument('--free-process', type=int, help='Use this free-flow process instead of generating one.')
+        parser.add_argument('--password', default='', help='Password sent for private forms.')
+        parser.add_argument('--timeout', type=float, default=10.0, help='Per-request timeout in seconds.')
+        parser.add_argument('--output', help='Write the JSON report to this file.')
+        parser.add_argument('--baseline', help='JSON report from an earlier run to compare against.')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON.')
+
+    def handle(self, *args, **options):
+        self.base_url = options['base_url'].rstrip('/')
+        self.timeout = options['timeout']
+        self.password = options['password']
+        flows, concurrency = max(1, options['flows']), max(1, options['concurrency'])
+
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as fh:
+                baseline = json.load(fh)
+
+        targets = {}
+        if options['kind'] in ('sequential', 'both'):
+            targets[Process.SEQUENTIAL] = options['process'] or self.create_process(
+                Process.SEQUENTIAL, options['steps'], options['fields'],
+            )
+        if options['kind'] in ('free', 'both'):
+            targets[Process.FREE_FLOW] = options['free_process'] or self.create_process(
+                Process.FREE_FLOW, options['steps'], options['fields'],
+            )
+        for kind, pk in targets.items():
+            if not Process.objects.filter(pk=pk, type=kind, is_active=True).exists():
+                raise CommandError(f'Process {pk} is not an active {kind} process.')
+
+        report = {
+            'base_url': self.base_url,
+            'flows': flows,
+            'concurrency': concurrency,
+            'results': {kind: self.run(kind, pk, flows, concurrency) for kind, pk in targets.items()},
+        }
+        if baseline is not None:
+            report['compare'] = compare(baseline, report)
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.print_report(report)
+
+    def create_process(self, kind, steps, fields):
+        user, _ = get_user_model().objects.get_or_create(username='loadtest', defaults={'email': 'loadtest@example.com'})
+        profile, _ = Profile.objects.get_or_create(user=user)
+        process = Process.objects.create(owner=profile, title=f'Load test {kind} {steps}x{fields}', type=kind)
+        forms = [Form.objects.create(name=f'Load test step {order}', created_by=user) for order in range(1, steps + 1)]
+        Field.objects.bulk_create([
+            Field(
+                form=form,
+                question=f'Q{position}',
+                field_type=FIELD_TYPES[position % len(FIELD_TYPES)],
+                position=position,
+                options=['a', 'b', 'c'] if FIELD_TYPES[position % len(FIELD_TYPES)] == 'select' else None,
+            )
+            for form in forms for position in range(fields)
+        ])
+        ProcessStep.objects.bulk_create([
+            ProcessStep(process=process, form=form, title=form.name, order=order)
+            for order, form in enumerate(forms, start=1)
+        ])
+        bump_catalog_version()
+        return process.pk
+
+    def run(self, kind, pk, flows, concurrency):
+        recorder = Recorder()
+        local = threading.local()
+        journey = self.sequential_flow if kind == Process.SEQUENTIAL else self.free_flow
+
+        def flow(_):
+            if not hasattr(local, 'session'):
+                local.session = requests.Session()
+            return journey(local.session, recorder, pk)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(flow, range(flows)))
+        elapsed = time.perf_counter() - started
+
+        completed = sum(outcomes)
+        total_requests = sum(len(calls) for calls in recorder.calls.values())
+        return {
+            'process': pk,
+            'flows': flows,
+            'completed': completed,
+            'failed': flows - completed,
+            'elapsed_s': round(elapsed, 3),
+            'flows_per_sec': round(completed / elapsed, 2) if elapsed else 0.0,
+            'requests_per_sec': round(total_requests / elapsed, 1) if elapsed else 0.0,
+            'endpoints': {endpoint: recorder.summary(endpoint, elapsed) for endpoint in KINDS[kind]},
+        }
+
+    def call(self, session, recorder, endpoint, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            res = session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+        except requests.RequestException:
+            recorder.add(endpoint, time.perf_counter() - started, None)
+            return None
+        recorder.add(endpoint, time.perf_counter() - started, res.status_code)
+        return res
+
+    def answers(self, form):
+        return {str(field['id']): FIELD_VALUES.get(field.get('field_type'), 'x') for field in form['fields']}
+
+    def sequential_flow(self, session, recorder, pk):
+        res = self.call(session, recorder, 'start', 'post', f'/api/processes/{pk}/start/')
+        if res is None or res.status_code != 201:
+            return False
+        body = res.json()
+        instance_id = body['instance']['id']
+        headers = {'X-Instance-Token': body['access_token']}
+        seen = set()
+
+        while True:
+            res = self.call(
+                session, recorder, 'current_step', 'get', f'/api/processes/instances/{instance_id}/current-step/',
+                headers=headers, params={'password': self.password} if self.password else None,
+            )
+            if res is None or res.status_code != 200:
+                return False
+            step = res.json()
+            if 'form' not in step:
+                return True
+            if step['id'] in seen:
+                return False
+            seen.add(step['id'])
+
+            res = self.call(
+                session, recorder, 'submit_step', 'post', f'/api/processes/instances/{instance_id}/submit-step/',
+                headers=headers, json={'answers': self.answers(step['form']), 'password': self.password},
+            )
+            if res is None or res.status_code != 201:
+                return False
+            if res.json().get('status') == 'completed':
+                return True
+
+    def free_flow(self, session, recorder, pk):
+        res = self.call(session, recorder, 'free_start', 'post', f'/api/processes/free/{pk}/start/')
+        if res is None or res.status_code != 201:
+            return False
+        body = res.json()
+        instance_id = body['instance']['id']
+        headers = {'X-Instance-Token': body['access_token']}
+        seen = set()
+
+        while True:
+            res = self.call(
+                session, recorder, 'current_steps', 'get', f'/api/processes/instances/{instance_id}/current-steps/',
+                headers=headers, params={'password': self.password} if self.password else None,
+            )
+            if res is None or res.status_code != 200:
+                return False
+            steps = res.json()
+            if not isinstance(steps, list):
+                return True
+            step = steps[0]
+            if step['id'] in seen:
+                return False
+            seen.add(step['id'])
+
+            res = self.call(
+                session, recorder, 'submit_free', 'post', f'/api/processes/instances/{instance_id}/submit-free/',
+                headers=headers,
+                json={'step': step['id'], 'answers': self.answers(step['form']), 'password': self.password},
+            )
+            if res is None or res.status_code != 201:
+                return False
+
+    def print_report(self, report):
+        for kind, r in report['results'].items():
+            self.stdout.write(
+                f"{kind} (process {r['process']}): {r['completed']}/{r['flows']} flows, "
+                f"{r['flows_per_sec']:.1f} flows/s, {r['requests_per_sec']:.1f} req/s"
+            )
+            deltas = report.get('compare', {}).get(kind, {})
+            for endpoint, t in r['endpoints'].items():
+                line = (
+                    f"  {endpoint:<14} {t['requests_per_sec']:>8.1f} req/s  p50 {t['p50_ms']:.1f}ms  "
+                    f"p95 {t['p95_ms']:.1f}ms  p99 {t['p99_ms']:.1f}ms  errors {t['error_rate']:.2%}"
+                )
+                if endpoint in deltas:
+                    d = deltas[endpoint]
+                    line += f"  (req/s {_signed(d['requests_per_sec'])}, p95 {_signed(d['p95_ms'])})"
+                self.stdout.write(line)
+
+
+def _signed(value):
+    return 'n/a' if value is None else f'{value:+.1f}%'
@@ -0,0 +1,14 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('processes', '0002_alter_processinstance_access_token'),
+        ('processes', '0002_processstep_allow_skip_stepsubmission_skipped_and_more'),
+    ]
+
+    operations = [
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('processes', '0003_merge_20261019_1620'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='processinstance',
+            index=models.Index(fields=['process', '-started_at', '-id'], name='idx_procinst_proc_started'),
+        ),
+    ]
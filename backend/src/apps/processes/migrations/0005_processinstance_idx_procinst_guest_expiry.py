@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('processes', '0004_processinstance_idx_procinst_proc_started'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='processinstance',
+            index=models.Index(condition=models.Q(('started_by__isnull', True), ('status', 'running')), fields=['access_token_expires_at'], name='idx_procinst_guest_expiry'),
+        ),
+    ]
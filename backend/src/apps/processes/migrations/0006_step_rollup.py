@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('processes', '0005_processinstance_idx_procinst_guest_expiry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StepRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('submitted_count', models.PositiveIntegerField(default=0)),
+                ('skipped_count', models.PositiveIntegerField(default=0)),
+                ('elapsed_buckets', models.JSONField(blank=True, default=dict)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='processinstance',
+            index=models.Index(fields=['process', 'current_step'], name='idx_procinst_proc_step'),
+        ),
+        migrations.AddField(
+            model_name='steprollup',
+            name='step',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rollup', to='processes.processstep'),
+        ),
+    ]
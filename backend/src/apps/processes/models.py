@@ -1,5 +1,3 @@
-import secrets
-
 from django.db import models
 from django.db.models import Q
 from django.core.validators import MinValueValidator
@@ -9,6 +7,7 @@ from datetime import timedelta
 
 from apps.forms.models import Form
 from apps.users.models import Profile
+from .guest_tokens import revoke_guest_token, sign_guest_token
 
 
 class Process(models.Model):
@@ -132,21 +131,41 @@ class ProcessInstance(models.Model):
         if self.access_token and not force:
             return
 
-        self.access_token = secrets.token_urlsafe(48)
+        previous, previous_expiry = self.access_token, self.access_token_expires_at
         self.access_token_expires_at = timezone.now() + timedelta(hours=ttl_hours)
+        self.access_token = sign_guest_token(self)
         self.save(update_fields=['access_token', 'access_token_expires_at'])
+        if previous and previous_expiry:
+            revoke_guest_token(previous, previous_expiry)
 
     def save(self, *args, **kwargs):
-        if self.started_by is None and not self.access_token:
-            self.access_token = secrets.token_urlsafe(48)
-            self.access_token_expires_at = timezone.now() + timedelta(hours=24)
+        needs_token = self.started_by_id is None and not self.access_token
+        if needs_token:
+            if not self.access_token_expires_at:
+                self.access_token_expires_at = timezone.now() + timedelta(hours=24)
+            if self.pk is not None:
+                self.access_token = sign_guest_token(self)
+                if kwargs.get('update_fields') is not None:
+                    kwargs['update_fields'] = {*kwargs['update_fields'], 'access_token', 'access_token_expires_at'}
         super().save(*args, **kwargs)
+        if needs_token and not self.access_token:
+            # The signed token embeds the instance id, so a new row gets it right
+            # after the insert, without a second save() and its signals.
+            self.access_token = sign_guest_token(self)
+            type(self).objects.filter(pk=self.pk).update(access_token=self.access_token)
 
     class Meta:
         ordering = ['-started_at']
         indexes = [
             models.Index(fields=['process', 'status'], name='idx_procinst_proc_status'),
             models.Index(fields=['access_token'], name='idx_procinst_token'),
+            models.Index(fields=['process', '-started_at', '-id'], name='idx_procinst_proc_started'),
+            models.Index(fields=['process', 'current_step'], name='idx_procinst_proc_step'),
+            models.Index(
+                fields=['access_token_expires_at'],
+                name='idx_procinst_guest_expiry',
+                condition=Q(status='running', started_by__isnull=True),
+            ),
         ]
         constraints = [
             models.CheckConstraint(
@@ -171,3 +190,14 @@ class StepSubmission(models.Model):
 
     def __str__(self):
         return f'{self.instance} / {self.step}'
+
+
+class StepRollup(models.Model):
+    step = models.OneToOneField('ProcessStep', on_delete=models.CASCADE, related_name='rollup')
+    submitted_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0)
+    # Seconds from instance start to submission, counted per log-scale bucket.
+    elapsed_buckets = models.JSONField(default=dict, blank=True)
+
+    def __str__(self):
+        return f'{self.step}: {self.submitted_count} submitted, {self.skipped_count} skipped'
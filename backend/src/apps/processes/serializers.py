@@ -1,6 +1,8 @@
+from django.db import transaction
 from django.db.models import Max
 from rest_framework import serializers
 from apps.users.models import Profile
+from .catalog import bump_catalog_version
 from .models import Process, ProcessStep, ProcessInstance, StepSubmission
 from apps.forms.models import Form, Field
 from apps.forms.serializer import FormSerializer
@@ -15,6 +17,7 @@ class StepInlineWriteSerializer(serializers.Serializer):
     form = serializers.PrimaryKeyRelatedField(queryset=Form.objects.all())
     title = serializers.CharField(max_length=255, required=False, allow_blank=True)
     order = serializers.IntegerField(required=False, min_value=1)
+    allow_skip = serializers.BooleanField(required=False, default=False)
 
 
 class ProcessStepSerializer(serializers.ModelSerializer):
@@ -33,8 +36,7 @@ class ProcessSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
     def get_categories(self, obj):
-        qs = ProcessCategory.objects.filter(process=obj)
-        return [{'id': c.id, 'name': c.name} for c in qs]
+        return [{'id': c.id, 'name': c.name} for c in obj.categories.all()]
 
 class ProcessInstanceSerializer(serializers.ModelSerializer):
     started_by = serializers.PrimaryKeyRelatedField(read_only=True)
@@ -50,6 +52,20 @@ class ProcessInstanceSerializer(serializers.ModelSerializer):
         read_only_fields = ['started_by', 'status', 'started_at', 'completed_at']
 
 
+class OwnerInstanceSerializer(serializers.ModelSerializer):
+    process_title = serializers.CharField(source='process.title', read_only=True)
+    steps_done = serializers.IntegerField(read_only=True)
+    steps_total = serializers.IntegerField(read_only=True)
+    progress = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = ProcessInstance
+        fields = [
+            'id', 'process', 'process_title', 'started_by', 'status', 'current_step',
+            'started_at', 'completed_at', 'steps_done', 'steps_total', 'progress'
+        ]
+
+
 class StepSubmissionSerializer(serializers.ModelSerializer):
     class Meta:
         model = StepSubmission
@@ -93,20 +109,27 @@ class ProcessWriteSerializer(serializers.ModelSerializer):
         steps_data = validated_data.pop('steps', [])
         categories = validated_data.pop('category_ids', [])
 
-        process = Process.objects.create(owner=owner_profile, **validated_data)
+        with transaction.atomic():
+            process = Process.objects.create(owner=owner_profile, **validated_data)
 
-        if categories:
-            for cat in categories:
-                cat.process.add(process)
+            if categories:
+                process.categories.add(*categories)
 
-        next_order = 1
-        for item in steps_data:
-            form = item['form']
-            title = item.get('title', '')
-            order = item.get('order') or next_order
-            allow_skip = item.get('allow_skip', False)
-            ProcessStep.objects.create(process=process,form=form,title=title,order=order,allow_skip=allow_skip)
-            next_order = max(next_order + 1, order + 1)
+            steps = []
+            next_order = 1
+            for item in steps_data:
+                order = item.get('order') or next_order
+                steps.append(ProcessStep(
+                    process=process,
+                    form=item['form'],
+                    title=item.get('title', ''),
+                    order=order,
+                    allow_skip=item.get('allow_skip', False),
+                ))
+                next_order = max(next_order + 1, order + 1)
+            ProcessStep.objects.bulk_create(steps)
+
+            transaction.on_commit(bump_catalog_version)
 
         return process
 
@@ -120,15 +143,20 @@ class ProcessWriteSerializer(serializers.ModelSerializer):
         instance.save()
 
         if categories is not None:
-            old_cats = ProcessCategory.objects.filter(process=instance)
-            for c in old_cats:
-                c.process.remove(instance)
-            for c in categories:
-                c.process.add(instance)
+            instance.categories.set(categories)
 
         return instance
 
 
+class StepReorderSerializer(serializers.Serializer):
+    steps = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def validate_steps(self, value):
+        if len(value) != len(set(value)):
+            raise serializers.ValidationError('Duplicate step ids are not allowed.')
+        return value
+
+
 class ProcessStepWriteSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProcessStep
@@ -240,4 +268,67 @@ class StepSubmitJSONSerializer(serializers.Serializer):
         child=serializers.CharField(allow_blank=True),
         help_text='dict of {field_id: value}'
     )
-    password = serializers.CharField(required=False, allow_blank=True)
\ No newline at end of file
+    password = serializers.CharField(required=False, allow_blank=True)
+
+
+class FieldDefinitionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Field
+        fields = ['question', 'field_type', 'required', 'position', 'options', 'max_length', 'min_value', 'max_value']
+
+
+class FormDefinitionSerializer(serializers.ModelSerializer):
+    slug = serializers.SlugField(max_length=8)
+    password = serializers.CharField(max_length=64, required=False, allow_blank=True, write_only=True)
+    fields = FieldDefinitionSerializer(many=True, required=False)
+
+    class Meta:
+        model = Form
+        fields = ['slug', 'name', 'description', 'access', 'password', 'fields']
+
+    def validate_fields(self, value):
+        positions = [f.get('position', 0) for f in value]
+        if len(positions) != len(set(positions)):
+            raise serializers.ValidationError('Duplicate field positions are not allowed.')
+        return value
+
+
+class StepDefinitionSerializer(serializers.Serializer):
+    order = serializers.IntegerField(min_value=1)
+    title = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    allow_skip = serializers.BooleanField(required=False, default=False)
+    form = serializers.SlugField(max_length=8)
+
+
+class ProcessDefinitionSerializer(serializers.Serializer):
+    title = serializers.CharField(max_length=255)
+    type = serializers.ChoiceField(choices=Process.TYPE_CHOICES, default=Process.SEQUENTIAL)
+    is_active = serializers.BooleanField(required=False, default=True)
+    categories = serializers.ListField(child=serializers.CharField(max_length=255), required=False, default=list)
+    steps = StepDefinitionSerializer(many=True, required=False, default=list)
+
+    def validate_steps(self, value):
+        orders = [s['order'] for s in value]
+        if len(orders) != len(set(orders)):
+            raise serializers.ValidationError('Duplicate orders are not allowed.')
+        return value
+
+    def validate_categories(self, value):
+        return list(dict.fromkeys(value))
+
+
+class ProcessBundleSerializer(serializers.Serializer):
+    version = serializers.IntegerField(required=False)
+    forms = FormDefinitionSerializer(many=True, required=False, default=list)
+    processes = ProcessDefinitionSerializer(many=True)
+
+    def validate(self, attrs):
+        slugs = [f['slug'] for f in attrs['forms']]
+        if len(slugs) != len(set(slugs)):
+            raise serializers.ValidationError({'forms': 'Duplicate form slugs are not allowed.'})
+        missing = {
+            s['form'] for p in attrs['processes'] for s in p['steps']
+        } - set(slugs)
+        if missing:
+            raise serializers.ValidationError({'processes': f'Unknown form slugs: {", ".join(sorted(missing))}.'})
+        return attrs
@@ -1,7 +1,13 @@
-from django.db.models.signals import post_save, post_delete
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 
-from .models import StepSubmission
+from apps.categories.models import ProcessCategory
+from config.db_router import pin_instance
+from .catalog import bump_catalog_version
+from .models import Process, ProcessInstance, ProcessStep, StepSubmission
 
 
 @receiver(post_save, sender=StepSubmission)
@@ -21,3 +27,29 @@ def on_step_submission_deleted(sender, instance, **kwargs):
         inst.status = 'running'
         inst.completed_at = None
         inst.save(update_fields=['status', 'completed_at'])
+
+
+@receiver(post_save, sender=Process)
+@receiver(post_delete, sender=Process)
+@receiver(post_save, sender=ProcessStep)
+@receiver(post_delete, sender=ProcessStep)
+@receiver(post_save, sender=ProcessCategory)
+@receiver(post_delete, sender=ProcessCategory)
+def on_catalog_changed(sender, **kwargs):
+    # On commit, so a page built from pre-commit rows is never cached under the new version.
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(m2m_changed, sender=ProcessCategory.process.through)
+def on_catalog_categories_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=ProcessInstance)
+@receiver(post_save, sender=StepSubmission)
+@receiver(post_delete, sender=StepSubmission)
+def on_instance_written(sender, instance, **kwargs):
+    instance_id = instance.pk if sender is ProcessInstance else instance.instance_id
+    # Start the pin window at commit, when the write begins replicating.
+    transaction.on_commit(partial(pin_instance, instance_id))
@@ -1,22 +1,129 @@
-from datetime import timedelta
+import logging
+import time
+
 from django.utils import timezone
 from celery import shared_task
-from django.db import transaction
-from django.core.cache import cache
+from django.db import connection, transaction
+
+from .analytics import rollup_step_submissions
+from .expiry import due_guest_ids, forget_guest_expiry, register_guest_expiries
+from .models import ProcessInstance, StepSubmission
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = 1000
+
+
+def expired_guest_instances(now):
+    return ProcessInstance.objects.filter(
+        started_by__isnull=True,
+        access_token__isnull=False,
+        access_token_expires_at__lt=now,
+    )
+
+
+def delete_submissions(instance_ids):
+    # The StepSubmission post_delete receiver only reopens completed
+    # instances, which is moot here, so skip the per-row cascade.
+    table = connection.ops.quote_name(StepSubmission._meta.db_table)
+    column = connection.ops.quote_name(StepSubmission._meta.get_field('instance').column)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE {column} = ANY(%s)', [list(instance_ids)])
+
+
+def purge_batch(ids, now):
+    # Rows another worker holds are skipped; they are picked up on the next run.
+    with transaction.atomic():
+        locked = list(
+            expired_guest_instances(now)
+            .select_for_update(skip_locked=True)
+            .filter(id__in=ids)
+            .values_list('id', flat=True)
+        )
+        if locked:
+            delete_submissions(locked)
+            ProcessInstance.objects.filter(id__in=locked).delete()
+    return len(locked)
+
+
+def iter_expired_batches(now, batch_size=PURGE_BATCH_SIZE):
+    last_id = 0
+    while True:
+        ids = list(
+            expired_guest_instances(now)
+            .filter(id__gt=last_id)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return
+        yield ids
+        if len(ids) < batch_size:
+            return
+        last_id = ids[-1]
+
+
+def iter_due_batches(now, batch_size=PURGE_BATCH_SIZE):
+    offset = 0
+    while True:
+        ids = due_guest_ids(now, batch_size, offset)
+        if not ids:
+            return
+        yield ids
+        # Ids still expired after the batch were locked elsewhere; leave them
+        # in the index for the next run and page past them. Ids whose token
+        # was extended are re-scored, and the rest are gone for good.
+        expiries = dict(
+            ProcessInstance.objects
+            .filter(id__in=ids, started_by__isnull=True, access_token__isnull=False, access_token_expires_at__isnull=False)
+            .values_list('id', 'access_token_expires_at')
+        )
+        remaining = {i for i, expires_at in expiries.items() if expires_at < now}
+        register_guest_expiries({i: expires_at for i, expires_at in expiries.items() if i not in remaining})
+        forget_guest_expiry([i for i in ids if i not in expiries])
+        offset += len(remaining)
+        if len(ids) < batch_size:
+            return
 
-from .models import ProcessInstance
 
 @shared_task
-def purge_expired_guest_instances():
+def purge_expired_guest_instances(batch_size=PURGE_BATCH_SIZE, scan=False):
+    """
+    Delete expired guest instances listed in the Redis expiry index.
+
+    scan=True walks the table instead, for instances started before they
+    were registered in the index.
+    """
     now = timezone.now()
-    with transaction.atomic():
-        qs = ProcessInstance.objects.select_for_update(skip_locked=True).filter(
-            started_by__isnull=True,
-            access_token__isnull=False,
-            access_token_expires_at__lt=now,
+    started = time.monotonic()
+    total = 0
+
+    batches = iter_expired_batches(now, batch_size) if scan else iter_due_batches(now, batch_size)
+    for batch, ids in enumerate(batches, start=1):
+        batch_started = time.monotonic()
+        deleted = purge_batch(ids, now)
+        total += deleted
+        logger.info(
+            'guest purge batch',
+            extra={
+                'batch': batch,
+                'candidates': len(ids),
+                'deleted': deleted,
+                'deleted_total': total,
+                'duration_ms': round((time.monotonic() - batch_started) * 1000, 1),
+            },
         )
-        for inst in qs.iterator(chunk_size=500):
-            if inst.access_token:
-                cache.delete(f'proc:guest:{inst.id}:token')
-                cache.delete(f'proc:guest:bytoken:{inst.access_token}')
-            inst.delete()
\ No newline at end of file
+
+    elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+    return f'Purged {total} expired guest instance(s) in {elapsed_ms}ms'
+
+
+@shared_task
+def rollup_step_funnels(batch_size=5000, max_batches=20):
+    total = 0
+    for _ in range(max_batches):
+        rolled = rollup_step_submissions(batch_size=batch_size)
+        total += rolled
+        if rolled < batch_size:
+            break
+    return f'Rolled up {total} step submission(s)'
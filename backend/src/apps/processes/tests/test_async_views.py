@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.urls import resolve, reverse
+from rest_framework.test import APIRequestFactory
+
+from apps.forms.models import Answer, Field, Response as FormResponse
+from apps.processes.async_views import AsyncCurrentStepView
+from apps.processes.models import ProcessInstance
+from apps.processes.views import CurrentStepView, StartProcessView, SubmitStepView
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def start_guest(api, proc):
+    res = api.post(reverse('process-start', kwargs={'pk': proc.pk}))
+    assert res.status_code == 201
+    return res.data['instance']['id'], res.data['access_token']
+
+
+@pytest.mark.parametrize('name, kwargs', [
+    ('process-start', {'pk': 1}),
+    ('free-process-start', {'pk': 1}),
+    ('current-step', {'pk': 1}),
+    ('submit-step', {'pk': 1}),
+    ('free-current-steps', {'pk': 1}),
+])
+def test_hot_routes_resolve_to_coroutine_views(name, kwargs):
+    view = resolve(reverse(name, kwargs=kwargs)).func
+    assert asyncio.iscoroutinefunction(view)
+
+
+@pytest.mark.django_db
+def test_async_submit_saves_answers_and_advances(api, process_with_two_steps):
+    proc, s1, s2 = process_with_two_steps
+    field = Field.objects.create(form=s1.form, question='Name', field_type='text')
+    instance_id, token = start_guest(api, proc)
+
+    res = api.post(
+        reverse('submit-step', kwargs={'pk': instance_id}),
+        {'answers': {str(field.id): 'Ada'}, 'token': token},
+        format='json',
+    )
+
+    assert res.status_code == 201
+    assert res.data['current_step']['id'] == s2.id
+    assert Answer.objects.get(field=field).value == 'Ada'
+    assert ProcessInstance.objects.get(pk=instance_id).current_step_id == s2.id
+
+
+@pytest.mark.django_db
+def test_async_submit_rejects_foreign_field_before_writing(api, process_with_two_steps):
+    proc, s1, s2 = process_with_two_steps
+    other = Field.objects.create(form=s2.form, question='Other', field_type='text')
+    instance_id, token = start_guest(api, proc)
+
+    res = api.post(
+        reverse('submit-step', kwargs={'pk': instance_id}),
+        {'answers': {str(other.id): 'x'}, 'token': token},
+        format='json',
+    )
+
+    assert res.status_code == 400
+    assert not FormResponse.objects.filter(form=s1.form).exists()
+    assert ProcessInstance.objects.get(pk=instance_id).current_step_id == s1.id
+
+
+@pytest.mark.django_db
+def test_async_views_honour_revoked_tokens(api, process_with_two_steps):
+    proc, s1, _ = process_with_two_steps
+    instance_id, token = start_guest(api, proc)
+    ProcessInstance.objects.get(pk=instance_id).issue_guest_token(force=True)
+
+    res = api.get(reverse('current-step', kwargs={'pk': instance_id}), {'token': token})
+
+    assert res.status_code == 400
+
+
+
+def test_async_views_refuse_methods_outside_http_method_names():
+    view = AsyncCurrentStepView.as_view(http_method_names=['get'])
+    res = async_to_sync(view)(APIRequestFactory().options('/'), pk=1)
+    assert res.status_code == 405
+
+
+@pytest.mark.django_db
+def test_sync_views_run_the_same_guest_flow(process_with_two_steps):
+    # bench_async_views measures these against the async views.
+    proc, s1, s2 = process_with_two_steps
+    field = Field.objects.create(form=s1.form, question='Name', field_type='text')
+    factory = APIRequestFactory()
+
+    res = StartProcessView.as_view(throttle_classes=[])(factory.post('/'), pk=proc.pk)
+    assert res.status_code == 201
+    instance_id, token = res.data['instance']['id'], res.data['access_token']
+
+    res = CurrentStepView.as_view(throttle_classes=[])(factory.get('/', HTTP_X_INSTANCE_TOKEN=token), pk=instance_id)
+    assert res.data['id'] == s1.id
+
+    res = SubmitStepView.as_view(throttle_classes=[])(
+        factory.post('/', {'answers': {str(field.id): 'Ada'}, 'token': token}, format='json'), pk=instance_id,
+    )
+    assert res.status_code == 201
+    assert res.data['current_step']['id'] == s2.id
+    assert Answer.objects.get(field=field).value == 'Ada'
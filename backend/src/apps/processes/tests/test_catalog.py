@@ -0,0 +1,63 @@
+import pytest
+
+from django.core.cache import cache
+from django.urls import reverse
+from apps.categories.models import ProcessCategory
+from apps.processes.catalog import catalog_version
+from apps.processes.models import Process, ProcessStep
+
+
+@pytest.fixture
+def many_processes(process_with_two_steps, owner_user):
+    proc, s1, s2 = process_with_two_steps
+    cat = ProcessCategory.objects.create(user=owner_user, name='HR')
+    for i in range(4):
+        extra = Process.objects.create(owner=proc.owner, title=f'Extra {i}', type=Process.SEQUENTIAL)
+        ProcessStep.objects.create(process=extra, form=s1.form, title='Only', order=1)
+        cat.process.add(extra)
+    return proc, cat
+
+
+@pytest.mark.django_db
+def test_catalog_is_prefetched_and_cached(api, many_processes, django_assert_num_queries):
+    cache.clear()
+    url = reverse('process-list')
+
+    # count, processes, steps, categories
+    with django_assert_num_queries(4):
+        res = api.get(url)
+    assert res.status_code == 200
+    assert len(res.data['results']) == 5
+
+    with django_assert_num_queries(0):
+        assert api.get(url).data == res.data
+
+
+@pytest.mark.django_db
+def test_catalog_cache_is_invalidated_on_change(api, many_processes, django_capture_on_commit_callbacks):
+    cache.clear()
+    proc, cat = many_processes
+    url = reverse('process-list')
+    api.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        cat.process.add(proc)
+    item = next(p for p in api.get(url).data['results'] if p['id'] == proc.id)
+    assert [c['name'] for c in item['categories']] == ['HR']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ProcessStep.objects.filter(process=proc).delete()
+    item = next(p for p in api.get(url).data['results'] if p['id'] == proc.id)
+    assert item['steps'] == []
+
+
+@pytest.mark.django_db
+def test_catalog_version_moves_only_on_commit(many_processes, django_capture_on_commit_callbacks):
+    proc, _ = many_processes
+    before = catalog_version()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ProcessStep.objects.create(process=proc, form=proc.steps.first().form, title='Late', order=3)
+        assert catalog_version() == before
+
+    assert catalog_version() != before
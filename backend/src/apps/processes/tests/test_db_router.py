@@ -0,0 +1,106 @@
+import pytest
+from django.core.cache import cache
+from django.db import connections
+from django.test import override_settings
+from django.urls import reverse
+
+from apps.forms.models import Form
+from apps.processes.models import ProcessInstance, StepSubmission
+from config.db_router import ReplicaRouter, instance_is_pinned, primary_reads, replica_reads
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+def test_router_reads_from_replica_only_inside_replica_block():
+    router = ReplicaRouter()
+
+    assert router.db_for_read(Form) == 'default'
+    with replica_reads():
+        assert router.db_for_read(Form) == 'replica1'
+        assert router.db_for_read(ProcessInstance) == 'replica1'
+        assert router.db_for_write(Form) == 'default'
+    with replica_reads(pinned=True):
+        assert router.db_for_read(ProcessInstance) == 'default'
+        assert router.db_for_read(StepSubmission) == 'default'
+        assert router.db_for_read(Form) == 'replica1'
+    with replica_reads():
+        with primary_reads():
+            assert router.db_for_read(Form) == 'default'
+        assert router.db_for_read(Form) == 'replica1'
+    assert router.db_for_read(Form) == 'default'
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+@pytest.mark.django_db
+def test_instance_writes_pin_reads_to_primary(process_with_two_steps, django_capture_on_commit_callbacks):
+    proc, s1, _ = process_with_two_steps
+
+    with django_capture_on_commit_callbacks(execute=True):
+        instance = ProcessInstance.objects.create(process=proc)
+    assert instance_is_pinned(instance.id)
+
+    cache.clear()
+    with django_capture_on_commit_callbacks(execute=True):
+        StepSubmission.objects.create(instance=instance, step=s1)
+    assert instance_is_pinned(instance.id)
+
+
+@pytest.fixture
+def lagging_replica(settings):
+    # A second connection to the test database sits outside the test
+    # transaction, so it behaves like a replica that has not caught up.
+    default = connections['default']
+    connections['lagging'] = replica = type(default)(dict(default.settings_dict), alias='lagging')
+    settings.DATABASE_REPLICAS = ['lagging']
+    yield replica
+    replica.close()
+    del connections['lagging']
+
+
+def start_and_submit_first_step(api, proc, capture):
+    with capture(execute=True):
+        res = api.post(reverse('process-start', kwargs={'pk': proc.pk}))
+        instance_id, token = res.data['instance']['id'], res.data['access_token']
+        res = api.post(reverse('submit-step', kwargs={'pk': instance_id}), {'token': token}, format='json')
+    assert res.status_code == 201
+    return instance_id, token
+
+
+@pytest.mark.django_db
+def test_current_step_after_submit_reads_from_primary(
+    api, process_with_two_steps, lagging_replica, django_capture_on_commit_callbacks,
+):
+    proc, _, s2 = process_with_two_steps
+    instance_id, token = start_and_submit_first_step(api, proc, django_capture_on_commit_callbacks)
+
+    res = api.get(reverse('current-step', kwargs={'pk': instance_id}), {'token': token, 'password': '1234'})
+
+    assert res.status_code == 200
+    assert res.data['id'] == s2.id
+
+
+@pytest.mark.django_db
+def test_unpinned_reads_go_to_replica(api, process_with_two_steps, lagging_replica, django_capture_on_commit_callbacks):
+    proc, _, _ = process_with_two_steps
+    instance_id, token = start_and_submit_first_step(api, proc, django_capture_on_commit_callbacks)
+    cache.clear()
+
+    # Once the pin lapses the lagging replica answers, and it has not seen the instance.
+    res = api.get(reverse('current-step', kwargs={'pk': instance_id}), {'token': token, 'password': '1234'})
+    assert res.status_code == 400
+
+
+@pytest.mark.django_db
+def test_cached_catalog_is_filled_from_primary(api, process_with_two_steps, lagging_replica):
+    proc, _, _ = process_with_two_steps
+
+    # The lagging replica has not seen the process, but the page is cached
+    # for far longer than replica lag, so it is built from the primary.
+    res = api.get(reverse('process-list'))
+    assert [p['id'] for p in res.data['results']] == [proc.id]
@@ -0,0 +1,115 @@
+import pytest
+
+from django.urls import reverse
+from apps.categories.models import ProcessCategory
+from apps.forms.models import Form, Field
+from apps.processes.models import Process
+
+
+@pytest.fixture
+def exported(api, owner_user, free_process_with_two_steps, process_with_two_steps):
+    free_proc, s1, _, _ = free_process_with_two_steps
+    Field.objects.create(form=s1.form, question='Name', field_type='text', position=1)
+    api.force_authenticate(owner_user)
+    res = api.get(reverse('process-export'))
+    assert res.status_code == 200
+    return res.data
+
+
+def with_passwords(bundle):
+    forms = [{**f, 'password': 'fresh'} if f['access'] == 'private' else f for f in bundle['forms']]
+    return {**bundle, 'forms': forms}
+
+
+@pytest.mark.django_db
+def test_export_bundles_processes_forms_and_categories(exported):
+    assert exported['version'] == 1
+    assert {p['title'] for p in exported['processes']} == {'Free Proc', 'Proc A'}
+    assert len(exported['forms']) == 4
+
+    free = next(p for p in exported['processes'] if p['title'] == 'Free Proc')
+    assert free['categories'] == ['آزادها']
+    assert [s['order'] for s in free['steps']] == [1, 2]
+    free_form = next(f for f in exported['forms'] if f['slug'] == free['steps'][0]['form'])
+    assert free_form['fields'][0]['question'] == 'Name'
+
+
+@pytest.mark.django_db
+def test_import_into_another_account_uses_constant_queries(
+    api, exported, django_user_model, django_assert_max_num_queries
+):
+    newcomer = django_user_model.objects.create_user(username='newcomer', password='pass')
+    api.force_authenticate(newcomer)
+    bundle = with_passwords({**exported, 'processes': exported['processes'] * 25})
+
+    with django_assert_max_num_queries(20):
+        res = api.post(reverse('process-import'), bundle, format='json')
+    assert res.status_code == 201, res.data
+    assert len(res.data['created']) == 50
+
+    imported = Process.objects.filter(owner__user=newcomer)
+    assert imported.count() == 50
+    assert Form.objects.filter(created_by=newcomer).count() == 4
+    assert ProcessCategory.objects.get(user=newcomer, name='آزادها').process.count() == 25
+    assert all(p.steps.count() == 2 for p in imported.filter(title='Proc A')[:3])
+
+
+@pytest.mark.django_db
+def test_import_rejects_unknown_form_slug(api, owner_user):
+    api.force_authenticate(owner_user)
+    bundle = {'forms': [], 'processes': [{'title': 'X', 'steps': [{'order': 1, 'form': 'nope'}]}]}
+
+    res = api.post(reverse('process-import'), bundle, format='json')
+    assert res.status_code == 400
+
+
+@pytest.mark.django_db
+def test_process_create_and_update_set_steps_and_categories(api, owner_user, process_with_two_steps):
+    _, s1, s2 = process_with_two_steps
+    a = ProcessCategory.objects.create(user=owner_user, name='A')
+    b = ProcessCategory.objects.create(user=owner_user, name='B')
+    api.force_authenticate(owner_user)
+
+    res = api.post(reverse('process-list-create'), {
+        'title': 'Bulk',
+        'steps': [{'form': s1.form_id}, {'form': s2.form_id, 'allow_skip': True}],
+        'category_ids': [a.id],
+    }, format='json')
+    assert res.status_code == 201, res.data
+
+    proc = Process.objects.get(title='Bulk')
+    assert list(proc.steps.values_list('order', 'allow_skip')) == [(1, False), (2, True)]
+
+    res = api.patch(reverse('process-detail', kwargs={'pk': proc.pk}), {'category_ids': [b.id]}, format='json')
+    assert res.status_code == 200, res.data
+    assert list(proc.categories.values_list('name', flat=True)) == ['B']
+
+
+@pytest.mark.django_db
+def test_private_form_passwords_are_not_exported_and_must_be_reset_on_import(api, exported, django_user_model):
+    assert all('password' not in f for f in exported['forms'])
+    private = [f['slug'] for f in exported['forms'] if f['access'] == 'private']
+    assert private
+
+    api.force_authenticate(django_user_model.objects.create_user(username='newcomer', password='pass'))
+    assert api.post(reverse('process-import'), exported, format='json').status_code == 400
+
+    res = api.post(reverse('process-import'), with_passwords(exported), format='json')
+    assert res.status_code == 201, res.data
+    copies = Form.objects.filter(created_by__username='newcomer', access='private')
+    assert copies.count() == len(private)
+    assert set(copies.values_list('password', flat=True)) == {'fresh'}
+
+
+@pytest.mark.django_db
+def test_import_retries_colliding_fallback_slugs(api, exported, django_user_model, monkeypatch):
+    taken = [f['slug'] for f in exported['forms']]
+    tokens = iter(taken + ['fresh001', 'fresh002', 'fresh003', 'fresh004'])
+    monkeypatch.setattr('apps.processes.definitions.secrets.token_urlsafe', lambda n: next(tokens))
+    api.force_authenticate(django_user_model.objects.create_user(username='newcomer', password='pass'))
+
+    res = api.post(reverse('process-import'), with_passwords(exported), format='json')
+    assert res.status_code == 201, res.data
+    assert set(Form.objects.filter(created_by__username='newcomer').values_list('slug', flat=True)) == {
+        'fresh001', 'fresh002', 'fresh003', 'fresh004',
+    }
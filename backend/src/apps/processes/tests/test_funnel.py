@@ -0,0 +1,77 @@
+import pytest
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from apps.processes.analytics import _bucket, bucket_percentile, rollup_step_submissions
+from apps.processes.models import ProcessInstance, StepRollup, StepSubmission
+
+
+def start_instance(proc):
+    instance = ProcessInstance.objects.create(process=proc)
+    instance.start()
+    return instance
+
+
+@pytest.mark.django_db
+def test_funnel_counts_and_timings(api, owner_user, process_with_two_steps):
+    cache.clear()
+    proc, s1, s2 = process_with_two_steps
+
+    fast, slow, skipper, idle = (start_instance(proc) for _ in range(4))
+    now = timezone.now()
+    for instance, minutes in [(fast, 1), (slow, 9)]:
+        ProcessInstance.objects.filter(pk=instance.pk).update(started_at=now - timedelta(minutes=minutes + 10))
+        sub = StepSubmission.objects.create(instance=instance, step=s1)
+        StepSubmission.objects.filter(pk=sub.pk).update(submitted_at=now - timedelta(minutes=10))
+    StepSubmission.objects.create(instance=skipper, step=s1, skipped=True)
+    assert rollup_step_submissions(settle_seconds=0) == 3
+
+    api.force_authenticate(owner_user)
+    res = api.get(reverse('process-funnel', kwargs={'pk': proc.pk}))
+    assert res.status_code == 200, res.data
+    assert res.data['instances'] == 4
+
+    first, second = res.data['steps']
+    assert (first['reached'], first['submitted'], first['skipped'], first['waiting']) == (4, 2, 1, 1)
+    # Percentiles come from log-scale buckets: 300 and 492 exactly, within 5%.
+    assert first['median_seconds'] == pytest.approx(300, rel=0.05)
+    assert first['p90_seconds'] == pytest.approx(492, rel=0.05)
+    assert (second['reached'], second['submitted'], second['waiting']) == (3, 0, 3)
+    assert second['median_seconds'] is None
+
+
+@pytest.mark.django_db
+def test_funnel_is_owner_only(api, django_user_model, process_with_two_steps):
+    proc, _, _ = process_with_two_steps
+    api.force_authenticate(django_user_model.objects.create_user(username='intruder', password='pass'))
+
+    res = api.get(reverse('process-funnel', kwargs={'pk': proc.pk}))
+    assert res.status_code == 403
+
+
+@pytest.mark.django_db
+def test_step_rollup_is_incremental(process_with_two_steps):
+    proc, s1, s2 = process_with_two_steps
+    first, second = start_instance(proc), start_instance(proc)
+
+    StepSubmission.objects.create(instance=first, step=s1)
+    assert rollup_step_submissions(settle_seconds=0) == 1
+    assert rollup_step_submissions(settle_seconds=0) == 0
+
+    StepSubmission.objects.create(instance=second, step=s1, skipped=True)
+    StepSubmission.objects.create(instance=first, step=s2)
+    assert rollup_step_submissions(settle_seconds=0) == 2
+
+    rollups = {r.step_id: (r.submitted_count, r.skipped_count) for r in StepRollup.objects.all()}
+    assert rollups == {s1.id: (1, 1), s2.id: (1, 0)}
+
+
+def test_bucket_percentile_interpolates_between_ranks():
+    assert bucket_percentile({}, 0.5) is None
+    # Ten samples of 100s and one of 1000s: p50 stays low, p100 is the outlier.
+    buckets = {str(_bucket(100)): 10, str(_bucket(1000)): 1}
+    assert bucket_percentile(buckets, 0.5) == pytest.approx(100, rel=0.05)
+    assert bucket_percentile(buckets, 0.95) == pytest.approx(550, rel=0.05)
+    assert bucket_percentile(buckets, 1) == pytest.approx(1000, rel=0.05)
@@ -0,0 +1,67 @@
+from collections import Counter
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.forms.models import Answer, Response
+from apps.processes.expiry import due_guest_ids
+from apps.processes.models import ProcessInstance, StepSubmission
+
+SMALL = {
+    'users': 5, 'forms': 2, 'fields': 6, 'responses': 50, 'processes': 2, 'steps': 3, 'instances': 40,
+    'completion': 0.5, 'guest_ratio': 0.5, 'batch_size': 15,
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def fingerprint(label):
+    # Names carry the label; strip it so two runs can be compared row for row.
+    answers = Answer.objects.filter(response__form__name__startswith=label).values_list(
+        'response__form__name', 'field__position', 'value', 'response__user',
+    )
+    instances = ProcessInstance.objects.filter(process__title__startswith=label).values_list(
+        'process__title', 'status', 'started_by', 'current_step__order',
+    )
+    return [Counter((name.split(' ', 1)[1], *rest) for name, *rest in rows) for rows in (answers, instances)]
+
+
+@pytest.mark.django_db
+def test_generated_instances_are_consistent():
+    call_command('generate_dataset', workers=1, stdout=StringIO(), **SMALL)
+
+    instances = ProcessInstance.objects.select_related('process', 'current_step')
+    assert instances.count() == 40
+    submissions = StepSubmission.objects.count()
+    assert Response.objects.count() == 50 + submissions
+    for instance in instances:
+        done = instance.submissions.count()
+        if instance.status == 'completed':
+            assert done == 3 and instance.completed_at is not None
+        else:
+            assert done < 3 and instance.completed_at is None
+            if instance.process.is_sequential:
+                assert instance.current_step.order == done + 1
+        assert instance.access_token
+        assert (instance.access_token_expires_at is None) == (instance.started_by_id is not None)
+
+    expired = ProcessInstance.objects.filter(started_by__isnull=True, access_token_expires_at__lt=timezone.now())
+    assert set(due_guest_ids(timezone.now(), 1000)) == set(expired.values_list('id', flat=True))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_same_seed_gives_same_rows_for_any_worker_count():
+    call_command('generate_dataset', label='A', seed=7, workers=1, stdout=StringIO(), **SMALL)
+    call_command('generate_dataset', label='B', seed=7, workers=3, stdout=StringIO(), **SMALL)
+    call_command('generate_dataset', label='C', seed=8, workers=1, stdout=StringIO(), **SMALL)
+
+    assert fingerprint('A') == fingerprint('B')
+    assert fingerprint('A') != fingerprint('C')
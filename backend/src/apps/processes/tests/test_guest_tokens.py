@@ -0,0 +1,91 @@
+import pytest
+
+from datetime import timedelta
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.urls import reverse
+from django.utils import timezone
+from apps.processes.guest_tokens import read_guest_token
+from apps.processes.models import ProcessInstance
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def start_guest(api, proc):
+    res = api.post(reverse('process-start', kwargs={'pk': proc.pk}))
+    assert res.status_code == 201
+    return res.data['instance']['id'], res.data['access_token']
+
+
+@pytest.mark.django_db
+def test_start_issues_signed_token(api, process_with_two_steps):
+    proc, _, _ = process_with_two_steps
+    instance_id, token = start_guest(api, proc)
+
+    payload = read_guest_token(token)
+    assert payload['i'] == instance_id
+    assert payload['p'] == proc.id
+    assert ProcessInstance.objects.get(pk=instance_id).access_token == token
+
+
+@pytest.mark.django_db
+def test_guest_insert_issues_token_without_a_second_save(process_with_two_steps, django_assert_num_queries):
+    proc, _, _ = process_with_two_steps
+    saves = []
+    post_save.connect(lambda sender, instance, **kw: saves.append(instance.pk), sender=ProcessInstance, weak=False,
+                      dispatch_uid='count-instance-saves')
+    try:
+        with django_assert_num_queries(2):
+            instance = ProcessInstance.objects.create(process=proc)
+    finally:
+        post_save.disconnect(sender=ProcessInstance, dispatch_uid='count-instance-saves')
+
+    assert saves == [instance.pk]
+    assert read_guest_token(instance.access_token)['i'] == instance.pk
+    assert ProcessInstance.objects.get(pk=instance.pk).access_token == instance.access_token
+
+
+@pytest.mark.django_db
+def test_legacy_token_is_compared_with_the_stored_one(api, process_with_two_steps):
+    proc, _, _ = process_with_two_steps
+    instance = ProcessInstance.objects.create(
+        process=proc, access_token='legacy-token', access_token_expires_at=timezone.now() + timedelta(hours=1),
+    )
+    instance.start()
+    url = reverse('current-step', kwargs={'pk': instance.pk})
+
+    assert api.get(url, {'token': 'legacy-token'}).status_code == 200
+    assert api.get(url, {'token': 'other-token'}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_signed_token_is_bound_to_its_instance(api, process_with_two_steps):
+    proc, _, _ = process_with_two_steps
+    first_id, first_token = start_guest(api, proc)
+    second_id, _ = start_guest(api, proc)
+
+    assert api.get(reverse('current-step', kwargs={'pk': first_id}), {'token': first_token}).status_code == 200
+    assert api.get(reverse('current-step', kwargs={'pk': second_id}), {'token': first_token}).status_code == 400
+    assert api.get(reverse('current-step', kwargs={'pk': first_id}), {'token': first_token[:-2]}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_expired_and_revoked_tokens_are_rejected(api, process_with_two_steps):
+    proc, _, _ = process_with_two_steps
+    instance_id, token = start_guest(api, proc)
+    url = reverse('current-step', kwargs={'pk': instance_id})
+
+    instance = ProcessInstance.objects.get(pk=instance_id)
+    instance.issue_guest_token(ttl_hours=1, force=True)
+    assert api.get(url, {'token': token}).status_code == 400
+    assert api.get(url, {'token': instance.access_token}).status_code == 200
+
+    instance.issue_guest_token(ttl_hours=-1, force=True)
+    res = api.get(url, {'token': instance.access_token})
+    assert res.status_code == 400
+    assert res.data['detail'] == 'Guest token expired.'
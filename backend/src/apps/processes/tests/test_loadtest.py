@@ -0,0 +1,42 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from apps.processes.models import ProcessInstance
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_loadtest_completes_both_flow_kinds_and_compares_runs(live_server, tmp_path):
+    first = tmp_path / 'before.json'
+    options = {'base_url': live_server.url, 'flows': 3, 'concurrency': 2, 'steps': 2, 'fields': 5}
+
+    call_command('loadtest_guest_flows', output=str(first), stdout=StringIO(), **options)
+    report = json.loads(first.read_text())
+
+    seq, free = report['results']['sequential'], report['results']['free_flow']
+    assert seq['completed'] == free['completed'] == 3
+    assert seq['endpoints']['start']['requests'] == 3
+    assert seq['endpoints']['submit_step']['requests'] == 6
+    assert free['endpoints']['submit_free']['requests'] == 6
+    assert all(e['error_rate'] == 0 for r in (seq, free) for e in r['endpoints'].values())
+    assert ProcessInstance.objects.filter(process_id=seq['process'], status='completed').count() == 3
+
+    second, out = tmp_path / 'after.json', StringIO()
+    call_command(
+        'loadtest_guest_flows', kind='sequential', process=seq['process'], baseline=str(first),
+        output=str(second), stdout=out, **options,
+    )
+    assert 'p95' in out.getvalue() and '%)' in out.getvalue()
+    deltas = json.loads(second.read_text())['compare']
+    assert set(deltas) == {'sequential'}
+    assert set(deltas['sequential']['current_step']) >= {'requests_per_sec', 'p95_ms'}
@@ -0,0 +1,70 @@
+import base64
+import json
+
+import pytest
+
+from django.urls import reverse
+from apps.processes.models import ProcessInstance, StepSubmission
+
+
+@pytest.fixture
+def instances(process_with_two_steps):
+    proc, s1, _ = process_with_two_steps
+    created = []
+    for _ in range(5):
+        instance = ProcessInstance.objects.create(process=proc)
+        instance.start()
+        created.append(instance)
+    StepSubmission.objects.create(instance=created[0], step=s1)
+    ProcessInstance.objects.filter(pk=created[1].pk).update(status='aborted')
+    return proc, created
+
+
+@pytest.mark.django_db
+def test_owner_instance_list_counts_and_progress(api, owner_user, instances, django_assert_num_queries):
+    proc, created = instances
+    api.force_authenticate(owner_user)
+
+    with django_assert_num_queries(2):
+        res = api.get(reverse('owner-instance-list'), {'status': 'running'})
+    assert res.status_code == 200, res.data
+    assert res.data['counts'] == {'running': 4, 'aborted': 1}
+    assert len(res.data['results']) == 4
+
+    progress = {row['id']: row['progress'] for row in res.data['results']}
+    assert progress[created[0].id] == 50.0
+    assert progress[created[2].id] == 0.0
+
+
+@pytest.mark.django_db
+def test_owner_instance_list_keyset_pages(api, owner_user, instances):
+    proc, created = instances
+    api.force_authenticate(owner_user)
+
+    res = api.get(reverse('owner-instance-list'), {'page_size': 2})
+    seen = [row['id'] for row in res.data['results']]
+    while res.data['next']:
+        res = api.get(res.data['next'])
+        seen += [row['id'] for row in res.data['results']]
+
+    assert seen == [i.id for i in sorted(created, key=lambda i: (i.started_at, i.id), reverse=True)]
+
+
+@pytest.mark.django_db
+def test_owner_instance_list_hides_other_owners(api, django_user_model, instances):
+    api.force_authenticate(django_user_model.objects.create_user(username='stranger', password='pass'))
+
+    res = api.get(reverse('owner-instance-list'))
+    assert res.data['results'] == []
+    assert res.data['counts'] == {}
+
+
+@pytest.mark.django_db
+def test_owner_instance_list_rejects_bad_filters_and_cursors(api, owner_user, instances):
+    api.force_authenticate(owner_user)
+    url = reverse('owner-instance-list')
+
+    assert api.get(url, {'process': 'abc'}).status_code == 400
+    for position in (['x', 'y', 'z'], [1, 'not-a-date', 2], [1, None, 2], 'abc'):
+        cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+        assert api.get(url, {'cursor': cursor}).status_code == 404
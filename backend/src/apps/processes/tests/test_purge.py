@@ -0,0 +1,130 @@
+import pytest
+import uuid
+
+from datetime import timedelta
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from apps.processes.expiry import due_guest_ids, register_guest_expiry
+from apps.processes.models import ProcessInstance, StepSubmission
+from apps.processes.tasks import purge_expired_guest_instances
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def make_expired(proc, count, register=True):
+    past = timezone.now() - timedelta(minutes=1)
+    instances = ProcessInstance.objects.bulk_create(
+        ProcessInstance(process=proc, access_token=uuid.uuid4().hex, access_token_expires_at=past) for _ in range(count)
+    )
+    if register:
+        for inst in instances:
+            register_guest_expiry(inst.id, past)
+    return instances
+
+
+@pytest.mark.django_db
+def test_start_registers_guest_expiry(api, process_with_two_steps):
+    proc, _, _ = process_with_two_steps
+
+    res = api.post(reverse('process-start', kwargs={'pk': proc.pk}), {}, format='json')
+    assert res.status_code == 201, res.data
+
+    instance_id = res.data['instance']['id']
+    assert due_guest_ids(timezone.now(), 10) == []
+    assert due_guest_ids(timezone.now() + timedelta(hours=49), 10) == [instance_id]
+
+
+@pytest.mark.django_db
+def test_purge_deletes_due_guests_in_batches(process_with_two_steps, owner_user, django_assert_max_num_queries):
+    proc, step1, _ = process_with_two_steps
+    expired = make_expired(proc, 5)
+    for inst in expired:
+        StepSubmission.objects.create(instance=inst, step=step1, skipped=True)
+    live = ProcessInstance.objects.create(process=proc)
+    register_guest_expiry(live.id, live.access_token_expires_at)
+    owned = ProcessInstance.objects.create(
+        process=proc, started_by=owner_user, access_token='owned',
+        access_token_expires_at=timezone.now() - timedelta(minutes=1),
+    )
+
+    # Three batches of at most 2 ids, each a constant number of queries.
+    with django_assert_max_num_queries(3 * 9):
+        result = purge_expired_guest_instances(batch_size=2)
+
+    assert result.startswith('Purged 5 ')
+    assert set(ProcessInstance.objects.values_list('id', flat=True)) == {live.id, owned.id}
+    assert not StepSubmission.objects.exists()
+    assert due_guest_ids(timezone.now(), 10) == []
+
+
+@pytest.mark.django_db
+def test_purge_only_touches_indexed_ids_unless_scanning(process_with_two_steps):
+    proc, _, _ = process_with_two_steps
+    indexed = make_expired(proc, 2)
+    unindexed = make_expired(proc, 1, register=False)
+
+    assert purge_expired_guest_instances().startswith('Purged 2 ')
+    assert list(ProcessInstance.objects.values_list('id', flat=True)) == [unindexed[0].id]
+    assert not ProcessInstance.objects.filter(id__in=[i.id for i in indexed]).exists()
+
+    assert purge_expired_guest_instances(scan=True).startswith('Purged 1 ')
+    assert not ProcessInstance.objects.exists()
+
+
+@pytest.mark.django_db
+def test_purge_rescores_guests_whose_token_was_extended(process_with_two_steps):
+    proc, _, _ = process_with_two_steps
+    extended, expired = make_expired(proc, 2)
+    later = timezone.now() + timedelta(hours=1)
+    ProcessInstance.objects.filter(pk=extended.pk).update(access_token_expires_at=later)
+
+    assert purge_expired_guest_instances().startswith('Purged 1 ')
+    assert list(ProcessInstance.objects.values_list('id', flat=True)) == [extended.id]
+    assert due_guest_ids(timezone.now(), 10) == []
+    assert due_guest_ids(later + timedelta(seconds=1), 10) == [extended.id]
+
+
+@pytest.mark.django_db
+def test_cleanup_command_aborts_expired_guests_in_batches(process_with_two_steps):
+    proc, _, _ = process_with_two_steps
+    expired = make_expired(proc, 5)
+    live = ProcessInstance.objects.create(process=proc)
+
+    out = StringIO()
+    call_command('cleanup_expired_instances', '--dry-run', stdout=out)
+    assert out.getvalue().startswith('5 ')
+    assert not ProcessInstance.objects.filter(status='aborted').exists()
+
+    out = StringIO()
+    call_command('cleanup_expired_instances', '--batch-size', '2', stdout=out)
+    assert 'Aborted 5 expired guest instances in 3 batch(es)' in out.getvalue()
+    assert set(ProcessInstance.objects.filter(status='aborted').values_list('id', flat=True)) == {
+        inst.id for inst in expired
+    }
+    live.refresh_from_db()
+    assert live.status == 'running'
+
+    # Aborted instances stay indexed so the purge can still delete them.
+    assert len(due_guest_ids(timezone.now(), 10)) == 5
+
+
+@pytest.mark.django_db
+def test_cleanup_command_scan_covers_unindexed_instances(process_with_two_steps):
+    proc, _, _ = process_with_two_steps
+    make_expired(proc, 3, register=False)
+
+    out = StringIO()
+    call_command('cleanup_expired_instances', stdout=out)
+    assert 'Aborted 0 ' in out.getvalue()
+
+    out = StringIO()
+    call_command('cleanup_expired_instances', '--scan', stdout=out)
+    assert 'Aborted 3 ' in out.getvalue()
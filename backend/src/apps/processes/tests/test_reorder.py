@@ -0,0 +1,50 @@
+import pytest
+
+from django.urls import reverse
+from apps.processes.models import ProcessStep
+
+
+@pytest.mark.django_db
+def test_reorder_swaps_steps_atomically(api, owner_user, process_with_two_steps):
+    proc, step1, step2 = process_with_two_steps
+    step3 = ProcessStep.objects.create(process=proc, form=step1.form, title='Step 3', order=3)
+    api.force_authenticate(owner_user)
+
+    res = api.post(
+        reverse('step-reorder', args=[proc.id]),
+        {'steps': [step3.id, step1.id, step2.id]},
+        format='json',
+    )
+    assert res.status_code == 200, res.data
+    assert [s['id'] for s in res.data] == [step3.id, step1.id, step2.id]
+    assert list(proc.steps.order_by('order').values_list('id', 'order')) == [
+        (step3.id, 1), (step1.id, 2), (step2.id, 3),
+    ]
+
+
+@pytest.mark.django_db
+def test_reorder_requires_every_step(api, owner_user, process_with_two_steps):
+    proc, step1, step2 = process_with_two_steps
+    api.force_authenticate(owner_user)
+
+    res = api.post(reverse('step-reorder', args=[proc.id]), {'steps': [step2.id]}, format='json')
+    assert res.status_code == 400
+    assert list(proc.steps.order_by('order').values_list('id', flat=True)) == [step1.id, step2.id]
+
+
+@pytest.mark.django_db
+def test_reorder_is_owner_only(api, django_user_model, process_with_two_steps):
+    proc, step1, step2 = process_with_two_steps
+    api.force_authenticate(django_user_model.objects.create_user(username='other', password='pass'))
+
+    res = api.post(reverse('step-reorder', args=[proc.id]), {'steps': [step2.id, step1.id]}, format='json')
+    assert res.status_code == 403
+
+
+@pytest.mark.django_db
+def test_reorder_unknown_process_is_404(api, owner_user, process_with_two_steps):
+    proc, step1, step2 = process_with_two_steps
+    api.force_authenticate(owner_user)
+
+    res = api.post(reverse('step-reorder', args=[proc.id + 1000]), {'steps': [step2.id, step1.id]}, format='json')
+    assert res.status_code == 404
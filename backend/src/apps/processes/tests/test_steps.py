@@ -0,0 +1,39 @@
+import pytest
+
+from django.urls import reverse
+
+
+@pytest.mark.django_db
+def test_owner_adds_step_to_sequential_process(api, owner_user, process_with_two_steps):
+    proc, step1, _ = process_with_two_steps
+    api.force_authenticate(owner_user)
+
+    res = api.post(
+        reverse('step-list-create', args=[proc.id]),
+        {'form': step1.form_id, 'order': 3, 'title': 'Step 3'},
+        format='json',
+    )
+    assert res.status_code == 201, res.data
+    assert list(proc.steps.order_by('order').values_list('title', flat=True))[-1] == 'Step 3'
+
+
+@pytest.mark.django_db
+def test_adding_step_to_missing_process_is_404(api, owner_user, process_with_two_steps):
+    proc, step1, _ = process_with_two_steps
+    api.force_authenticate(owner_user)
+
+    res = api.post(
+        reverse('step-list-create', args=[proc.id + 1000]),
+        {'form': step1.form_id, 'order': 3},
+        format='json',
+    )
+    assert res.status_code == 404
+
+
+@pytest.mark.django_db
+def test_step_routes_describe_themselves_without_a_process(api, owner_user, process_with_two_steps):
+    proc, _, _ = process_with_two_steps
+    api.force_authenticate(owner_user)
+
+    assert api.options(reverse('step-list-create', args=[proc.id + 1000])).status_code == 200
+    assert api.get('/swagger/?format=openapi').status_code == 200
@@ -1,14 +1,24 @@
 import pytest
 import uuid
 
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
 from django.urls import reverse
 from django.test import override_settings
 from apps.users.models import Profile
 from apps.forms.models import Form
 from apps.processes.models import Process
 
-from apps.processes.views import StartProcessView
-from rest_framework.throttling import ScopedRateThrottle
+from apps.processes.throttling import RedisScopedRateThrottle
+from rest_framework.test import APIRequestFactory
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
 
 
 @pytest.fixture
@@ -36,25 +46,11 @@ def simple_process(db, django_user_model):
 
 
 @override_settings(REST_FRAMEWORK={
-    'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.ScopedRateThrottle',
-    ],
-    'DEFAULT_THROTTLE_RATES': {
-        'start_process': '2/minute',
-    }
+    **settings.REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'start_process': '2/minute'},
 })
 @pytest.mark.django_db
 def test_start_process_throttled_for_guest(api, simple_process):
-    StartProcessView.throttle_scope = 'start_process'
-    StartProcessView.throttle_classes = [ScopedRateThrottle]
-
-    def _forced_get_throttles(self):
-        t = ScopedRateThrottle()
-        t.scope = 'start_process'
-        return [t]
-
-    StartProcessView.get_throttles = _forced_get_throttles
-
     url = reverse('process-start', kwargs={'pk': simple_process.pk})
 
     r1 = api.post(url)
@@ -63,4 +59,71 @@ def test_start_process_throttled_for_guest(api, simple_process):
 
     assert r1.status_code == 201
     assert r2.status_code == 201
-    assert r3.status_code == 429
\ No newline at end of file
+    assert r3.status_code == 429
+
+
+@override_settings(REST_FRAMEWORK={
+    **settings.REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'current_step': '2/minute'},
+})
+@pytest.mark.django_db
+def test_current_step_uses_redis_throttle(api, simple_process):
+    res = api.post(reverse('process-start', kwargs={'pk': simple_process.pk}))
+    url = reverse('current-step', kwargs={'pk': res.data['instance']['id']})
+    token = res.data['access_token']
+
+    assert [api.get(url, {'token': token}).status_code for _ in range(3)] == [200, 200, 429]
+
+
+def test_gcra_allows_burst_then_spaces_requests():
+    request = APIRequestFactory().get('/', REMOTE_ADDR='10.0.0.1')
+    request.user = AnonymousUser()
+    view = type('View', (), {'throttle_scope': 'current_step'})()
+    now = [1000.0]
+
+    def check():
+        throttle = RedisScopedRateThrottle()
+        throttle.timer = lambda: now[0]
+        with override_settings(REST_FRAMEWORK={'DEFAULT_THROTTLE_RATES': {'current_step': '4/minute'}}):
+            return throttle.allow_request(request, view), throttle.wait()
+
+    assert [check()[0] for _ in range(4)] == [True] * 4
+    allowed, wait = check()
+    assert not allowed
+    assert wait == pytest.approx(15.0)
+
+    now[0] += 15
+    assert check() == (True, 0)
+    assert not check()[0]
+
+
+@override_settings(REST_FRAMEWORK={
+    **settings.REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'current_step': '2/minute'},
+})
+@pytest.mark.django_db
+def test_guests_sharing_an_ip_get_separate_budgets(api, simple_process):
+    start_url = reverse('process-start', kwargs={'pk': simple_process.pk})
+    guests = [api.post(start_url).data for _ in range(2)]
+
+    def current_step(guest, **extra):
+        url = reverse('current-step', kwargs={'pk': guest['instance']['id']})
+        return api.get(url, HTTP_X_INSTANCE_TOKEN=guest['access_token'], **extra).status_code
+
+    assert [current_step(guests[0]) for _ in range(2)] == [200, 200]
+    assert current_step(guests[1]) == 200
+
+    # Changing IP does not reset the budget of a token.
+    assert current_step(guests[0], REMOTE_ADDR='10.9.9.9') == 429
+
+
+@override_settings(REST_FRAMEWORK={
+    **settings.REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'current_step': '2/minute'},
+})
+@pytest.mark.django_db
+def test_requests_without_a_valid_token_are_keyed_on_ip(api, simple_process):
+    guest = api.post(reverse('process-start', kwargs={'pk': simple_process.pk})).data
+    url = reverse('current-step', kwargs={'pk': guest['instance']['id']})
+
+    assert [api.get(url, {'token': f'forged{i}'}).status_code for i in range(3)] == [400, 400, 429]
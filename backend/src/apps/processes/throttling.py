@@ -0,0 +1,104 @@
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from rest_framework.settings import api_settings
+from rest_framework.throttling import ScopedRateThrottle
+
+from .guest_tokens import read_guest_token
+
+# GCRA: one key per client holding the theoretical arrival time (TAT) in ms.
+# A request is allowed while it arrives no earlier than TAT - period, where
+# period is the whole rate window, which permits a burst of num_requests.
+GCRA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local emission = tonumber(ARGV[2])
+local period = tonumber(ARGV[3])
+
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+
+local new_tat = tat + emission
+local allow_at = new_tat - period
+if allow_at > now then
+    return {0, math.ceil(allow_at - now)}
+end
+
+redis.call('SET', KEYS[1], string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now))
+return {1, 0}
+"""
+
+_scripts = {}
+
+
+def _gcra(client):
+    script = _scripts.get(id(client))
+    if script is None:
+        script = _scripts[id(client)] = client.register_script(GCRA_SCRIPT)
+    return script
+
+
+class RedisScopedRateThrottle(ScopedRateThrottle):
+    """
+    Drop-in ScopedRateThrottle that keeps O(1) GCRA state per client in Redis.
+
+    Each check is a single atomic script call, so concurrent workers cannot
+    race past the limit the way the stock read-modify-write history can.
+    """
+    cache_format = 'throttle:gcra:%(scope)s:%(ident)s'
+
+    @property
+    def THROTTLE_RATES(self):
+        # Read per request so rate changes (and override_settings) apply.
+        return api_settings.DEFAULT_THROTTLE_RATES
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        client = get_redis_connection('default')
+        period = self.duration * 1000
+        allowed, self.wait_ms = _gcra(client)(
+            keys=[cache.make_key(self.key)],
+            args=[self.timer() * 1000, period / self.num_requests, period],
+        )
+        return bool(allowed)
+
+    def wait(self):
+        return self.wait_ms / 1000
+
+
+class GuestInstanceRateThrottle(RedisScopedRateThrottle):
+    """
+    Keys guests on the instance their signed token grants, not on their IP.
+
+    Guests behind a shared NAT get separate budgets, and one token spread
+    across many IPs still shares a single budget. Requests without a valid
+    token for the instance in the URL fall back to the client IP.
+    """
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return super().get_cache_key(request, view)
+
+        token = (
+            request.headers.get('X-Instance-Token')
+            or request.query_params.get('token')
+            or request.data.get('token')
+        )
+        payload = read_guest_token(token) if token else None
+        instance_id = view.kwargs.get('pk')
+        if payload is None or instance_id is None or payload.get('i') != int(instance_id):
+            return super().get_cache_key(request, view)
+
+        return self.cache_format % {'scope': self.scope, 'ident': f'instance:{instance_id}'}
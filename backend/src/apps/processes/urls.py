@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import StartProcessView, CurrentStepView, SubmitStepView, ProcessListCreateView, ProcessRUDView, \
-    StepListCreateView, StepRUDView, ProcessFreeListView, StartFreeProcessView, CurrentStepsFreeView, \
-    SubmitFreeView, ProcessSequentialListView, ProcessListView, SkipStepView
+from .async_views import AsyncStartProcessView, AsyncCurrentStepView, AsyncSubmitStepView, \
+    AsyncStartFreeProcessView, AsyncCurrentStepsFreeView
+from .views import ProcessListCreateView, ProcessRUDView, StepListCreateView, StepRUDView, ProcessFreeListView, \
+    SubmitFreeView, ProcessSequentialListView, ProcessListView, SkipStepView, ProcessFunnelView, \
+    OwnerInstanceListView, ProcessExportView, ProcessImportView, StepReorderView
 
 
 urlpatterns = [
@@ -11,19 +13,24 @@ urlpatterns = [
 
 
     path('list/', ProcessListCreateView.as_view(), name='process-list-create'),
+    path('export/', ProcessExportView.as_view(), name='process-export'),
+    path('import/', ProcessImportView.as_view(), name='process-import'),
     path('<int:pk>/', ProcessRUDView.as_view(), name='process-detail'),
+    path('<int:pk>/funnel/', ProcessFunnelView.as_view(), name='process-funnel'),
 
     path('<int:process_id>/steps/', StepListCreateView.as_view(), name='step-list-create'),
+    path('<int:process_id>/steps/reorder/', StepReorderView.as_view(), name='step-reorder'),
     path('steps/<int:pk>/', StepRUDView.as_view(), name='step-detail'),
 
-    path('<int:pk>/start/', StartProcessView.as_view(), name='process-start'),
-    path('instances/<int:pk>/current-step/', CurrentStepView.as_view(), name='current-step'),
-    path('instances/<int:pk>/submit-step/', SubmitStepView.as_view(), name='submit-step'),
+    path('<int:pk>/start/', AsyncStartProcessView.as_view(), name='process-start'),
+    path('instances/', OwnerInstanceListView.as_view(), name='owner-instance-list'),
+    path('instances/<int:pk>/current-step/', AsyncCurrentStepView.as_view(), name='current-step'),
+    path('instances/<int:pk>/submit-step/', AsyncSubmitStepView.as_view(), name='submit-step'),
     path('instances/<int:pk>/skip-step/', SkipStepView.as_view(), name='skip-step'),
 
 
-    path('free/<int:pk>/start/', StartFreeProcessView.as_view(), name='free-process-start'),
-    path('instances/<int:pk>/current-steps/', CurrentStepsFreeView.as_view(), name='free-current-steps'),
+    path('free/<int:pk>/start/', AsyncStartFreeProcessView.as_view(), name='free-process-start'),
+    path('instances/<int:pk>/current-steps/', AsyncCurrentStepsFreeView.as_view(), name='free-current-steps'),
     path('instances/<int:pk>/submit-free/', SubmitFreeView.as_view(), name='submit-free'),
 
 ]
\ No newline at end of file
@@ -1,20 +1,34 @@
-import secrets
 from datetime import timedelta
+from functools import partial
 
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, IntegerField, OuterRef, Prefetch, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce, NullIf
 from django.utils import timezone
 from rest_framework import status, filters
 from rest_framework.generics import ListAPIView, RetrieveAPIView, CreateAPIView, ListCreateAPIView, \
     RetrieveUpdateDestroyAPIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.exceptions import ValidationError
-from rest_framework.throttling import ScopedRateThrottle
-
+from rest_framework.exceptions import NotFound, ValidationError, PermissionDenied
+
+from config.db_router import ReplicaReadMixin, primary_reads
+from .analytics import process_funnel
+from .catalog import bump_catalog_version, cached_catalog_page
+from .definitions import export_processes, import_processes
+from .expiry import register_guest_expiry
+from .guest_tokens import is_guest_token_revoked, read_guest_token
 from .models import Process, ProcessInstance, ProcessStep, StepSubmission
+from .pagination import InstanceKeysetPagination
 from .permissions import IsOwnerOrReadOnly
 from .serializers import ProcessSerializer, ProcessStepSerializer, ProcessInstanceSerializer, StepSubmissionSerializer, \
-    ProcessWriteSerializer, ProcessStepWriteSerializer, FreeStepSerializer, CurrentStepSerializer, StepSubmitPayloadSerializer
+    ProcessWriteSerializer, ProcessStepWriteSerializer, FreeStepSerializer, CurrentStepSerializer, StepSubmitPayloadSerializer, \
+    OwnerInstanceSerializer, ProcessBundleSerializer, StepReorderSerializer
+from .throttling import GuestInstanceRateThrottle, RedisScopedRateThrottle
 from apps.forms.models import Response as FormResponse, Answer as FormAnswer, Field as FormField
+from apps.categories.models import ProcessCategory
+from apps.reports.report_cache import bump_report_watermark
 from django.core.cache import cache
 
 
@@ -64,15 +78,20 @@ def require_guest_token_if_needed(request, instance):
     if not token:
         raise ValidationError({'detail': 'Guest instance token is required.'})
 
-    cached = cache.get(f'proc:guest:{instance.id}:token')
-    if cached is None:
-        if token != (instance.access_token or ''):
+    payload = read_guest_token(token)
+    if payload is not None:
+        if payload.get('i') != instance.id or payload.get('p') != instance.process_id:
             raise ValidationError({'detail': 'Invalid guest token.'})
-        if instance.access_token_expires_at and timezone.now() > instance.access_token_expires_at:
+        if timezone.now().timestamp() > payload.get('e', 0):
             raise ValidationError({'detail': 'Guest token expired.'})
-    else:
-        if token != cached:
+        if is_guest_token_revoked(token):
             raise ValidationError({'detail': 'Invalid guest token.'})
+        return
+
+    if token != (instance.access_token or ''):
+        raise ValidationError({'detail': 'Invalid guest token.'})
+    if instance.access_token_expires_at and timezone.now() > instance.access_token_expires_at:
+        raise ValidationError({'detail': 'Guest token expired.'})
 
 def build_form_response_from_answers_or_skip(step_form, request):
     skip = bool(request.data.get('skip', False))
@@ -102,31 +121,61 @@ def build_form_response_from_answers_or_skip(step_form, request):
         FormAnswer(response=fr, field_id=a['field'], value=str(a.get('value', '')).strip())
         for a in answers_payload
     ])
+    transaction.on_commit(partial(bump_report_watermark, step_form.id))
     return fr
 
 
-class ProcessListView(ListAPIView):
-    queryset = Process.objects.filter(is_active=True)
+def write_step_submission(instance, step, user, answers):
+    # One transaction, so the report watermark bump and the live report push,
+    # both run on commit by the Response post_save, see the answers.
+    with transaction.atomic():
+        form_response = FormResponse.objects.create(form=step.form, user=user)
+        if answers:
+            FormAnswer.objects.bulk_create([
+                FormAnswer(response=form_response, field_id=field_id, value=value)
+                for field_id, value in answers.items()
+            ])
+        # The StepSubmission post_save receiver advances and completes the instance.
+        StepSubmission.objects.create(instance=instance, step=step, form_response=form_response)
+
+
+class CatalogListView(ReplicaReadMixin, ListAPIView):
     serializer_class = ProcessSerializer
     permission_classes = [AllowAny]
 
+    def get_queryset(self):
+        return super().get_queryset().prefetch_related(
+            'steps',
+            Prefetch('categories', queryset=ProcessCategory.objects.only('id', 'name')),
+        )
+
+    def list(self, request, *args, **kwargs):
+        data = cached_catalog_page(
+            type(self).__name__,
+            request.query_params.urlencode(),
+            lambda: super(CatalogListView, self).list(request, *args, **kwargs).data,
+        )
+        return Response(data)
+
+
+class ProcessListView(CatalogListView):
+    queryset = Process.objects.filter(is_active=True)
+
 
-class ProcessSequentialListView(ListAPIView):
+class ProcessSequentialListView(CatalogListView):
     queryset = Process.objects.filter(is_active=True, type=Process.SEQUENTIAL)
-    serializer_class = ProcessSerializer
-    permission_classes = [AllowAny]
 
 
-class ProcessFreeListView(ListAPIView):
+class ProcessFreeListView(CatalogListView):
     queryset = Process.objects.filter(is_active=True, type=Process.FREE_FLOW)
-    serializer_class = ProcessSerializer
-    permission_classes = [AllowAny]
 
 
+# The guest start/current-step/submit endpoints are served by the async views
+# in async_views.py; these sync versions stay for bench_async_views to compare.
 class StartProcessView(CreateAPIView):
     serializer_class = ProcessInstanceSerializer
     permission_classes = [AllowAny]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [RedisScopedRateThrottle]
     throttle_scope = 'start_process'
 
     def create(self, request, *args, **kwargs):
@@ -139,22 +188,16 @@ class StartProcessView(CreateAPIView):
         access_token = None
 
         if not request.user.is_authenticated:
-            ttl_hours = 48
-            ttl_seconds = ttl_hours * 3600
-            token = secrets.token_urlsafe(48)
-            expires = timezone.now() + timedelta(hours=ttl_hours)
+            expires = timezone.now() + timedelta(hours=48)
 
             instance = ProcessInstance.objects.create(
                 process=process,
                 started_by=None,
-                access_token=token,
                 access_token_expires_at=expires,
-
             )
-            cache.set(f'proc:guest:{instance.id}:token', token, timeout=ttl_seconds)
-            cache.set(f'proc:guest:bytoken:{token}', instance.id, timeout=ttl_seconds)
+            register_guest_expiry(instance.id, expires)
 
-            access_token = token
+            access_token = instance.access_token
 
         else:
             instance = ProcessInstance.objects.create(
@@ -173,11 +216,12 @@ class StartProcessView(CreateAPIView):
         )
 
 
-class CurrentStepView(RetrieveAPIView):
+class CurrentStepView(ReplicaReadMixin, RetrieveAPIView):
+    replica_pin_kwarg = 'pk'
     queryset = ProcessInstance.objects.none()
     serializer_class = CurrentStepSerializer
     permission_classes = [AllowAny]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [GuestInstanceRateThrottle]
     throttle_scope = 'current_step'
 
     def get_object(self):
@@ -202,10 +246,11 @@ class CurrentStepView(RetrieveAPIView):
         data = self.get_serializer(step).data
         return Response(data)
 
+
 class SubmitStepView(CreateAPIView):
     permission_classes = [AllowAny]
     serializer_class = StepSubmitPayloadSerializer
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [GuestInstanceRateThrottle]
     throttle_scope = 'submit_step'
 
     def create(self, request, *args, **kwargs):
@@ -231,33 +276,25 @@ class SubmitStepView(CreateAPIView):
 
         ensure_form_password_if_private(step.form, request, provided_password)
 
-        form_response = FormResponse.objects.create(
-            form=step.form,
-            user=request.user if request.user.is_authenticated else None,
+        known = set(
+            FormField.objects.filter(form=step.form, pk__in=[k for k in answers if str(k).isdigit()])
+            .values_list('pk', flat=True)
         )
-
-        for field_id, value in answers.items():
-            field_obj = FormField.objects.filter(pk=field_id, form=step.form).first()
-            if not field_obj:
+        for field_id in answers:
+            if not str(field_id).isdigit() or int(field_id) not in known:
                 raise ValidationError({'detail': f'Field {field_id} not found on this form.'})
 
-            FormAnswer.objects.create(
-                response=form_response,
-                field=field_obj,
-                value=value,
-            )
-
-        StepSubmission.objects.create(
-            instance=instance,
-            step=step,
-            form_response=form_response,
+        write_step_submission(
+            instance, step,
+            request.user if request.user.is_authenticated else None,
+            {int(field_id): value for field_id, value in answers.items()},
         )
-
-        instance.advance_after_submission(step)
         instance.refresh_from_db()
 
         out_ser = ProcessInstanceSerializer(instance)
         return Response(out_ser.data, status=status.HTTP_201_CREATED)
+
+
 class ProcessListCreateView(ListCreateAPIView):
     queryset = Process.objects.filter(type=Process.SEQUENTIAL)
     permission_classes = [IsAuthenticated]
@@ -269,7 +306,7 @@ class ProcessListCreateView(ListCreateAPIView):
         return ProcessWriteSerializer if self.request.method == 'POST' else ProcessSerializer
 
     def get_queryset(self):
-        return super().get_queryset().filter(owner__user=self.request.user)
+        return super().get_queryset().filter(owner__user=self.request.user).prefetch_related('steps', 'categories')
 
 
 class ProcessRUDView(RetrieveUpdateDestroyAPIView):
@@ -289,10 +326,26 @@ class StepListCreateView(ListCreateAPIView):
     def get_serializer_class(self):
         return ProcessStepWriteSerializer if self.request.method == 'POST' else ProcessStepSerializer
 
-    def perform_create(self, serializer):
-        process = Process.objects.get(pk=self.kwargs['process_id'], type=Process.SEQUENTIAL)
+    def get_process(self):
+        process = Process.objects.select_related('owner').filter(
+            pk=self.kwargs['process_id'], type=Process.SEQUENTIAL
+        ).first()
+        if not process:
+            raise NotFound('Process not found.')
         self.check_object_permissions(self.request, process)
-        serializer.save(process=process)
+        return process
+
+    def create(self, request, *args, **kwargs):
+        # Looked up here rather than in get_serializer_context, which also runs
+        # for OPTIONS and schema generation.
+        self.process = self.get_process()
+        return super().create(request, *args, **kwargs)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if getattr(self, 'process', None) is not None:
+            context['process'] = self.process
+        return context
 
 
 class StepRUDView(RetrieveUpdateDestroyAPIView):
@@ -303,10 +356,47 @@ class StepRUDView(RetrieveUpdateDestroyAPIView):
         return ProcessStepWriteSerializer if self.request.method in ('PUT', 'PATCH') else ProcessStepSerializer
     
 
+class StepReorderView(CreateAPIView):
+    permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
+    serializer_class = StepReorderSerializer
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        order = serializer.validated_data['steps']
+
+        with transaction.atomic():
+            process = Process.objects.select_for_update(of=('self',)).select_related('owner').filter(
+                pk=self.kwargs['process_id']
+            ).first()
+            if not process:
+                raise NotFound('Process not found.')
+            self.check_object_permissions(request, process)
+
+            steps = ProcessStep.objects.filter(process=process)
+            current = dict(steps.values_list('id', 'order'))
+            if set(order) != set(current):
+                raise ValidationError({'steps': 'Must list every step of this process exactly once.'})
+
+            # Two phases keep uniq_step_order_per_process satisfied after every
+            # statement: first move all steps past any order in use, then assign.
+            offset = max(max(current.values()), len(order))
+            steps.update(order=F('order') + offset)
+            steps.update(order=Case(
+                *[When(pk=step_id, then=Value(position)) for position, step_id in enumerate(order, start=1)],
+                output_field=IntegerField(),
+            ))
+
+            transaction.on_commit(bump_catalog_version)
+
+        data = ProcessStepSerializer(steps.order_by('order'), many=True).data
+        return Response(data, status=status.HTTP_200_OK)
+
+
 class StartFreeProcessView(CreateAPIView):
     serializer_class = ProcessInstanceSerializer
     permission_classes = [AllowAny]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [RedisScopedRateThrottle]
     throttle_scope = 'start_process'
 
     def create(self, request, *args, **kwargs):
@@ -325,15 +415,14 @@ class StartFreeProcessView(CreateAPIView):
             instance = ProcessInstance.objects.create(process=process, started_by=request.user)
             access_token = None
         else:
-            token = secrets.token_urlsafe(48)
             expires = timezone.now() + timedelta(hours=24)
             instance = ProcessInstance.objects.create(
                 process=process,
                 started_by=None,
-                access_token=token,
                 access_token_expires_at=expires,
             )
-            access_token = token
+            register_guest_expiry(instance.id, expires)
+            access_token = instance.access_token
 
         instance.start()
 
@@ -343,11 +432,12 @@ class StartFreeProcessView(CreateAPIView):
         return Response(data, status=status.HTTP_201_CREATED)
 
 
-class CurrentStepsFreeView(ListAPIView):
+class CurrentStepsFreeView(ReplicaReadMixin, ListAPIView):
+    replica_pin_kwarg = 'pk'
     queryset = ProcessStep.objects.none()
     serializer_class = FreeStepSerializer
     permission_classes = [AllowAny]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [GuestInstanceRateThrottle]
     throttle_scope = 'current_step'
 
     def get_instance(self):
@@ -375,14 +465,16 @@ class CurrentStepsFreeView(ListAPIView):
             .values_list('step_id', flat=True)
         )
 
-        steps = (
+        steps = list(
             ProcessStep.objects
             .filter(process=instance.process)
             .exclude(id__in=submitted_ids)
             .select_related('form')
-            .prefetch_related('form__fields')
+            .prefetch_related('form__fields', 'form__categories')
             .order_by('order')
         )
+        if not steps:
+            return Response({'detail': 'All steps completed.'})
 
         for step in steps:
             ensure_form_password_if_private(step.form, request)
@@ -395,15 +487,13 @@ class CurrentStepsFreeView(ListAPIView):
                 'submitted_step_ids': submitted_ids,
             }
         )
-        if not steps.exists():
-            return Response({'detail': 'All steps completed.'})
-
         return Response(serializer.data)
 
+
 class SubmitFreeView(CreateAPIView):
     permission_classes = [AllowAny]
     serializer_class = StepSubmitPayloadSerializer
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [GuestInstanceRateThrottle]
     throttle_scope = 'submit_step'
 
     def create(self, request, *args, **kwargs):
@@ -437,25 +527,27 @@ class SubmitFreeView(CreateAPIView):
         if want_skip and not getattr(step, 'allow_skip', False):
             raise ValidationError({'detail': 'This step cannot be skipped.'})
 
-        if want_skip:
-            form_response = FormResponse.objects.create(
-                form=step.form,
-                user=request.user if request.user.is_authenticated else None,
+        if not want_skip:
+            known = set(
+                FormField.objects.filter(form=step.form, pk__in=[k for k in answers if str(k).isdigit()])
+                .values_list('pk', flat=True)
             )
-        else:
+            for field_id in answers:
+                if not str(field_id).isdigit() or int(field_id) not in known:
+                    raise ValidationError({'detail': f'Field {field_id} not found on this form.'})
+
+        with transaction.atomic():
             form_response = FormResponse.objects.create(
                 form=step.form,
                 user=request.user if request.user.is_authenticated else None,
             )
+            if not want_skip:
+                FormAnswer.objects.bulk_create([
+                    FormAnswer(response=form_response, field_id=int(field_id), value=value)
+                    for field_id, value in answers.items()
+                ])
 
-            for field_id, value in answers.items():
-                field_obj = (FormField.objects.filter(pk=field_id, form=step.form).first())
-                if not field_obj:
-                    raise ValidationError({'detail': f'Field {field_id} not found on this form.'})
-
-                FormAnswer.objects.create(response=form_response,field=field_obj,value=value,)
-
-        StepSubmission.objects.create(instance=instance,step=step,form_response=form_response,)
+            StepSubmission.objects.create(instance=instance,step=step,form_response=form_response,)
 
         instance.refresh_from_db()
         instance.mark_completed_if_done()
@@ -466,6 +558,8 @@ class SubmitFreeView(CreateAPIView):
 class SkipStepView(CreateAPIView):
     serializer_class = ProcessInstanceSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [GuestInstanceRateThrottle]
+    throttle_scope = 'submit_step'
 
     def create(self, request, *args, **kwargs):
         instance = (ProcessInstance.objects.filter(pk=self.kwargs.get('pk')).select_related('current_step__form', 'process').first())
@@ -493,3 +587,114 @@ class SkipStepView(CreateAPIView):
         instance.refresh_from_db()
 
         return Response(ProcessInstanceSerializer(instance).data, status=status.HTTP_201_CREATED)
+
+
+class ProcessFunnelView(ReplicaReadMixin, RetrieveAPIView):
+    queryset = Process.objects.select_related('owner')
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self):
+        process = super().get_object()
+        if process.owner.user_id != self.request.user.id:
+            raise PermissionDenied("You don't have access to analytics for this process.")
+        return process
+
+    def retrieve(self, request, *args, **kwargs):
+        process = self.get_object()
+        key = f'proc:funnel:{process.id}'
+        data = cache.get(key)
+        if data is None:
+            with primary_reads():
+                data = process_funnel(process)
+            cache.set(key, data, timeout=settings.CACHE_TTL)
+        return Response(data)
+
+
+class OwnerInstanceListView(ReplicaReadMixin, ListAPIView):
+    serializer_class = OwnerInstanceSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = InstanceKeysetPagination
+
+    def get_owned_instances(self):
+        qs = ProcessInstance.objects.filter(process__owner__user=self.request.user)
+        process_id = self.request.query_params.get('process')
+        if process_id:
+            if not process_id.isdigit():
+                raise ValidationError({'process': 'Must be a process id.'})
+            qs = qs.filter(process_id=int(process_id))
+        return qs
+
+    def get_queryset(self):
+        qs = self.get_owned_instances()
+        statuses = [s for s in self.request.query_params.getlist('status') if s]
+        if statuses:
+            valid = {choice for choice, _ in ProcessInstance.STATUS_CHOICES}
+            if not set(statuses) <= valid:
+                raise ValidationError({'status': f'Must be one of: {", ".join(sorted(valid))}.'})
+            qs = qs.filter(status__in=statuses)
+
+        done = (
+            StepSubmission.objects.filter(instance=OuterRef('pk'))
+            .order_by().values('instance').annotate(c=Count('id')).values('c')
+        )
+        total = (
+            ProcessStep.objects.filter(process=OuterRef('process_id'))
+            .order_by().values('process').annotate(c=Count('id')).values('c')
+        )
+        return (
+            qs.select_related('process')
+            .annotate(
+                steps_done=Coalesce(Subquery(done, output_field=IntegerField()), 0),
+                steps_total=Coalesce(Subquery(total, output_field=IntegerField()), 0),
+            )
+            .annotate(
+                progress=Coalesce(
+                    100.0 * Cast('steps_done', FloatField()) / NullIf('steps_total', 0),
+                    Value(0.0),
+                    output_field=FloatField(),
+                )
+            )
+        )
+
+    def list(self, request, *args, **kwargs):
+        counts = dict(
+            self.get_owned_instances()
+            .values_list('status')
+            .annotate(n=Count('id'))
+            .order_by()
+        )
+        page = self.paginate_queryset(self.get_queryset())
+        response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        response.data['counts'] = counts
+        return response
+
+
+class ProcessExportView(ReplicaReadMixin, ListAPIView):
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+
+    def get_queryset(self):
+        qs = Process.objects.filter(owner__user=self.request.user)
+        ids = [i for i in self.request.query_params.get('ids', '').split(',') if i]
+        if ids:
+            if not all(i.isdigit() for i in ids):
+                raise ValidationError({'ids': 'ids must be a comma separated list of integers.'})
+            qs = qs.filter(id__in=ids)
+        return qs.order_by('id')
+
+    def list(self, request, *args, **kwargs):
+        return Response(export_processes(self.get_queryset()))
+
+
+class ProcessImportView(CreateAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = ProcessBundleSerializer
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        processes = import_processes(serializer.validated_data, request.user)
+        return Response(
+            {'created': [{'id': p.id, 'title': p.title} for p in processes]},
+            status=status.HTTP_201_CREATED,
+        )
@@ -1,3 +1,17 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ResponseRollup, RollupWatermark
+
+
+@admin.register(ResponseRollup)
+class ResponseRollupAdmin(admin.ModelAdmin):
+    list_display = ['id', 'form', 'field', 'granularity', 'bucket_start', 'count']
+    list_filter = ['granularity']
+    search_fields = ['form__name', 'field__question']
+    readonly_fields = ['form', 'field', 'granularity', 'bucket_start', 'count', 'option_counts']
+    ordering = ['-bucket_start']
+
+
+@admin.register(RollupWatermark)
+class RollupWatermarkAdmin(admin.ModelAdmin):
+    list_display = ['name', 'last_response_id', 'updated_at']
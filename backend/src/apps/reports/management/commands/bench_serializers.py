@@ -0,0 +1,211 @@
+import json
+import platform
+import statistics
+import timeit
+import tracemalloc
+from functools import partial
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.categories.models import FormCategory, ProcessCategory
+from apps.forms.models import Answer, Field, Form, Response
+from apps.forms.serializer import FormSerializer
+from apps.processes.models import Process, ProcessInstance, ProcessStep
+from apps.processes.serializers import CurrentStepSerializer, ProcessInstanceSerializer
+from apps.reports.serializers import FormReportSerializer
+
+FIELD_TYPES = ['text', 'number', 'select', 'checkbox', 'date']
+OPTIONS = ['a', 'b', 'c', 'd']
+REPORT_FIELDS = 10
+
+
+def int_list(value):
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+class Command(BaseCommand):
+    help = (
+        'Microbenchmark the process/form serializers and the form report engine at growing sizes, '
+        'save the results as a JSON baseline and compare against an earlier one (writes are rolled back)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--steps', type=int_list, default=[5, 20, 50], help='Step counts for instances.')
+        parser.add_argument('--fields', type=int_list, default=[10, 50, 200], help='Field counts for forms.')
+        parser.add_argument('--responses', type=int_list, default=[100, 1000, 10000], help='Responses per report.')
+        parser.add_argument('--only', help='Run only cases whose name contains this text.')
+        parser.add_argument('--rounds', type=int, default=5, help='Timed rounds per case; the median is kept.')
+        parser.add_argument('--save', help='Write results to this JSON file.')
+        parser.add_argument('--compare', help='JSON baseline from an earlier run.')
+        parser.add_argument('--threshold', type=float, default=10.0,
+                            help='Fail when a case loses more than this many percent of its ops/sec.')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as fh:
+                baseline = json.load(fh)
+
+        with transaction.atomic():
+            self.owner, _ = get_user_model().objects.get_or_create(username='bench')
+            cases = self.build_cases(options)
+            results = {
+                name: self.measure(build(), size, max(1, options['rounds']))
+                for name, size, build in cases
+                if not options['only'] or options['only'] in name
+            }
+            transaction.set_rollback(True)
+
+        report = {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'cases': results,
+        }
+        if options['save']:
+            with open(options['save'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+
+        regressions = []
+        if baseline is not None:
+            report['compare'] = self.compare(baseline, report, options['threshold'], regressions)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.print_report(report)
+        if regressions:
+            raise CommandError(f"Slower than baseline by more than {options['threshold']}%: {', '.join(regressions)}")
+
+    def build_cases(self, options):
+        # Builders run lazily so --only skips the data it does not need.
+        for steps in options['steps']:
+            yield f'process_instance[steps={steps}]', steps, partial(self.instance_case, steps)
+        for fields in options['fields']:
+            yield f'form[fields={fields}]', fields, partial(self.form_case, fields)
+        for fields in options['fields']:
+            yield f'current_step[fields={fields}]', fields, partial(self.current_step_case, fields)
+        for responses in options['responses']:
+            yield f'form_report[responses={responses}]', responses, partial(self.report_case, responses)
+
+    def make_form(self, fields):
+        form = Form.objects.create(name=f'Bench {fields} fields', created_by=self.owner)
+        Field.objects.bulk_create([
+            Field(
+                form=form,
+                question=f'Q{position}',
+                field_type=FIELD_TYPES[position % len(FIELD_TYPES)],
+                position=position,
+                options=OPTIONS if FIELD_TYPES[position % len(FIELD_TYPES)] in ('select', 'checkbox') else None,
+            )
+            for position in range(fields)
+        ])
+        return form
+
+    def instance_case(self, steps):
+        form = self.make_form(5)
+        process = Process.objects.create(owner=self.owner.profile, title=f'Bench {steps} steps')
+        step_objs = ProcessStep.objects.bulk_create([
+            ProcessStep(process=process, form=form, title=f'Step {order}', order=order)
+            for order in range(1, steps + 1)
+        ])
+        for i in range(3):
+            ProcessCategory.objects.create(user=self.owner, name=f'Bench {steps}-{i}').process.add(process)
+        instance = ProcessInstance.objects.create(process=process, current_step=step_objs[0], access_token='bench')
+        instance = (
+            ProcessInstance.objects
+            .select_related('process', 'current_step')
+            .prefetch_related('process__steps', 'process__categories')
+            .get(pk=instance.pk)
+        )
+        return lambda: ProcessInstanceSerializer(instance).data
+
+    def form_case(self, fields):
+        form = self.make_form(fields)
+        for i in range(3):
+            FormCategory.objects.create(user=self.owner, name=f'Bench {fields}-{i}').forms.add(form)
+        form = Form.objects.prefetch_related('fields', 'categories').get(pk=form.pk)
+        return lambda: FormSerializer(form).data
+
+    def current_step_case(self, fields):
+        form = self.make_form(fields)
+        process = Process.objects.create(owner=self.owner.profile, title=f'Bench step {fields} fields')
+        step = ProcessStep.objects.create(process=process, form=form, order=1)
+        step = ProcessStep.objects.select_related('form').prefetch_related('form__fields').get(pk=step.pk)
+        return lambda: CurrentStepSerializer(step).data
+
+    def report_case(self, responses):
+        # The report queries every time, so this measures the engine end to end.
+        form = self.make_form(REPORT_FIELDS)
+        fields = list(form.fields.all())
+        rows = Response.objects.bulk_create([Response(form=form) for _ in range(responses)])
+        Answer.objects.bulk_create(
+            [Answer(response=r, field=f, value=self.value(f, i)) for i, r in enumerate(rows) for f in fields],
+            batch_size=5000,
+        )
+        return lambda: FormReportSerializer(form).data
+
+    def value(self, field, i):
+        if field.field_type == 'number':
+            return str(i % 100)
+        if field.field_type == 'select':
+            # Skewed so the last option is picked most often.
+            return OPTIONS[min(i % 7, len(OPTIONS) - 1)]
+        if field.field_type == 'checkbox':
+            return ','.join(OPTIONS[:1 + i % 3])
+        if field.field_type == 'date':
+            return f'2025-01-{1 + i % 28:02d}'
+        return f'answer {i % 13}'
+
+    def measure(self, op, size, rounds):
+        with CaptureQueriesContext(connection) as queries:
+            op()
+
+        tracemalloc.start()
+        try:
+            op()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        timer = timeit.Timer(op)
+        number, _ = timer.autorange()
+        per_op = sorted(t / number for t in timer.repeat(repeat=rounds, number=number))
+        median = statistics.median(per_op)
+        return {
+            'size': size,
+            'ops_per_sec': round(1 / median, 1),
+            'median_us': round(median * 1e6, 1),
+            'min_us': round(per_op[0] * 1e6, 1),
+            'peak_kib': round(peak / 1024, 1),
+            'queries': len(queries),
+        }
+
+    def compare(self, baseline, report, threshold, regressions):
+        out = {}
+        for name, now in report['cases'].items():
+            was = baseline.get('cases', {}).get(name)
+            if not was:
+                continue
+            ops = round((now['ops_per_sec'] - was['ops_per_sec']) / was['ops_per_sec'] * 100, 1)
+            peak = round((now['peak_kib'] - was['peak_kib']) / was['peak_kib'] * 100, 1) if was['peak_kib'] else None
+            out[name] = {'ops_per_sec': ops, 'peak_kib': peak, 'queries': now['queries'] - was['queries']}
+            if ops < -threshold:
+                regressions.append(name)
+        return out
+
+    def print_report(self, report):
+        deltas = report.get('compare', {})
+        for name, r in report['cases'].items():
+            line = (
+                f"{name:<32} {r['ops_per_sec']:>10.1f} ops/s  median {r['median_us']:.1f}us  "
+                f"peak {r['peak_kib']:.1f}KiB  {r['queries']} queries"
+            )
+            if name in deltas:
+                d = deltas[name]
+                line += f"  ({d['ops_per_sec']:+.1f}% ops/s, {d['queries']:+d} queries)"
+            self.stdout.write(line)
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('forms', '0004_alter_response_form'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('last_response_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ResponseRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=8)),
+                ('bucket_start', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('option_counts', models.JSONField(blank=True, default=dict)),
+                ('field', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='forms.field')),
+                ('form', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='forms.form')),
+            ],
+            options={
+                'ordering': ['bucket_start'],
+                'indexes': [models.Index(fields=['form', 'granularity', 'bucket_start'], name='idx_rollup_form_bucket')],
+                'constraints': [models.UniqueConstraint(fields=('form', 'field', 'granularity', 'bucket_start'), name='uniq_rollup_field_bucket'), models.UniqueConstraint(condition=models.Q(('field__isnull', True)), fields=('form', 'granularity', 'bucket_start'), name='uniq_rollup_form_bucket')],
+            },
+        ),
+    ]
@@ -1,3 +1,50 @@
 from django.db import models
+from django.db.models import Q
 
-# Create your models here.
+from apps.forms.models import Form, Field
+
+
+class ResponseRollup(models.Model):
+    HOUR = 'hour'
+    DAY = 'day'
+    GRANULARITY_CHOICES = [
+        (HOUR, 'Hour'),
+        (DAY, 'Day'),
+    ]
+
+    form = models.ForeignKey(Form, on_delete=models.CASCADE, related_name='rollups')
+    field = models.ForeignKey(Field, on_delete=models.CASCADE, null=True, blank=True, related_name='rollups')
+    granularity = models.CharField(max_length=8, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+    option_counts = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ['bucket_start']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['form', 'field', 'granularity', 'bucket_start'],
+                name='uniq_rollup_field_bucket',
+            ),
+            models.UniqueConstraint(
+                fields=['form', 'granularity', 'bucket_start'],
+                condition=Q(field__isnull=True),
+                name='uniq_rollup_form_bucket',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['form', 'granularity', 'bucket_start'], name='idx_rollup_form_bucket'),
+        ]
+
+    def __str__(self):
+        target = self.field.question if self.field_id else 'responses'
+        return f'{self.form} · {target} @ {self.bucket_start:%Y-%m-%d %H:%M} ({self.granularity})'
+
+
+class RollupWatermark(models.Model):
+    name = models.CharField(max_length=64, unique=True)
+    last_response_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.name}: {self.last_response_id}'
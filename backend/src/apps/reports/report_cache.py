@@ -0,0 +1,77 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from config.db_router import primary_reads
+
+COMPUTE_LOCK_TTL = 30
+# Waiters hold a request worker, so they give up well before the lock expires.
+MAX_WAIT = 2
+WAIT_INTERVAL = 0.05
+
+
+def _schema_key(form_id):
+    return f'reports:form:{form_id}:schema'
+
+
+def _watermark_key(form_id):
+    return f'reports:form:{form_id}:watermark'
+
+
+def _bump(key):
+    # Counters are seeded from the clock so a counter lost to eviction never
+    # falls back to a version an old cached report was stored under.
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, time.time_ns(), timeout=None):
+            cache.incr(key)
+
+
+def bump_report_watermark(form_id):
+    _bump(_watermark_key(form_id))
+
+
+def bump_report_schema(form_id):
+    _bump(_schema_key(form_id))
+
+
+def report_version(form_id):
+    keys = [_schema_key(form_id), _watermark_key(form_id)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return versions[keys[0]], versions[keys[1]]
+
+
+def cached_report(form_id, kind, compute):
+    schema, watermark = report_version(form_id)
+    key = f'reports:form:{form_id}:{kind}:s{schema}:w{watermark}'
+
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    # Only one caller computes a given version; the others wait briefly for
+    # its result and then compute it themselves.
+    lock_key = f'{key}:lock'
+    deadline = time.monotonic() + MAX_WAIT
+    locked = cache.add(lock_key, 1, timeout=COMPUTE_LOCK_TTL)
+    while not locked and time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        result = cache.get(key)
+        if result is not None:
+            return result
+        locked = cache.add(lock_key, 1, timeout=COMPUTE_LOCK_TTL)
+
+    try:
+        with primary_reads():
+            result = compute()
+        cache.set(key, result, timeout=settings.REPORT_CACHE_TTL)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return result
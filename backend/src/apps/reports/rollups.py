@@ -0,0 +1,174 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+from itertools import takewhile
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from apps.forms.models import Response, Answer
+from apps.reports.models import ResponseRollup, RollupWatermark
+
+ROLLUP_WATERMARK = 'responses'
+OPTION_FIELD_TYPES = ('select', 'checkbox')
+
+
+def split_option_values(field_type, value):
+    if field_type == 'checkbox':
+        return [s.strip() for s in value.split(',')]
+    return [value]
+
+
+def _bucket_starts(hour):
+    return (
+        (ResponseRollup.HOUR, hour),
+        (ResponseRollup.DAY, hour.replace(hour=0)),
+    )
+
+
+def _floor(moment, granularity):
+    moment = moment.astimezone(timezone.get_current_timezone())
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == ResponseRollup.DAY:
+        moment = moment.replace(hour=0)
+    return moment
+
+
+def _collect_deltas(lo, hi, form_ids=None):
+    deltas = defaultdict(lambda: {'count': 0, 'options': Counter()})
+    responses = Response.objects.filter(id__gt=lo, id__lte=hi)
+    answers = Answer.objects.filter(response_id__gt=lo, response_id__lte=hi)
+    if form_ids is not None:
+        responses = responses.filter(form_id__in=form_ids)
+        answers = answers.filter(response__form_id__in=form_ids)
+
+    responses = (
+        responses
+        .annotate(bucket=TruncHour('submitted_at'))
+        .values('form_id', 'bucket')
+        .annotate(n=Count('id'))
+    )
+    for row in responses:
+        for granularity, bucket_start in _bucket_starts(row['bucket']):
+            deltas[(row['form_id'], None, granularity, bucket_start)]['count'] += row['n']
+
+    per_field = (
+        answers
+        .annotate(bucket=TruncHour('response__submitted_at'))
+        .values('response__form_id', 'field_id', 'bucket')
+        .annotate(n=Count('id'))
+    )
+    for row in per_field:
+        for granularity, bucket_start in _bucket_starts(row['bucket']):
+            deltas[(row['response__form_id'], row['field_id'], granularity, bucket_start)]['count'] += row['n']
+
+    options = (
+        answers
+        .filter(field__field_type__in=OPTION_FIELD_TYPES)
+        .annotate(bucket=TruncHour('response__submitted_at'))
+        .values('response__form_id', 'field_id', 'field__field_type', 'bucket', 'value')
+        .annotate(n=Count('id'))
+    )
+    for row in options:
+        for option in split_option_values(row['field__field_type'], row['value']):
+            for granularity, bucket_start in _bucket_starts(row['bucket']):
+                key = (row['response__form_id'], row['field_id'], granularity, bucket_start)
+                deltas[key]['options'][option] += row['n']
+
+    return deltas
+
+
+def _apply_deltas(deltas):
+    form_ids = {key[0] for key in deltas}
+    bucket_starts = {key[3] for key in deltas}
+    existing = {
+        (r.form_id, r.field_id, r.granularity, r.bucket_start): r
+        for r in ResponseRollup.objects.filter(form_id__in=form_ids, bucket_start__in=bucket_starts)
+    }
+
+    to_create, to_update = [], []
+    for key, delta in deltas.items():
+        rollup = existing.get(key)
+        if rollup is None:
+            form_id, field_id, granularity, bucket_start = key
+            rollup = ResponseRollup(
+                form_id=form_id,
+                field_id=field_id,
+                granularity=granularity,
+                bucket_start=bucket_start,
+            )
+            to_create.append(rollup)
+        else:
+            to_update.append(rollup)
+
+        rollup.count += delta['count']
+        if delta['options']:
+            merged = Counter(rollup.option_counts or {})
+            merged.update(delta['options'])
+            rollup.option_counts = dict(merged)
+
+    ResponseRollup.objects.bulk_create(to_create)
+    ResponseRollup.objects.bulk_update(to_update, ['count', 'option_counts'])
+
+
+def rollup_new_responses(batch_size=5000, settle_seconds=30):
+    # Responses newer than `settle_seconds` are left for the next run: their answers
+    # are written after the response row and lower ids may still be uncommitted.
+    cutoff = timezone.now() - timedelta(seconds=settle_seconds)
+
+    with transaction.atomic():
+        mark, _ = RollupWatermark.objects.select_for_update().get_or_create(name=ROLLUP_WATERMARK)
+
+        rows = (
+            Response.objects
+            .filter(id__gt=mark.last_response_id)
+            .order_by('id')
+            .values_list('id', 'submitted_at')[:batch_size]
+        )
+        settled = list(takewhile(lambda row: row[1] < cutoff, rows))
+        if not settled:
+            return 0
+
+        lo, hi = mark.last_response_id, settled[-1][0]
+        _apply_deltas(_collect_deltas(lo, hi))
+
+        mark.last_response_id = hi
+        mark.save(update_fields=['last_response_id', 'updated_at'])
+
+    return len(settled)
+
+
+def rebuild_form_rollups(form_ids):
+    # Recount these forms up to the watermark, for rows written out of id order
+    # that an incremental run may have stepped over.
+    with transaction.atomic():
+        mark, _ = RollupWatermark.objects.select_for_update().get_or_create(name=ROLLUP_WATERMARK)
+        ResponseRollup.objects.filter(form_id__in=form_ids).delete()
+        _apply_deltas(_collect_deltas(0, mark.last_response_id, form_ids))
+
+
+def summarize_trend(form, granularity, field=None, start=None, end=None):
+    qs = ResponseRollup.objects.filter(form=form, field=field, granularity=granularity)
+    if start is not None:
+        qs = qs.filter(bucket_start__gte=_floor(start, granularity))
+    if end is not None:
+        qs = qs.filter(bucket_start__lt=end)
+
+    total = 0
+    options = Counter()
+    buckets = []
+    for bucket_start, count, option_counts in qs.order_by('bucket_start').values_list(
+        'bucket_start', 'count', 'option_counts'
+    ):
+        total += count
+        options.update(option_counts or {})
+        bucket = {'bucket_start': bucket_start, 'count': count}
+        if field is not None and field.field_type in OPTION_FIELD_TYPES:
+            bucket['options'] = option_counts or {}
+        buckets.append(bucket)
+
+    summary = {'total': total, 'buckets': buckets}
+    if field is not None and field.field_type in OPTION_FIELD_TYPES:
+        summary['options'] = dict(options)
+    return summary
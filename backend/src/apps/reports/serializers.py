@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from apps.forms.models import Form, Response, Answer
+from apps.reports.models import ResponseRollup
 from django.db.models import Avg, Min, Max, Count, FloatField
 from django.db.models.functions import Cast
 
@@ -56,16 +57,34 @@ class FormStatsSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'views_count', 'responses_count', 'created_at']
 
     def get_responses_count(self, obj):
+        if hasattr(obj, 'responses_count'):
+            return obj.responses_count
         return Response.objects.filter(form=obj).count()
 
 
+class FormDashboardSerializer(serializers.ModelSerializer):
+    responses_count = serializers.IntegerField(read_only=True)
+    responses_24h = serializers.IntegerField(read_only=True)
+    last_submitted_at = serializers.DateTimeField(read_only=True)
+
+    class Meta:
+        model = Form
+        fields = ['id', 'name', 'views_count', 'responses_count', 'responses_24h', 'last_submitted_at', 'created_at']
+
+
 class AnswerReportSerializer(serializers.ModelSerializer):
-    question = serializers.CharField(source='field.question', read_only=True)
+    question = serializers.SerializerMethodField()
 
     class Meta:
         model = Answer
         fields = ['question', 'value']
 
+    def get_question(self, obj):
+        questions = self.context.get('questions')
+        if questions is not None:
+            return questions.get(obj.field_id)
+        return obj.field.question
+
 
 class ResponseReportSerializer(serializers.ModelSerializer):
     user = serializers.CharField(source='user.username', default=None)
@@ -76,9 +95,14 @@ class ResponseReportSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'submitted_at', 'answers']
 
 
-class FormResponsesReportSerializer(serializers.ModelSerializer):
-    responses = ResponseReportSerializer(many=True, read_only=True)
+class TrendQuerySerializer(serializers.Serializer):
+    granularity = serializers.ChoiceField(choices=ResponseRollup.GRANULARITY_CHOICES, default=ResponseRollup.DAY)
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    field = serializers.IntegerField(required=False)
 
-    class Meta:
-        model = Form
-        fields = ['id', 'name', 'responses']
+    def validate(self, attrs):
+        start, end = attrs.get('start'), attrs.get('end')
+        if start and end and start >= end:
+            raise serializers.ValidationError({'end': 'end must be after start.'})
+        return attrs
@@ -1,20 +1,58 @@
-from django.db.models.signals import post_save
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from apps.forms.models import Response
+from apps.forms.models import Form, Field, Response, Answer
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
-from reports.serializers import FormReportSerializer
+from apps.reports.report_cache import bump_report_watermark, bump_report_schema, cached_report
+from apps.reports.serializers import FormReportSerializer
+
 
 @receiver(post_save, sender=Response)
-def send_real_time_report(sender, instance, created, **kwargs):
+def bump_watermark_on_response(sender, instance, created, **kwargs):
+    # Bumped on commit: a report computed from pre-commit rows must not be
+    # cached under the new watermark.
     if created:
-        form = instance.form
-        serializer = FormReportSerializer(form)
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            f'form_{form.id}_report',
-            {
-                'type': 'send_report',
-                'report': serializer.data
-            }
-        )
+        transaction.on_commit(partial(bump_report_watermark, instance.form_id))
+
+
+@receiver(post_save, sender=Answer)
+def bump_watermark_on_answer(sender, instance, **kwargs):
+    transaction.on_commit(partial(bump_report_watermark, instance.response.form_id))
+
+
+@receiver(post_save, sender=Form)
+def bump_schema_on_form(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields == frozenset({'views_count'}):
+        return
+    bump_report_schema(instance.id)
+
+
+@receiver(post_save, sender=Field)
+@receiver(post_delete, sender=Field)
+def bump_schema_on_field(sender, instance, **kwargs):
+    bump_report_schema(instance.form_id)
+
+
+def push_live_report(form_id):
+    channel_layer = get_channel_layer()
+    form = Form.objects.filter(pk=form_id).first()
+    if channel_layer is None or form is None:
+        return
+    report = cached_report(form.id, 'report', lambda: FormReportSerializer(form).data)
+    async_to_sync(channel_layer.group_send)(
+        f'form_{form.id}_report',
+        {
+            'type': 'send_report',
+            'report': report
+        }
+    )
+
+
+@receiver(post_save, sender=Response)
+def send_real_time_report(sender, instance, created, **kwargs):
+    # Answers are written after the response row, so report once they have committed.
+    if created and get_channel_layer() is not None:
+        transaction.on_commit(partial(push_live_report, instance.form_id))
@@ -1,29 +1,71 @@
+import io
+import json
+import logging
+import time
+
 from celery import shared_task
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.mail import send_mass_mail
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count
+
 from apps.forms.models import Form
-from apps.reports.serializers import FormStatsSerializer
-from django.core.mail import send_mail
-import json
+from apps.reports.rollups import rollup_new_responses
+
+logger = logging.getLogger(__name__)
+
+DIGEST_CHUNK_SIZE = 2000
+
+
+def build_stats_digest(chunk_size=DIGEST_CHUNK_SIZE):
+    rows = (
+        Form.objects
+        .annotate(responses_count=Count('responses'))
+        .order_by('id')
+        .values('id', 'name', 'views_count', 'responses_count', 'created_at')
+    )
+    # Rows are encoded as they stream in, so only one chunk is held at a time.
+    body = io.StringIO()
+    count = 0
+    body.write('[')
+    for row in rows.iterator(chunk_size=chunk_size):
+        body.write(',\n  ' if count else '\n  ')
+        body.write(json.dumps(row, ensure_ascii=False, cls=DjangoJSONEncoder))
+        count += 1
+    body.write('\n]' if count else ']')
+    return body.getvalue(), count
+
+
+@shared_task
+def send_periodic_report(period=None):
+    started = time.monotonic()
+
+    report_json, rows_read = build_stats_digest()
+
+    recipients = list(
+        User.objects.filter(is_superuser=True).exclude(email='').values_list('email', flat=True)
+    )
+    subject = f'{period.capitalize()} reports of forms' if period else 'Periodic reports of forms'
+    sent = send_mass_mail(
+        [(subject, report_json, settings.DEFAULT_FROM_EMAIL, [email]) for email in recipients],
+        fail_silently=False,
+    )
+
+    elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+    logger.info(
+        'stats digest sent',
+        extra={'period': period, 'rows_read': rows_read, 'emails_sent': sent, 'duration_ms': elapsed_ms},
+    )
+    return f'Report of {rows_read} form(s) sent to {sent} admin(s) in {elapsed_ms}ms'
+
 
 @shared_task
-def send_periodic_report():
-    admin_users = User.objects.filter(is_superuser=True)
-
-    forms = Form.objects.all()
-    report_data = []
-    for form in forms:
-        stats = FormStatsSerializer(form).data
-        report_data.append(stats)
-
-    report_json = json.dumps(report_data, indent=2, ensure_ascii=False)
-
-    for admin in admin_users:
-        send_mail(
-            subject='Periodic reports of forms',
-            message=report_json,
-            from_email='no-reply@example.com',
-            recipient_list=[admin.email],
-            fail_silently=False,
-        )
-
-    return f'Report sent to {admin_users.count()} admin(s)'
+def rollup_form_responses(batch_size=5000, max_batches=20):
+    total = 0
+    for _ in range(max_batches):
+        rolled = rollup_new_responses(batch_size=batch_size)
+        total += rolled
+        if rolled < batch_size:
+            break
+    return f'Rolled up {total} response(s)'
@@ -0,0 +1,41 @@
+import pytest
+import uuid
+
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from apps.forms.models import Form, Field
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def api():
+    return APIClient()
+
+
+@pytest.fixture
+def owner_user(django_user_model, db):
+    return django_user_model.objects.create_user(username='owner', password='pass')
+
+
+@pytest.fixture
+def survey_form(db, owner_user):
+    form = Form.objects.create(
+        name='Survey',
+        access='public',
+        password='',
+        created_by=owner_user,
+        slug=f's{uuid.uuid4().hex[:4]}',
+    )
+    color = Field.objects.create(
+        form=form, question='Color', field_type='select', position=1, options=['red', 'blue'],
+    )
+    extras = Field.objects.create(
+        form=form, question='Extras', field_type='checkbox', position=2, options=['a', 'b', 'c'],
+    )
+    return form, color, extras
@@ -0,0 +1,39 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from apps.forms.models import Form
+
+SMALL = {'steps': [3], 'fields': [4], 'responses': [20], 'rounds': 1}
+
+
+@pytest.mark.django_db
+def test_bench_saves_a_baseline_and_rolls_back(tmp_path):
+    baseline = tmp_path / 'baseline.json'
+
+    call_command('bench_serializers', save=str(baseline), stdout=StringIO(), **SMALL)
+
+    cases = json.loads(baseline.read_text())['cases']
+    assert set(cases) == {
+        'process_instance[steps=3]', 'form[fields=4]', 'current_step[fields=4]', 'form_report[responses=20]',
+    }
+    assert all(c['ops_per_sec'] > 0 and c['peak_kib'] > 0 for c in cases.values())
+    # Prefetched serializers run without queries; the report engine queries per field.
+    assert cases['form[fields=4]']['queries'] == 0
+    assert cases['form_report[responses=20]']['queries'] > 0
+    assert not Form.objects.exists()
+
+
+@pytest.mark.django_db
+def test_bench_fails_when_slower_than_baseline(tmp_path):
+    baseline = tmp_path / 'baseline.json'
+    call_command('bench_serializers', only='form[', save=str(baseline), stdout=StringIO(), **SMALL)
+    data = json.loads(baseline.read_text())
+    data['cases']['form[fields=4]']['ops_per_sec'] *= 100
+    baseline.write_text(json.dumps(data))
+
+    with pytest.raises(CommandError, match=r'form\[fields=4\]'):
+        call_command('bench_serializers', only='form[', compare=str(baseline), stdout=StringIO(), **SMALL)
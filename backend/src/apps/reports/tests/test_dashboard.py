@@ -0,0 +1,39 @@
+import pytest
+import uuid
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+from apps.forms.models import Form, Response as FormResponse
+
+
+@pytest.mark.django_db
+def test_dashboard_lists_owned_forms_in_one_grouped_query(
+    api, owner_user, survey_form, django_user_model, django_assert_num_queries
+):
+    form, _, _ = survey_form
+    quiet = Form.objects.create(name='Quiet', created_by=owner_user, slug=f'q{uuid.uuid4().hex[:4]}')
+    other = django_user_model.objects.create_user(username='other', password='pass')
+    Form.objects.create(name='Not mine', created_by=other, slug=f'n{uuid.uuid4().hex[:4]}')
+
+    old = FormResponse.objects.create(form=form)
+    FormResponse.objects.filter(pk=old.pk).update(submitted_at=timezone.now() - timedelta(days=2))
+    latest = FormResponse.objects.create(form=form)
+
+    api.force_authenticate(owner_user)
+    url = reverse('forms-dashboard')
+
+    # page count + grouped stats query
+    with django_assert_num_queries(2):
+        res = api.get(url)
+    assert res.status_code == 200
+    rows = {row['id']: row for row in res.data['results']}
+    assert set(rows) == {form.id, quiet.id}
+    assert rows[form.id]['responses_count'] == 2
+    assert rows[form.id]['responses_24h'] == 1
+    assert rows[form.id]['last_submitted_at'] is not None
+    assert rows[quiet.id]['responses_count'] == 0
+    assert rows[quiet.id]['last_submitted_at'] is None
+
+    with django_assert_num_queries(0):
+        assert api.get(url).data == res.data
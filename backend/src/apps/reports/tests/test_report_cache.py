@@ -0,0 +1,128 @@
+import threading
+import pytest
+
+from django.core.cache import cache
+from django.urls import reverse
+from apps.forms.models import Response as FormResponse, Answer, Field
+from apps.forms.serializer import ResponseSerializer
+from apps.reports.report_cache import cached_report, report_version
+
+
+@pytest.mark.django_db
+def test_report_is_served_from_cache_until_watermark_moves(
+    api, owner_user, survey_form, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    form, color, _ = survey_form
+    api.force_authenticate(owner_user)
+    url = reverse('form-report', kwargs={'form_id': form.pk})
+
+    first = api.get(url)
+    assert first.status_code == 200
+
+    with django_assert_num_queries(1):
+        cached = api.get(url)
+    assert cached.data == first.data
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = FormResponse.objects.create(form=form)
+        Answer.objects.create(response=response, field=color, value='red')
+
+    fresh = api.get(url)
+    color_stats = next(r for r in fresh.data['report'] if r['question'] == 'Color')
+    assert color_stats['stats'] == {'red': 1}
+
+
+@pytest.mark.django_db
+def test_schema_change_invalidates_report(survey_form):
+    form, _, _ = survey_form
+    before = report_version(form.id)
+
+    form.views_count += 1
+    form.save(update_fields=['views_count'])
+    assert report_version(form.id) == before
+
+    Field.objects.create(form=form, question='Age', field_type='number', position=3)
+    assert report_version(form.id)[0] != before[0]
+    assert report_version(form.id)[1] == before[1]
+
+
+@pytest.mark.django_db
+def test_stats_view_caches_response_count(
+    api, owner_user, survey_form, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    form, _, _ = survey_form
+    FormResponse.objects.create(form=form)
+    api.force_authenticate(owner_user)
+    url = reverse('form-stats', kwargs={'form_id': form.pk})
+
+    assert api.get(url).data['responses_count'] == 1
+    with django_assert_num_queries(1):
+        assert api.get(url).data['responses_count'] == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        FormResponse.objects.create(form=form)
+    assert api.get(url).data['responses_count'] == 2
+
+
+def test_concurrent_miss_waits_for_the_computing_caller():
+    cache.clear()
+    schema, watermark = report_version(4242)
+    key = f'reports:form:4242:report:s{schema}:w{watermark}'
+    cache.add(f'{key}:lock', 1, timeout=30)
+
+    threading.Timer(0.1, lambda: cache.set(key, {'report': 'ready'})).start()
+
+    def compute():
+        raise AssertionError('waiting caller must not recompute')
+
+    assert cached_report(4242, 'report', compute) == {'report': 'ready'}
+
+
+def test_waiting_caller_computes_after_the_wait_bound(monkeypatch):
+    cache.clear()
+    monkeypatch.setattr('apps.reports.report_cache.MAX_WAIT', 0.1)
+    schema, watermark = report_version(4243)
+    key = f'reports:form:4243:report:s{schema}:w{watermark}'
+    cache.add(f'{key}:lock', 1, timeout=30)
+
+    assert cached_report(4243, 'report', lambda: {'report': 'own'}) == {'report': 'own'}
+    assert cache.get(f'{key}:lock') == 1
+
+
+@pytest.mark.django_db
+def test_live_report_is_pushed_after_answers_commit(survey_form, monkeypatch, django_capture_on_commit_callbacks):
+    form, color, _ = survey_form
+    sent = []
+
+    class Layer:
+        async def group_send(self, group, message):
+            sent.append((group, message['report']))
+
+    monkeypatch.setattr('apps.reports.signals.get_channel_layer', lambda: Layer())
+    serializer = ResponseSerializer(data={'form': form.pk, 'answers': [{'field': color.pk, 'value': 'red'}]})
+    serializer.is_valid(raise_exception=True)
+    with django_capture_on_commit_callbacks(execute=True):
+        serializer.save()
+
+    assert len(sent) == 1
+    group, report = sent[0]
+    assert group == f'form_{form.pk}_report'
+    assert next(r for r in report['report'] if r['question'] == 'Color')['stats'] == {'red': 1}
+    assert cached_report(form.id, 'report', lambda: pytest.fail('pushed report was not cached')) == report
+
+
+@pytest.mark.django_db
+def test_report_read_before_commit_is_not_served_after_it(survey_form, django_capture_on_commit_callbacks):
+    form, color, _ = survey_form
+    before = report_version(form.id)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        serializer = ResponseSerializer(data={'form': form.pk, 'answers': [{'field': color.pk, 'value': 'red'}]})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        # Another worker would still see the pre-commit rows here.
+        assert report_version(form.id) == before
+        cached_report(form.id, 'report', lambda: {'report': 'stale'})
+
+    assert report_version(form.id) != before
+    assert cached_report(form.id, 'report', lambda: {'report': 'fresh'}) == {'report': 'fresh'}
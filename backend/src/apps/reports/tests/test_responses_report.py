@@ -0,0 +1,57 @@
+import pytest
+
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory
+from apps.forms.models import Response as FormResponse, Answer
+from apps.reports.views import FormResponsesReportView
+
+
+@pytest.fixture
+def answered_form(survey_form, django_user_model):
+    form, color, extras = survey_form
+    for i in range(5):
+        user = django_user_model.objects.create_user(username=f'u{i}', password='pass')
+        response = FormResponse.objects.create(form=form, user=user)
+        Answer.objects.create(response=response, field=color, value='red')
+        Answer.objects.create(response=response, field=extras, value='a')
+    return form
+
+
+@pytest.mark.django_db
+def test_responses_report_query_count_is_flat(api, owner_user, answered_form, django_assert_num_queries):
+    api.force_authenticate(owner_user)
+    url = reverse('form-responses-report', kwargs={'form_id': answered_form.pk})
+
+    # form, questions map, responses page with users, prefetched answers
+    with django_assert_num_queries(4):
+        res = api.get(url)
+
+    assert res.status_code == 200
+    assert len(res.data['responses']) == 5
+    first = res.data['responses'][0]
+    assert first['user'] == 'u4'
+    assert [a['question'] for a in first['answers']] == ['Color', 'Extras']
+
+
+@pytest.mark.django_db
+def test_responses_report_paginates_with_cursor(api, owner_user, answered_form):
+    api.force_authenticate(owner_user)
+    url = reverse('form-responses-report', kwargs={'form_id': answered_form.pk})
+
+    res = api.get(url, {'page_size': 2})
+    seen = [r['id'] for r in res.data['responses']]
+    while res.data['next']:
+        res = api.get(res.data['next'])
+        seen += [r['id'] for r in res.data['responses']]
+
+    assert seen == sorted(FormResponse.objects.values_list('id', flat=True), reverse=True)
+
+
+@pytest.mark.django_db
+def test_serializer_context_resolves_the_form_outside_list(owner_user, answered_form):
+    request = APIRequestFactory().get('/')
+    request.user = owner_user
+    view = FormResponsesReportView(request=request, kwargs={'form_id': answered_form.pk}, format_kwarg=None)
+
+    assert sorted(view.get_serializer_context()['questions'].values()) == ['Color', 'Extras']
+    assert view.get_queryset().count() == 5
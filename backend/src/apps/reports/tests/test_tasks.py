@@ -0,0 +1,45 @@
+import json
+import pytest
+
+from django.core import mail
+from apps.forms.models import Response as FormResponse
+from apps.reports.tasks import build_stats_digest, send_periodic_report
+
+
+@pytest.mark.django_db
+def test_periodic_report_uses_one_query_and_one_connection(
+    survey_form, django_user_model, django_assert_num_queries
+):
+    form, _, _ = survey_form
+    FormResponse.objects.create(form=form)
+    FormResponse.objects.create(form=form)
+    django_user_model.objects.create_superuser('root1', 'root1@example.com', 'pass')
+    django_user_model.objects.create_superuser('root2', 'root2@example.com', 'pass')
+    django_user_model.objects.create_superuser('root3', '', 'pass')
+
+    # annotated digest query + admin recipients
+    with django_assert_num_queries(2):
+        result = send_periodic_report(period='weekly')
+
+    assert len(mail.outbox) == 2
+    assert mail.outbox[0].subject == 'Weekly reports of forms'
+    digest = json.loads(mail.outbox[0].body)
+    assert digest == [{
+        'id': form.id,
+        'name': form.name,
+        'views_count': 0,
+        'responses_count': 2,
+        'created_at': digest[0]['created_at'],
+    }]
+    assert 'sent to 2 admin(s)' in result
+
+
+@pytest.mark.django_db
+def test_stats_digest_streams_rows_into_valid_json(survey_form):
+    form, _, _ = survey_form
+    body, count = build_stats_digest(chunk_size=1)
+    assert count == 1
+    assert [row['id'] for row in json.loads(body)] == [form.id]
+
+    form.delete()
+    assert build_stats_digest() == ('[]', 0)
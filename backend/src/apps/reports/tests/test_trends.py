@@ -0,0 +1,110 @@
+import pytest
+from datetime import datetime, timezone as dt_timezone
+
+from django.urls import reverse
+from apps.forms.models import Response as FormResponse, Answer
+from apps.reports.models import ResponseRollup, RollupWatermark
+from apps.reports.rollups import ROLLUP_WATERMARK, rebuild_form_rollups, rollup_new_responses
+
+
+def submit(form, submitted_at):
+    response = FormResponse.objects.create(form=form)
+    FormResponse.objects.filter(pk=response.pk).update(submitted_at=submitted_at)
+    return response
+
+
+def at(day, hour):
+    return datetime(2025, 11, day, hour, 15, tzinfo=dt_timezone.utc)
+
+
+@pytest.mark.django_db
+def test_rollup_is_incremental(survey_form):
+    form, color, extras = survey_form
+
+    r1 = submit(form, at(1, 9))
+    Answer.objects.create(response=r1, field=color, value='red')
+    Answer.objects.create(response=r1, field=extras, value='a, b')
+    r2 = submit(form, at(1, 10))
+    Answer.objects.create(response=r2, field=color, value='blue')
+
+    assert rollup_new_responses(settle_seconds=0) == 2
+    assert rollup_new_responses(settle_seconds=0) == 0
+
+    r3 = submit(form, at(1, 10))
+    Answer.objects.create(response=r3, field=color, value='red')
+    assert rollup_new_responses(settle_seconds=0) == 1
+
+    day = ResponseRollup.objects.get(form=form, field=None, granularity=ResponseRollup.DAY)
+    assert day.count == 3
+
+    hours = ResponseRollup.objects.filter(form=form, field=color, granularity=ResponseRollup.HOUR)
+    assert {h.bucket_start.hour: h.option_counts for h in hours} == {
+        9: {'red': 1},
+        10: {'blue': 1, 'red': 1},
+    }
+
+    extras_day = ResponseRollup.objects.get(form=form, field=extras, granularity=ResponseRollup.DAY)
+    assert extras_day.option_counts == {'a': 1, 'b': 1}
+
+
+@pytest.mark.django_db
+def test_rebuild_counts_rows_the_watermark_stepped_over(survey_form):
+    form, color, _ = survey_form
+    late = submit(form, at(1, 9))
+    Answer.objects.create(response=late, field=color, value='red')
+    early = submit(form, at(1, 10))
+    Answer.objects.create(response=early, field=color, value='blue')
+    # A run that saw only the higher id: it committed first.
+    RollupWatermark.objects.create(name=ROLLUP_WATERMARK, last_response_id=early.id)
+    ResponseRollup.objects.create(form=form, granularity=ResponseRollup.DAY, bucket_start=at(1, 0).replace(minute=0), count=1)
+
+    rebuild_form_rollups([form.id])
+
+    day = ResponseRollup.objects.get(form=form, field=None, granularity=ResponseRollup.DAY)
+    assert day.count == 2
+    color_day = ResponseRollup.objects.get(form=form, field=color, granularity=ResponseRollup.DAY)
+    assert color_day.option_counts == {'red': 1, 'blue': 1}
+    assert rollup_new_responses(settle_seconds=0) == 0
+
+
+@pytest.mark.django_db
+def test_trends_endpoint_sums_buckets(api, owner_user, survey_form):
+    form, color, _ = survey_form
+    for day, value in [(1, 'red'), (1, 'blue'), (2, 'red'), (3, 'red')]:
+        response = submit(form, at(day, 12))
+        Answer.objects.create(response=response, field=color, value=value)
+    rollup_new_responses(settle_seconds=0)
+
+    api.force_authenticate(owner_user)
+    url = reverse('form-trends', kwargs={'form_id': form.pk})
+
+    res = api.get(url, {'start': '2025-11-01T06:00:00Z', 'end': '2025-11-03T00:00:00Z'})
+    assert res.status_code == 200, res.data
+    assert res.data['total'] == 3
+    assert [b['count'] for b in res.data['buckets']] == [2, 1]
+
+    res = api.get(url, {'field': color.pk, 'granularity': 'hour'})
+    assert res.status_code == 200, res.data
+    assert res.data['options'] == {'red': 3, 'blue': 1}
+    assert len(res.data['buckets']) == 3
+
+
+@pytest.mark.django_db
+def test_trends_endpoint_is_owner_only(api, django_user_model, survey_form):
+    form, _, _ = survey_form
+    other = django_user_model.objects.create_user(username='other', password='pass')
+    api.force_authenticate(other)
+
+    res = api.get(reverse('form-trends', kwargs={'form_id': form.pk}))
+    assert res.status_code == 403
+
+
+@pytest.mark.django_db
+def test_trends_owner_check_does_not_load_the_owner(api, owner_user, survey_form, django_assert_num_queries):
+    form, _, _ = survey_form
+    api.force_authenticate(owner_user)
+
+    # form, rollup buckets
+    with django_assert_num_queries(2):
+        res = api.get(reverse('form-trends', kwargs={'form_id': form.pk}))
+    assert res.status_code == 200
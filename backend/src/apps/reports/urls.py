@@ -2,11 +2,15 @@ from django.urls import path
 from apps.reports.views import (
     FormReportView, 
     FormStatsView,
-    FormResponsesReportView
+    FormResponsesReportView,
+    FormTrendsView,
+    FormDashboardView,
     )
 
 urlpatterns = [
+    path('dashboard/', FormDashboardView.as_view(), name='forms-dashboard'),
     path('<int:form_id>/report/', FormReportView.as_view(), name='form-report'),
     path('<int:form_id>/stats/', FormStatsView.as_view(), name='form-stats'),
     path('<int:form_id>/responses/', FormResponsesReportView.as_view(), name='form-responses-report'),
+    path('<int:form_id>/trends/', FormTrendsView.as_view(), name='form-trends'),
 ]
\ No newline at end of file
@@ -1,15 +1,30 @@
+from datetime import timedelta
+from functools import cached_property
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Prefetch, Q
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import generics, permissions
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
 
-from apps.forms.models import Form
+from config.db_router import ReplicaReadMixin, primary_reads
+from apps.forms.models import Form, Response as FormResponse, Answer
+from apps.reports.pagination import DashboardPagination, ResponseCursorPagination
+from apps.reports.report_cache import cached_report
+from apps.reports.rollups import summarize_trend
 from apps.reports.serializers import (
     FormReportSerializer, 
     FormStatsSerializer,
-    FormResponsesReportSerializer,
+    FormDashboardSerializer,
+    ResponseReportSerializer,
+    TrendQuerySerializer,
     )
 
 
-class FormReportView(generics.RetrieveAPIView):
+class FormReportView(ReplicaReadMixin, generics.RetrieveAPIView):
     queryset = Form.objects.all()
     serializer_class = FormReportSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -17,12 +32,17 @@ class FormReportView(generics.RetrieveAPIView):
 
     def get_object(self):
         form = super().get_object()
-        if form.created_by != self.request.user:
+        if form.created_by_id != self.request.user.id:
             raise PermissionDenied("You don't have access to create report for this form.")
         return form
 
+    def retrieve(self, request, *args, **kwargs):
+        form = self.get_object()
+        data = cached_report(form.id, 'report', lambda: self.get_serializer(form).data)
+        return Response(data)
+
 
-class FormStatsView(generics.RetrieveAPIView):
+class FormStatsView(ReplicaReadMixin, generics.RetrieveAPIView):
     queryset = Form.objects.all()
     serializer_class = FormStatsSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -30,19 +50,116 @@ class FormStatsView(generics.RetrieveAPIView):
 
     def get_object(self):
         form = super().get_object()
-        if form.created_by != self.request.user:
+        if form.created_by_id != self.request.user.id:
             raise PermissionDenied("You don't have access to create report for this form.")
+        form.responses_count = cached_report(form.id, 'responses_count', form.responses.count)
         return form
 
 
-class FormResponsesReportView(generics.RetrieveAPIView):
+class FormResponsesReportView(ReplicaReadMixin, generics.ListAPIView):
+    serializer_class = ResponseReportSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ResponseCursorPagination
+
+    def get_form(self):
+        form = get_object_or_404(Form, pk=self.kwargs['form_id'])
+        if form.created_by_id != self.request.user.id:
+            raise PermissionDenied("You don't have access to view responses for this form.")
+        return form
+
+    @cached_property
+    def form(self):
+        return self.get_form()
+
+    def get_queryset(self):
+        answers = Answer.objects.only('id', 'response_id', 'field_id', 'value').order_by('id')
+        return (
+            FormResponse.objects
+            .filter(form=self.form)
+            .select_related('user')
+            .prefetch_related(Prefetch('answers', queryset=answers))
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['questions'] = dict(self.form.fields.values_list('id', 'question'))
+        return context
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
+        return Response({
+            'id': self.form.id,
+            'name': self.form.name,
+            'next': self.paginator.get_next_link(),
+            'previous': self.paginator.get_previous_link(),
+            'responses': serializer.data,
+        })
+
+
+class FormTrendsView(ReplicaReadMixin, generics.RetrieveAPIView):
     queryset = Form.objects.all()
-    serializer_class = FormResponsesReportSerializer
+    serializer_class = TrendQuerySerializer
     permission_classes = [permissions.IsAuthenticated]
     lookup_url_kwarg = 'form_id'
 
     def get_object(self):
         form = super().get_object()
-        if form.created_by != self.request.user:
-            raise PermissionDenied("You don't have access to view responses for this form.")
+        if form.created_by_id != self.request.user.id:
+            raise PermissionDenied("You don't have access to create report for this form.")
         return form
+
+    def retrieve(self, request, *args, **kwargs):
+        form = self.get_object()
+        query = self.get_serializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        field = None
+        if 'field' in params:
+            field = form.fields.filter(pk=params['field']).first()
+            if not field:
+                raise ValidationError({'field': 'Field not found on this form.'})
+
+        trend = summarize_trend(
+            form,
+            params['granularity'],
+            field=field,
+            start=params.get('start'),
+            end=params.get('end'),
+        )
+        return Response({
+            'id': form.id,
+            'name': form.name,
+            'granularity': params['granularity'],
+            'field': {'id': field.id, 'question': field.question, 'type': field.field_type} if field else None,
+            **trend,
+        })
+
+
+class FormDashboardView(ReplicaReadMixin, generics.ListAPIView):
+    serializer_class = FormDashboardSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = DashboardPagination
+
+    def get_queryset(self):
+        since = timezone.now() - timedelta(hours=24)
+        return (
+            Form.objects
+            .filter(created_by=self.request.user)
+            .annotate(
+                responses_count=Count('responses'),
+                responses_24h=Count('responses', filter=Q(responses__submitted_at__gte=since)),
+                last_submitted_at=Max('responses__submitted_at'),
+            )
+            .order_by('-created_at', '-id')
+        )
+
+    def list(self, request, *args, **kwargs):
+        key = f'reports:dashboard:{request.user.id}:{request.query_params.urlencode()}'
+        data = cache.get(key)
+        if data is None:
+            with primary_reads():
+                data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, timeout=settings.DASHBOARD_CACHE_TTL)
+        return Response(data)
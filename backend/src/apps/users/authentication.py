@@ -0,0 +1,154 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from apps.users.models import Profile
+
+LOCAL_CACHE_SIZE = 1024
+# What request handling reads; never the password hash. Other fields stay
+# deferred and load on first access.
+CACHED_USER_FIELDS = ('id', 'username', 'email', 'first_name', 'last_name', 'is_active', 'is_staff', 'is_superuser')
+CACHED_PROFILE_FIELDS = ('id', 'user_id', 'bio', 'join_date')
+
+
+class LocalTTLCache:
+    """A small thread-safe LRU whose entries also expire after a TTL."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_users = LocalTTLCache(LOCAL_CACHE_SIZE)
+
+
+def _version_key(user_id):
+    return f'auth:user:{user_id}:ver'
+
+
+def cached_user_version(user_id):
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_cached_user(user_id):
+    # Other processes drop their local copy within AUTH_USER_LOCAL_TTL.
+    local_users.pop(str(user_id))
+    key = _version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, time.time_ns(), timeout=None):
+            cache.incr(key)
+
+
+def get_cached_user(user_id):
+    # Token claims carry the id as a string; normalise so saves can find the entry.
+    user_id = str(user_id)
+    data = local_users.get(user_id)
+    if data is None:
+        key = f'auth:user:{user_id}:v{cached_user_version(user_id)}'
+        data = cache.get(key)
+        if data is None:
+            data = _load_user(user_id)
+            if data is None:
+                return None
+            cache.set(key, data, timeout=settings.AUTH_USER_CACHE_TTL)
+        local_users.set(user_id, data, settings.AUTH_USER_LOCAL_TTL)
+    return _build_user(data)
+
+
+def _load_user(user_id):
+    profile_columns = [f'profile__{f}' for f in CACHED_PROFILE_FIELDS]
+    row = (
+        get_user_model().objects
+        .filter(**{api_settings.USER_ID_FIELD: user_id})
+        .values(*CACHED_USER_FIELDS, *profile_columns)
+        .first()
+    )
+    if row is None:
+        return None
+    profile = {f: row.pop(c) for f, c in zip(CACHED_PROFILE_FIELDS, profile_columns)}
+    row['profile'] = profile if profile['id'] is not None else None
+    return row
+
+
+def _from_db(model, data):
+    # from_db expects values in concrete field order; missing fields are deferred.
+    names = [f.attname for f in model._meta.concrete_fields if f.attname in data]
+    return model.from_db('default', names, [data[n] for n in names])
+
+
+def _build_user(data):
+    # A fresh instance per request, so mutations never leak between requests.
+    # It counts as loaded from the database: saving it updates only the
+    # cached fields and leaves the deferred ones alone.
+    user = _from_db(get_user_model(), {k: v for k, v in data.items() if k != 'profile'})
+    if data['profile'] is not None:
+        user.profile = _from_db(Profile, data['profile'])
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves the user from the user cache."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            password = get_user_model().objects.filter(pk=user.pk).values_list('password', flat=True).first()
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(password or ''):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+
+        return user
@@ -0,0 +1,101 @@
+import json
+import logging
+import time
+from smtplib import SMTPException
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_KEY = 'mail:outbox'
+DEAD_LETTER_KEY = 'mail:dead-letter'
+MAIL_BATCH_SIZE = 50
+MAIL_MAX_RETRIES = 5
+
+_pool = {}
+
+
+def _outbox():
+    return get_redis_connection('default'), cache.make_key(OUTBOX_KEY)
+
+
+def _connection():
+    # One open connection per worker process and backend, reused across batches.
+    connection = _pool.get(settings.EMAIL_BACKEND)
+    if connection is None:
+        connection = _pool[settings.EMAIL_BACKEND] = get_connection(fail_silently=False)
+    connection.open()
+    return connection
+
+
+def _drop_connection():
+    connection = _pool.pop(settings.EMAIL_BACKEND, None)
+    if connection is not None:
+        try:
+            connection.close()
+        except (SMTPException, OSError):
+            pass
+
+
+def _count(metric, n):
+    key = f'mail:metrics:{metric}'
+    try:
+        cache.incr(key, n)
+    except ValueError:
+        if not cache.add(key, n, timeout=None):
+            cache.incr(key, n)
+
+
+def mail_metrics():
+    values = cache.get_many(['mail:metrics:sent', 'mail:metrics:failed'])
+    return {
+        'sent': values.get('mail:metrics:sent', 0),
+        'failed': values.get('mail:metrics:failed', 0),
+    }
+
+
+def queue_mail(subject, message, recipient):
+    client, key = _outbox()
+    client.rpush(key, json.dumps({'subject': subject, 'message': message, 'to': recipient}))
+    deliver_queued_mail.delay()
+
+
+@shared_task(bind=True, max_retries=MAIL_MAX_RETRIES)
+def deliver_queued_mail(self, batch_size=MAIL_BATCH_SIZE):
+    client, key = _outbox()
+    raw = client.lpop(key, batch_size)
+    if not raw:
+        return 'No queued mail'
+
+    messages = [
+        EmailMessage(m['subject'], m['message'], settings.DEFAULT_FROM_EMAIL, [m['to']])
+        for m in map(json.loads, raw)
+    ]
+    started = time.monotonic()
+    try:
+        sent = _connection().send_messages(messages)
+    except (SMTPException, OSError) as exc:
+        _drop_connection()
+        if self.request.retries >= self.max_retries:
+            # Out of retries: park the batch for inspection instead of the outbox.
+            client.rpush(cache.make_key(DEAD_LETTER_KEY), *raw)
+            _count('failed', len(messages))
+            logger.error('mail batch dead-lettered', extra={'messages': len(messages)})
+            raise
+        # Put the batch back at the head of the outbox in its original order.
+        client.lpush(key, *reversed(raw))
+        logger.warning('mail batch failed', extra={'messages': len(messages), 'retries': self.request.retries})
+        raise self.retry(exc=exc, countdown=min(5 * 2 ** self.request.retries, 300))
+
+    _count('sent', sent)
+    logger.info(
+        'mail batch delivered',
+        extra={'messages': sent, 'duration_ms': round((time.monotonic() - started) * 1000, 1)},
+    )
+    if len(raw) == batch_size:
+        deliver_queued_mail.delay(batch_size)
+    return f'Sent {sent} of {len(messages)} queued email(s)'
@@ -0,0 +1,29 @@
+import pytest
+
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def api():
+    return APIClient()
+
+
+@pytest.fixture
+def member(django_user_model, db):
+    return django_user_model.objects.create_user(username='member', email='member@example.com', password='pass')
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    # Record flushes instead of publishing them to the broker.
+    calls = []
+    monkeypatch.setattr('apps.users.tasks.deliver_queued_mail.delay', lambda *args: calls.append(args))
+    return calls
@@ -0,0 +1,103 @@
+import pytest
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.authentication import CachedJWTAuthentication, cached_user_version, local_users
+
+
+@pytest.fixture(autouse=True)
+def clear_local_users():
+    local_users.clear()
+    yield
+    local_users.clear()
+
+
+def access_header(user):
+    return f'Bearer {RefreshToken.for_user(user).access_token}'
+
+
+def authenticate(header):
+    request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=header)
+    return CachedJWTAuthentication().authenticate(request)[0]
+
+
+@pytest.mark.django_db
+def test_cached_user_needs_no_queries(member, django_assert_num_queries):
+    header = access_header(member)
+    with django_assert_num_queries(1):
+        authenticate(header)
+
+    with django_assert_num_queries(0):
+        user = authenticate(header)
+        assert (user.pk, user.username, user.is_active) == (member.pk, 'member', True)
+        assert user.profile.pk == member.profile.pk
+
+    local_users.clear()
+    with django_assert_num_queries(0):
+        assert authenticate(header).pk == member.pk
+
+
+@pytest.mark.django_db
+def test_cache_holds_no_password_hash(member):
+    user = authenticate(access_header(member))
+
+    cached = cache.get(f'auth:user:{member.pk}:v{cached_user_version(member.pk)}')
+    assert 'password' not in cached
+    assert set(cached['profile']) == {'id', 'user_id', 'bio', 'join_date'}
+    assert not user._state.adding
+    assert 'password' in user.get_deferred_fields()
+
+
+@pytest.mark.django_db
+def test_saving_a_cached_user_keeps_its_deferred_fields(member):
+    user = authenticate(access_header(member))
+    user.first_name = 'Mem'
+    user.save()
+
+    member.refresh_from_db()
+    assert member.first_name == 'Mem'
+    assert member.check_password('pass')
+
+
+@pytest.mark.django_db
+def test_saves_invalidate_the_cached_user(member, django_assert_num_queries):
+    header = access_header(member)
+    authenticate(header)
+
+    member.is_staff = True
+    member.save()
+    with django_assert_num_queries(1):
+        assert authenticate(header).is_staff
+
+
+@pytest.mark.django_db
+def test_profile_saves_invalidate_the_cached_user(member):
+    header = access_header(member)
+    authenticate(header)
+
+    member.profile.bio = 'Hello'
+    member.profile.save()
+    assert authenticate(header).profile.bio == 'Hello'
+
+
+@pytest.mark.django_db
+def test_cached_copies_are_not_shared(member):
+    header = access_header(member)
+    first = authenticate(header)
+    first.username = 'mutated'
+    assert authenticate(header).username == 'member'
+
+
+@pytest.mark.django_db
+def test_logout_invalidates_the_cached_user(api, member, django_assert_num_queries):
+    refresh = RefreshToken.for_user(member)
+    header = f'Bearer {refresh.access_token}'
+    api.credentials(HTTP_AUTHORIZATION=header)
+    authenticate(header)
+
+    res = api.post(reverse('logout'), {'refresh': str(refresh)}, format='json')
+    assert res.status_code == 205
+    with django_assert_num_queries(1):
+        authenticate(header)
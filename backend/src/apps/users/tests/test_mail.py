@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from smtplib import SMTPServerDisconnected
+from django.core import mail
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from apps.users import tasks
+from apps.users.tasks import deliver_queued_mail, mail_metrics, queue_mail
+
+LOCMEM = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+@override_settings(EMAIL_BACKEND=LOCMEM)
+@pytest.mark.django_db
+def test_login_queues_otp_mail_instead_of_sending(api, member, enqueued):
+    res = api.post(reverse('login'), {'username': 'member', 'password': 'pass'}, format='json')
+
+    assert res.status_code == 200
+    assert cache.get('otp_member')
+    assert mail.outbox == []
+    assert len(enqueued) == 1
+
+    assert deliver_queued_mail() == 'Sent 1 of 1 queued email(s)'
+    assert mail.outbox[0].to == ['member@example.com']
+    assert str(cache.get('otp_member')) in mail.outbox[0].body
+
+
+@override_settings(EMAIL_BACKEND=LOCMEM)
+@pytest.mark.django_db
+def test_forgot_password_queues_reset_mail(api, member, enqueued):
+    res = api.post(reverse('forgot-password'), {'email': 'member@example.com'}, format='json')
+
+    assert res.status_code == 200
+    deliver_queued_mail()
+    assert mail.outbox[0].subject == 'Password Reset OTP'
+    assert str(cache.get('reset_otp_member@example.com')) in mail.outbox[0].body
+
+
+@override_settings(EMAIL_BACKEND=LOCMEM)
+def test_delivery_batches_over_one_connection(enqueued, monkeypatch):
+    opened = []
+    real_connection = tasks._connection
+    monkeypatch.setattr(tasks, '_connection', lambda: opened.append(1) or real_connection())
+    for i in range(5):
+        queue_mail('Hi', f'message {i}', f'user{i}@example.com')
+
+    assert deliver_queued_mail(batch_size=3) == 'Sent 3 of 3 queued email(s)'
+    assert len(enqueued) == 6  # one per queued mail, plus a follow-up for the full batch
+    assert deliver_queued_mail(batch_size=3) == 'Sent 2 of 2 queued email(s)'
+
+    assert [m.body for m in mail.outbox] == [f'message {i}' for i in range(5)]
+    assert len(opened) == 2
+    assert mail_metrics() == {'sent': 5, 'failed': 0}
+
+
+@override_settings(EMAIL_BACKEND=LOCMEM)
+def test_failed_batch_is_retried_then_dead_lettered(enqueued, monkeypatch):
+    queue_mail('Hi', 'first', 'a@example.com')
+    queue_mail('Hi', 'second', 'b@example.com')
+
+    class Broken:
+        def send_messages(self, messages):
+            raise SMTPServerDisconnected('gone')
+
+    real_connection = tasks._connection
+    monkeypatch.setattr(tasks, '_connection', Broken)
+    with pytest.raises(SMTPServerDisconnected):
+        deliver_queued_mail()
+    assert mail_metrics() == {'sent': 0, 'failed': 0}
+
+    # Eager retries run back to back; the batch counts as failed once, at the end.
+    assert deliver_queued_mail.apply().failed()
+    assert mail_metrics() == {'sent': 0, 'failed': 2}
+
+    client, _ = tasks._outbox()
+    dead = client.lrange(cache.make_key(tasks.DEAD_LETTER_KEY), 0, -1)
+    assert [json.loads(m)['message'] for m in dead] == ['first', 'second']
+
+    # The dead-lettered batch is not picked up again.
+    monkeypatch.setattr(tasks, '_connection', real_connection)
+    assert deliver_queued_mail() == 'No queued mail'
+    assert mail.outbox == []
@@ -1,7 +1,5 @@
 from django.contrib.auth import authenticate, get_user_model
 from django.core.cache import cache
-from django.core.mail import send_mail
-from django.conf import settings
 
 from rest_framework.views import APIView
 from rest_framework.generics import CreateAPIView, RetrieveUpdateAPIView
@@ -15,7 +13,9 @@ from .serializers import ForgotPasswordSerializer, LoginSerializer, ProfileSeria
 
 import random
 
+from .authentication import invalidate_cached_user
 from .models import Profile
+from .tasks import queue_mail
 
 User = get_user_model()
 
@@ -44,11 +44,10 @@ class LoginView(APIView):
 
         cache.set(f'otp_{username}', otp, 300)
 
-        send_mail(
+        queue_mail(
             subject='Your Login OTP',
             message=f'Hello {user.username},\n\nYour OTP for login is {otp}. It expires in 5 minutes.\n\nBest,\nDjango Form Flow',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email]
+            recipient=user.email,
         )
 
         return Response({"meesage": 'OTP sent to your mail'}, status=status.HTTP_200_OK)
@@ -101,11 +100,10 @@ class ForgotPasswordView(APIView):
         otp = random.randint(100000, 999999)
         cache.set(f"reset_otp_{email}", otp, timeout=300)  # 5 minutes
 
-        send_mail(
+        queue_mail(
             subject="Password Reset OTP",
             message=f"Your OTP for password reset is {otp}. It expires in 5 minutes.",
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[email],
+            recipient=email,
         )
 
         return Response({"message": "OTP sent to your email."}, status=200)
@@ -197,6 +195,7 @@ class LogoutView(APIView):
         try:
             token = RefreshToken(refresh_token)
             token.blacklist()
+            invalidate_cached_user(request.user.id)
             return Response({'message': 'Logout Successfully.'}, status=status.HTTP_205_RESET_CONTENT)
         except Exception:
             return Response(status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,265 @@
+"""
+Exact query budgets for every route in config/api/urls.py.
+
+The fixture is large on purpose: a 20-step process, 50-field forms and
+1,000 responses. A view that grows a per-row query blows far past its
+budget instead of drifting by one.
+"""
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import URLResolver, resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.categories.models import FormCategory, ProcessCategory
+from apps.forms.models import Answer, Field, Form, Response as FormResponse
+from apps.processes.models import Process, ProcessInstance, ProcessStep, StepSubmission
+from config.api import urls as api_urls
+
+STEPS = 20
+FIELDS = 50
+RESPONSES = 1000
+INSTANCES = 300
+EXTRA_PROCESSES = 30
+
+
+def build_world():
+    User = get_user_model()
+    owner = User.objects.create_user('owner', 'owner@example.com', 'pass')
+    member = User.objects.create_user('member', 'member@example.com', 'pass')
+
+    forms = Form.objects.bulk_create([
+        Form(name=f'Form {i}', created_by=owner, slug=f'qb{i:04d}') for i in range(STEPS)
+    ])
+    Field.objects.bulk_create([
+        Field(form=form, question=f'Q{p}', field_type='text', position=p)
+        for form in forms for p in range(FIELDS)
+    ])
+    survey = forms[0]
+    fields = list(survey.fields.all())
+    responses = FormResponse.objects.bulk_create([FormResponse(form=survey, user=member) for _ in range(RESPONSES)])
+    Answer.objects.bulk_create(
+        [Answer(response=r, field=f, value=f'v{r.id % 7}') for r in responses for f in fields],
+        batch_size=5000,
+    )
+
+    seq = Process.objects.create(owner=owner.profile, title='Onboarding', type=Process.SEQUENTIAL)
+    steps = ProcessStep.objects.bulk_create([
+        ProcessStep(process=seq, form=forms[i], title=f'Step {i + 1}', order=i + 1, allow_skip=i == 0)
+        for i in range(STEPS)
+    ])
+    free = Process.objects.create(owner=owner.profile, title='Survey', type=Process.FREE_FLOW)
+    ProcessStep.objects.bulk_create([
+        ProcessStep(process=free, form=forms[i], title=f'Part {i + 1}', order=i + 1) for i in range(5)
+    ])
+    extras = Process.objects.bulk_create([
+        Process(owner=owner.profile, title=f'Extra {i}', type=Process.SEQUENTIAL) for i in range(EXTRA_PROCESSES)
+    ])
+    ProcessStep.objects.bulk_create([
+        ProcessStep(process=p, form=forms[o], title=f'Extra step {o}', order=o + 1) for p in extras for o in range(3)
+    ])
+
+    for i in range(10):
+        ProcessCategory.objects.create(user=owner, name=f'PC{i}').process.add(seq, free, *extras)
+        FormCategory.objects.create(user=owner, name=f'FC{i}').forms.add(*forms)
+
+    instances = ProcessInstance.objects.bulk_create([
+        ProcessInstance(
+            process=seq,
+            status='completed' if i % 5 == 0 else 'running',
+            current_step=None if i % 5 == 0 else steps[i % STEPS],
+            access_token=f'bulk-{i}',
+        )
+        for i in range(INSTANCES)
+    ])
+    StepSubmission.objects.bulk_create([
+        StepSubmission(instance=inst, step=steps[s])
+        for inst in instances
+        for s in range(STEPS if inst.current_step is None else steps.index(inst.current_step))
+    ])
+
+    loose_form = Form.objects.create(name='Uncategorised', created_by=owner)
+    loose_process = Process.objects.create(owner=owner.profile, title='Uncategorised')
+
+    expires = timezone.now() + timedelta(days=1)
+    guest = ProcessInstance.objects.create(process=seq, access_token_expires_at=expires)
+    guest.start()
+    free_guest = ProcessInstance.objects.create(process=free, access_token_expires_at=expires)
+
+    return SimpleNamespace(
+        owner=owner, member=member, forms=forms, survey=survey, fields=fields, responses=responses,
+        seq=seq, steps=steps, free=free, guest=guest, free_guest=free_guest,
+        loose_form=loose_form, loose_process=loose_process,
+        form_category=FormCategory.objects.filter(user=owner).first(),
+        process_category=ProcessCategory.objects.filter(user=owner).first(),
+    )
+
+
+@pytest.fixture(scope='module')
+def world(django_db_setup, django_db_blocker):
+    # Built once and committed; each test still runs in its own rolled-back transaction.
+    with django_db_blocker.unblock():
+        yield build_world()
+        call_command('flush', interactive=False, verbosity=0)
+
+
+@pytest.fixture(autouse=True)
+def quiet(monkeypatch):
+    cache.clear()
+    monkeypatch.setattr('apps.users.tasks.deliver_queued_mail.delay', lambda *a, **kw: None)
+    yield
+    cache.clear()
+
+
+def set_otp(key):
+    return lambda w: cache.set(key, 123456, 300)
+
+
+def refresh_for(w):
+    return {'refresh': str(RefreshToken.for_user(w.owner))}
+
+
+def bundle(w):
+    return {
+        'forms': [{'slug': 'imp1', 'name': 'Imported', 'fields': [{'question': 'Q', 'field_type': 'text'}]}],
+        'processes': [{'title': 'Imported', 'categories': ['PC0'], 'steps': [{'order': 1, 'form': 'imp1'}]}],
+    }
+
+
+# (url name or raw path, method, url kwargs, payload, caller, setup, expected status, queries)
+CASES = [
+    # forms router
+    ('/api/', 'get', None, None, 'owner', None, 200, 0),
+    ('form-list', 'get', None, None, 'owner', None, 200, 4),
+    ('form-list', 'post', None, lambda w: {'name': 'New', 'slug': 'newform'}, 'owner', None, 201, 4),
+    ('form-detail', 'get', lambda w: {'pk': w.survey.pk}, None, 'owner', None, 200, 4),
+    ('form-detail', 'patch', lambda w: {'pk': w.survey.pk}, lambda w: {'name': 'Renamed'}, 'owner', None, 200, 6),
+    ('field-list', 'get', None, None, 'owner', None, 200, 2),
+    ('field-detail', 'get', lambda w: {'pk': w.fields[0].pk}, None, 'owner', None, 200, 1),
+    ('response-list', 'get', None, None, 'owner', None, 200, 3),
+    ('response-list', 'post', None, lambda w: {
+        'form': w.survey.pk, 'answers': [{'field': f.pk, 'value': 'x'} for f in w.fields[:3]],
+    }, 'owner', None, 201, 9),
+    ('response-detail', 'get', lambda w: {'pk': w.responses[0].pk}, None, 'owner', None, 200, 2),
+
+    # users
+    ('register', 'post', None, lambda w: {
+        'username': 'newbie', 'email': 'newbie@example.com', 'password': 'pass12345', 'password2': 'pass12345',
+    }, None, None, 201, 3),
+    ('login', 'post', None, lambda w: {'username': 'owner', 'password': 'pass'}, None, None, 200, 1),
+    ('verify-otp', 'post', None, lambda w: {'username': 'owner', 'otp': '123456'}, None, set_otp('otp_owner'), 200, 2),
+    ('forgot-password', 'post', None, lambda w: {'email': 'owner@example.com'}, None, None, 200, 1),
+    ('verify-reset-otp', 'post', None, lambda w: {'email': 'owner@example.com', 'otp': '123456'},
+     None, set_otp('reset_otp_owner@example.com'), 200, 0),
+    ('reset-password', 'post', None, lambda w: {'email': 'owner@example.com', 'otp': '123456', 'new_password': 'x'},
+     None, set_otp('reset_otp_owner@example.com'), 200, 3),
+    ('refresh-token', 'post', None, refresh_for, 'owner', None, 200, 2),
+    ('logout', 'post', None, refresh_for, 'owner', None, 205, 7),
+    ('profile', 'get', lambda w: {'pk': w.owner.profile.pk}, None, 'owner', None, 200, 2),
+
+    # processes
+    ('process-list', 'get', None, None, None, None, 200, 4),
+    ('free-process-list', 'get', None, None, None, None, 200, 4),
+    ('sequ-process-list', 'get', None, None, None, None, 200, 4),
+    ('process-list-create', 'get', None, None, 'owner', None, 200, 4),
+    ('process-list-create', 'post', None, lambda w: {
+        'title': 'Created', 'type': 'sequential', 'steps': [{'form': f.pk} for f in w.forms[:5]],
+    }, 'owner', None, 201, 10),
+    ('process-export', 'get', None, None, 'owner', None, 200, 5),
+    ('process-import', 'post', None, bundle, 'owner', None, 201, 10),
+    ('process-detail', 'get', lambda w: {'pk': w.seq.pk}, None, 'owner', None, 200, 3),
+    ('process-detail', 'patch', lambda w: {'pk': w.seq.pk}, lambda w: {'title': 'Renamed'}, 'owner', None, 200, 4),
+    ('process-funnel', 'get', lambda w: {'pk': w.seq.pk}, None, 'owner', None, 200, 3),
+    ('step-list-create', 'get', lambda w: {'process_id': w.seq.pk}, None, 'owner', None, 200, 2),
+    ('step-list-create', 'post', lambda w: {'process_id': w.seq.pk}, lambda w: {'form': w.forms[1].pk, 'order': STEPS + 1},
+     'owner', None, 201, 3),
+    ('step-reorder', 'post', lambda w: {'process_id': w.seq.pk}, lambda w: {'steps': [s.pk for s in w.steps[::-1]]},
+     'owner', None, 200, 7),
+    ('step-detail', 'get', lambda w: {'pk': w.steps[0].pk}, None, 'owner', None, 200, 1),
+    ('process-start', 'post', lambda w: {'pk': w.seq.pk}, None, None, None, 201, 7),
+    ('owner-instance-list', 'get', None, None, 'owner', None, 200, 2),
+    ('current-step', 'get', lambda w: {'pk': w.guest.pk}, lambda w: {'token': w.guest.access_token},
+     None, None, 200, 2),
+    ('submit-step', 'post', lambda w: {'pk': w.guest.pk}, lambda w: {
+        'token': w.guest.access_token, 'answers': {str(f.pk): 'x' for f in w.fields},
+    }, None, None, 201, 14),
+    ('skip-step', 'post', lambda w: {'pk': w.guest.pk}, lambda w: {'token': w.guest.access_token},
+     None, None, 201, 10),
+    ('free-process-start', 'post', lambda w: {'pk': w.free.pk}, None, None, None, 201, 5),
+    ('free-current-steps', 'get', lambda w: {'pk': w.free_guest.pk}, lambda w: {'token': w.free_guest.access_token},
+     None, None, 200, 5),
+    ('submit-free', 'post', lambda w: {'pk': w.free_guest.pk}, lambda w: {
+        'token': w.free_guest.access_token, 'step': w.free.steps.first().pk,
+        'answers': {str(f.pk): 'x' for f in w.fields},
+    }, None, None, 201, 17),
+
+    # categories router
+    ('/api/categories/', 'get', None, None, 'owner', None, 200, 0),
+    ('formcategory-list', 'get', None, None, 'owner', None, 200, 3),
+    ('formcategory-detail', 'get', lambda w: {'pk': w.form_category.pk}, None, 'owner', None, 200, 2),
+    ('formcategory-add-form', 'post', lambda w: {'pk': w.form_category.pk},
+     lambda w: {'form_id': w.loose_form.pk}, 'owner', None, 200, 5),
+    ('formcategory-remove-form', 'post', lambda w: {'pk': w.form_category.pk},
+     lambda w: {'form_id': w.forms[0].pk}, 'owner', None, 200, 4),
+    ('processcategory-list', 'get', None, None, 'owner', None, 200, 3),
+    ('processcategory-detail', 'get', lambda w: {'pk': w.process_category.pk}, None, 'owner', None, 200, 2),
+    ('processcategory-add-process', 'post', lambda w: {'pk': w.process_category.pk},
+     lambda w: {'process_id': w.loose_process.pk}, 'owner', None, 200, 6),
+    ('processcategory-remove-process', 'post', lambda w: {'pk': w.process_category.pk},
+     lambda w: {'process_id': w.seq.pk}, 'owner', None, 200, 4),
+
+    # reports
+    ('forms-dashboard', 'get', None, None, 'owner', None, 200, 2),
+    ('form-report', 'get', lambda w: {'form_id': w.survey.pk}, None, 'owner', None, 200, 2),
+    ('form-stats', 'get', lambda w: {'form_id': w.survey.pk}, None, 'owner', None, 200, 2),
+    ('form-responses-report', 'get', lambda w: {'form_id': w.survey.pk}, None, 'owner', None, 200, 4),
+    ('form-trends', 'get', lambda w: {'form_id': w.survey.pk}, lambda w: {'granularity': 'day'}, 'owner', None, 200, 2),
+
+    # simplejwt
+    ('token_obtain_pair', 'post', None, lambda w: {'username': 'owner', 'password': 'pass'}, None, None, 200, 2),
+    ('token_refresh', 'post', None, refresh_for, None, None, 200, 13),
+]
+
+
+def case_id(case):
+    return f'{case[1]}-{case[0]}'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name, method, kwargs, payload, caller, setup, expected, budget', CASES, ids=map(case_id, CASES))
+def test_query_budget(world, django_assert_num_queries, name, method, kwargs, payload, caller, setup, expected, budget):
+    client = APIClient()
+    if caller:
+        client.force_authenticate(getattr(world, caller))
+    if setup:
+        setup(world)
+    url = name if name.startswith('/') else reverse(name, kwargs=kwargs(world) if kwargs else None)
+    data = payload(world) if payload else None
+    send = getattr(client, method)
+    extra = {'format': 'json'} if method != 'get' else {}
+
+    with django_assert_num_queries(budget):
+        res = send(url, data, **extra)
+    assert res.status_code == expected, getattr(res, 'data', res)
+
+
+def api_routes(patterns=api_urls.urlpatterns, prefix='api/'):
+    for pattern in patterns:
+        # resolve() joins nested routes without the regex anchors' leading '^'.
+        route = prefix + str(pattern.pattern).lstrip('^')
+        if isinstance(pattern, URLResolver):
+            yield from api_routes(pattern.url_patterns, route)
+        elif '(?P<format>' not in route and '<drf_format_suffix:' not in route:
+            yield route
+
+
+def test_every_api_route_has_a_budget(world):
+    urls = [c[0] if c[0].startswith('/') else reverse(c[0], kwargs=c[2](world) if c[2] else None) for c in CASES]
+    budgeted = {resolve(url).route for url in urls}
+    assert set(api_routes()) - budgeted == set()
@@ -0,0 +1,102 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Models whose reads follow a process instance the client has just written.
+STICKY_MODELS = {'processes.processinstance', 'processes.stepsubmission'}
+
+_replica = ContextVar('replica_reads', default=None)
+
+
+def _pin_key(instance_id):
+    return f'db:pin:procinst:{instance_id}'
+
+
+def pin_instance(instance_id):
+    # Reads of this instance skip the replicas until they have caught up.
+    if settings.DATABASE_REPLICAS:
+        cache.set(_pin_key(instance_id), 1, timeout=settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def instance_is_pinned(instance_id):
+    return cache.get(_pin_key(instance_id)) is not None
+
+
+async def ainstance_is_pinned(instance_id):
+    return await cache.aget(_pin_key(instance_id)) is not None
+
+
+@contextmanager
+def replica_reads(pinned=False):
+    if not settings.DATABASE_REPLICAS:
+        yield
+        return
+    # One replica per block, so a request never mixes replicas with different lag.
+    token = _replica.set((random.choice(settings.DATABASE_REPLICAS), pinned))
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    # Results that get cached outlive the request, so they are read from the
+    # primary even inside a replica block.
+    token = _replica.set(None)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+class ReplicaRouter:
+    """Send reads inside replica_reads() to a replica and everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        state = _replica.get()
+        if state is None:
+            return 'default'
+        alias, pinned = state
+        if pinned and model._meta.label_lower in STICKY_MODELS:
+            return 'default'
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas get their schema through replication.
+        return db == 'default'
+
+
+class ReplicaReadMixin:
+    """
+    Serve the safe methods of a view from a replica.
+
+    Views keyed on a process instance set replica_pin_kwarg to the URL
+    kwarg holding its id, so reads of a recently written instance stay
+    on the primary.
+    """
+
+    replica_pin_kwarg = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or not settings.DATABASE_REPLICAS:
+            return super().dispatch(request, *args, **kwargs)
+        if getattr(self, 'view_is_async', False):
+            return self._replica_adispatch(request, *args, **kwargs)
+        instance_id = kwargs.get(self.replica_pin_kwarg) if self.replica_pin_kwarg else None
+        with replica_reads(pinned=instance_id is not None and instance_is_pinned(instance_id)):
+            return super().dispatch(request, *args, **kwargs)
+
+    async def _replica_adispatch(self, request, *args, **kwargs):
+        instance_id = kwargs.get(self.replica_pin_kwarg) if self.replica_pin_kwarg else None
+        with replica_reads(pinned=instance_id is not None and await ainstance_is_pinned(instance_id)):
+            return await super().dispatch(request, *args, **kwargs)
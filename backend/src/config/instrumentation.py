@@ -0,0 +1,201 @@
+import logging
+import random
+import re
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django_redis.cache import RedisCache
+
+logger = logging.getLogger(__name__)
+
+# Statements kept per request for the slow-request sample; counts go on past it.
+MAX_RECORDED_QUERIES = 500
+SLOW_SQL_TOP = 10
+
+_IN_LIST = re.compile(r'\((?:%s, )+%s\)')
+_WHITESPACE = re.compile(r'\s+')
+
+_current = ContextVar('request_metrics', default=None)
+_MISSING = object()
+
+
+class RequestMetrics:
+    __slots__ = ('started', 'duration', 'queries', 'db_time', 'cache_hits', 'cache_misses',
+                 'serializer_time', 'serializing', 'statements')
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.duration = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.serializer_time = 0.0
+        self.serializing = False
+        self.statements = []
+
+    def stop(self):
+        self.duration = perf_counter() - self.started
+
+    def fields(self):
+        return {
+            'duration_ms': round(self.duration * 1000, 1),
+            'db_queries': self.queries,
+            'db_ms': round(self.db_time * 1000, 1),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'serializer_ms': round(self.serializer_time * 1000, 1),
+        }
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries", '
+            f'cache;desc="{self.cache_hits} hits {self.cache_misses} misses", '
+            f'ser;dur={self.serializer_time * 1000:.1f}, '
+            f'total;dur={self.duration * 1000:.1f}'
+        )
+
+    def sql_profile(self):
+        # Grouping by normalized statement makes an N+1 show up as one line with a high count.
+        grouped = {}
+        for sql, elapsed in self.statements:
+            entry = grouped.setdefault(normalize_sql(sql), [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+        top = sorted(grouped.items(), key=lambda item: item[1][1], reverse=True)[:SLOW_SQL_TOP]
+        return [{'sql': sql, 'count': count, 'ms': round(elapsed * 1000, 1)} for sql, (count, elapsed) in top]
+
+
+def normalize_sql(sql):
+    return _IN_LIST.sub('(%s, ...)', _WHITESPACE.sub(' ', sql).strip())
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = perf_counter() - started
+        metrics.queries += 1
+        metrics.db_time += elapsed
+        if len(metrics.statements) < MAX_RECORDED_QUERIES:
+            metrics.statements.append((sql, elapsed))
+
+
+def _watch_connection(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _timed_data(fget):
+    def data(self):
+        metrics = _current.get()
+        # Only the outermost .data is timed; nested serializers run inside it.
+        if metrics is None or metrics.serializing:
+            return fget(self)
+        metrics.serializing = True
+        started = perf_counter()
+        try:
+            return fget(self)
+        finally:
+            metrics.serializer_time += perf_counter() - started
+            metrics.serializing = False
+
+    data.instrumented = True
+    return property(data)
+
+
+def install():
+    from rest_framework.serializers import BaseSerializer
+
+    connection_created.connect(_watch_connection, dispatch_uid='request-metrics')
+    for connection in connections.all(initialized_only=True):
+        _watch_connection(connection)
+    if not getattr(BaseSerializer.data.fget, 'instrumented', False):
+        BaseSerializer.data = _timed_data(BaseSerializer.data.fget)
+
+
+class InstrumentedRedisCache(RedisCache):
+    """RedisCache that counts hits and misses against the current request."""
+
+    def get(self, key, default=None, version=None, client=None):
+        value = super().get(key, _MISSING, version=version, client=client)
+        metrics = _current.get()
+        if metrics is not None:
+            if value is _MISSING:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, version=None, client=None):
+        values = super().get_many(keys, version=version, client=client)
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.cache_hits += len(values)
+            metrics.cache_misses += len(keys) - len(values)
+        return values
+
+
+class RequestMetricsMiddleware:
+    """
+    Count queries, DB time, cache hits and misses and serializer time per
+    request, and report them as log fields and, with REQUEST_METRICS_HEADER,
+    a Server-Timing header.
+
+    Requests slower than REQUEST_SLOW_MS are sampled at
+    REQUEST_SLOW_SAMPLE_RATE with their statements grouped by normalized SQL.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        install()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(request, response, metrics)
+
+    def report(self, request, response, metrics):
+        metrics.stop()
+        if settings.REQUEST_METRICS_HEADER:
+            response['Server-Timing'] = metrics.server_timing()
+        fields = {'method': request.method, 'path': request.path, 'status': response.status_code, **metrics.fields()}
+        logger.info('request finished', extra=fields)
+        if (
+            metrics.duration * 1000 >= settings.REQUEST_SLOW_MS
+            and random.random() < settings.REQUEST_SLOW_SAMPLE_RATE
+        ):
+            logger.warning('slow request', extra={**fields, 'sql': metrics.sql_profile()})
+        return response
@@ -63,9 +63,9 @@ INSTALLED_APPS = [
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.CachedJWTAuthentication',
     ]if DEBUG else [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
@@ -79,7 +79,7 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 10,
 
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.ScopedRateThrottle',
+        'apps.processes.throttling.RedisScopedRateThrottle',
         'rest_framework.throttling.UserRateThrottle',
         'rest_framework.throttling.AnonRateThrottle',
     ],
@@ -99,6 +99,9 @@ CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 CELERY_TIMEZONE = 'UTC'
 CELERY_ENABLE_UTC = True
+CELERY_TASK_ROUTES = {
+    'apps.users.tasks.deliver_queued_mail': {'queue': 'mail'},
+}
 
 
 # OTP configs
@@ -111,6 +114,7 @@ OTP_SETTINGS = {
 
 
 MIDDLEWARE = [
+    "config.instrumentation.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -154,6 +158,16 @@ DATABASES = {
     }
 }
 
+# Read replicas of the primary, e.g. DJANGO_DB_REPLICA_HOSTS=db-replica-1,db-replica-2.
+# Reports, catalog and listing reads go to them; see config.db_router.
+DATABASE_REPLICAS = []
+for _i, _host in enumerate(h.strip() for h in os.getenv('DJANGO_DB_REPLICA_HOSTS', '').split(',') if h.strip()):
+    DATABASES[f'replica{_i + 1}'] = {**DATABASES['default'], 'HOST': _host, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica{_i + 1}')
+
+DATABASE_ROUTERS = ['config.db_router.ReplicaRouter']
+DATABASE_REPLICA_PIN_SECONDS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -207,7 +221,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 CACHES = {
     "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
+        "BACKEND": "config.instrumentation.InstrumentedRedisCache",
         "LOCATION": "redis://redis:6379/1",
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
@@ -216,6 +230,16 @@ CACHES = {
 }
 
 CACHE_TTL = 60 * 5
+REPORT_CACHE_TTL = 60 * 60
+DASHBOARD_CACHE_TTL = 60
+AUTH_USER_CACHE_TTL = 60 * 5
+AUTH_USER_LOCAL_TTL = 5
+
+REQUEST_METRICS = env.bool("REQUEST_METRICS", default=True)
+# Server-Timing exposes query counts and timings, so only send it where that is wanted.
+REQUEST_METRICS_HEADER = env.bool("REQUEST_METRICS_HEADER", default=DEBUG)
+REQUEST_SLOW_MS = env.int("REQUEST_SLOW_MS", default=500)
+REQUEST_SLOW_SAMPLE_RATE = env.float("REQUEST_SLOW_SAMPLE_RATE", default=0.1)
 
 EMAIL_BACKEND = env("EMAIL_BACKEND")
 EMAIL_HOST = env("EMAIL_HOST", default="localhost")
@@ -226,17 +250,27 @@ EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = env("DEFAULT_FROM_EMAIL")
 CELERY_BEAT_SCHEDULE = {
     'weekly_report': {
-        'task': 'reports.tasks.send_periodic_report',
+        'task': 'apps.reports.tasks.send_periodic_report',
         'schedule': crontab(hour=9, minute=0, day_of_week=1),
+        'kwargs': {'period': 'weekly'},
     },
     'monthly_report': {
-        'task': 'reports.tasks.send_periodic_report',
+        'task': 'apps.reports.tasks.send_periodic_report',
         'schedule': crontab(hour=9, minute=0, day_of_month=1),
+        'kwargs': {'period': 'monthly'},
     },
     'purge-expired-guest-instances-every-15m': {
         'task': 'apps.processes.tasks.purge_expired_guest_instances',
         'schedule': 15 * 60,  # هر ۱۵ دقیقه یک بار
     },
+    'rollup-form-responses-every-5m': {
+        'task': 'apps.reports.tasks.rollup_form_responses',
+        'schedule': 5 * 60,
+    },
+    'rollup-step-funnels-every-5m': {
+        'task': 'apps.processes.tasks.rollup_step_funnels',
+        'schedule': 5 * 60,
+    },
 }
 
 ASGI_APPLICATION = 'config.asgi.application'
@@ -0,0 +1,86 @@
+import logging
+import re
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.forms.models import Form
+from apps.processes.models import Process, ProcessStep
+from config.instrumentation import normalize_sql
+
+
+@pytest.fixture
+def api():
+    return APIClient()
+
+
+@pytest.fixture
+def catalog(django_user_model, db):
+    # One active process, so the catalog page runs every one of its queries.
+    owner = django_user_model.objects.create_user(username='owner', password='pass')
+    form = Form.objects.create(name='Form', created_by=owner, slug='instr01')
+    process = Process.objects.create(owner=owner.profile, title='Proc', type=Process.SEQUENTIAL, is_active=True)
+    ProcessStep.objects.create(process=process, form=form, title='Step 1', order=1)
+    return process
+
+
+def timing(response):
+    return dict(
+        (name, params) for name, params in
+        (part.split(';', 1) for part in response['Server-Timing'].split(', '))
+    )
+
+
+@pytest.mark.django_db
+def test_server_timing_counts_queries_and_cache(api, catalog, settings, django_assert_num_queries):
+    settings.REQUEST_METRICS_HEADER = True
+    cache.clear()
+    url = reverse('process-list')
+
+    with django_assert_num_queries(4):
+        res = api.get(url)
+    first = timing(res)
+    assert re.match(r'dur=[\d.]+;desc="4 queries"', first['db'])
+    assert first['cache'].endswith('misses"')
+    assert 'ser' in first and 'total' in first
+
+    second = timing(api.get(url))
+    assert second['db'].endswith('desc="0 queries"')
+    assert re.search(r'desc="[1-9]\d* hits 0 misses"', second['cache'])
+
+
+@pytest.mark.django_db
+def test_request_fields_are_logged(api, catalog, settings, caplog):
+    settings.REQUEST_METRICS_HEADER = False
+    cache.clear()
+    with caplog.at_level(logging.INFO, logger='config.instrumentation'):
+        res = api.get(reverse('process-list'))
+
+    assert 'Server-Timing' not in res
+
+    record = next(r for r in caplog.records if r.message == 'request finished')
+    assert record.path == reverse('process-list')
+    assert record.status == 200
+    assert record.db_queries >= 1
+    assert record.serializer_ms >= 0
+
+
+@pytest.mark.django_db
+def test_slow_requests_are_sampled_with_grouped_sql(api, catalog, settings, caplog):
+    settings.REQUEST_SLOW_MS = 0
+    settings.REQUEST_SLOW_SAMPLE_RATE = 1.0
+    cache.clear()
+
+    with caplog.at_level(logging.WARNING, logger='config.instrumentation'):
+        api.get(reverse('process-list'))
+
+    record = next(r for r in caplog.records if r.message == 'slow request')
+    assert sum(entry['count'] for entry in record.sql) == record.db_queries
+    assert all(set(entry) == {'sql', 'count', 'ms'} for entry in record.sql)
+
+
+def test_normalize_sql_collapses_in_lists_and_whitespace():
+    sql = 'SELECT *\n  FROM "t" WHERE "t"."id" IN (%s, %s, %s)'
+    assert normalize_sql(sql) == 'SELECT * FROM "t" WHERE "t"."id" IN (%s, ...)'